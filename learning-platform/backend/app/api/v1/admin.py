@@ -0,0 +1,158 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from datetime import datetime, timedelta
+from app.api.v1.auth import get_current_superuser
+from app.api.v1.code import history_export_response
+from app.core.database import get_read_db
+from app.core.config import settings
+from app.core.profiling import (
+    PROFILE_HEADER, create_profile_token, get_profile_store, render_folded, render_tree
+)
+from app.core.query_stats import query_metrics
+from app.models.execution import CodeExecution
+from app.models.rollup import RollupGranularity
+from app.models.user import User
+from app.services.analytics import get_analytics, AnalyticsUnavailable
+from app.services.execution_rollups import query_series
+
+router = APIRouter()
+
+# Cohorts are users grouped by signup month
+COHORT_QUERY = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="Signup month, e.g. 2025-01")
+
+
+@router.get("/db-stats")
+def get_db_stats(current_user: User = Depends(get_current_superuser)):
+    """Per-route SQL statistics: query counts, DB time and N+1 occurrences"""
+    return query_metrics.snapshot()
+
+
+@router.get("/execution-stats")
+def get_execution_stats(
+    granularity: Literal["hour", "day"] = RollupGranularity.HOUR,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    language: Optional[str] = None,
+    project_id: Optional[int] = None,
+    group_by: Optional[Literal["language", "project"]] = None,
+    current_user: User = Depends(get_current_superuser),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Execution count, error and timeout rate and p50/p95/max time per hour or day
+    
+    Defaults to the last 24 hours (hourly) or 30 days (daily). Hourly data is
+    kept for ROLLUP_HOURLY_RETENTION_DAYS, then only daily buckets remain.
+    """
+    end = end or datetime.utcnow()
+    if start is None:
+        start = end - (timedelta(days=30) if granularity == RollupGranularity.DAY else timedelta(hours=24))
+    return {
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "series": query_series(db, granularity, start, end, language, project_id, group_by),
+    }
+
+
+@router.get("/executions/export")
+def export_executions(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    compress: bool = Query(False, description="gzip the file"),
+    user_id: Optional[int] = None,
+    project_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: User = Depends(get_current_superuser)
+):
+    """Stream executions of all (or one) users as NDJSON or CSV, oldest first"""
+    filters = []
+    if user_id:
+        filters.append(CodeExecution.user_id == user_id)
+    if project_id:
+        filters.append(CodeExecution.project_id == project_id)
+    if start:
+        filters.append(CodeExecution.created_at >= start)
+    if end:
+        filters.append(CodeExecution.created_at < end)
+    return history_export_response(request, filters, format, compress)
+
+
+@router.post("/profiles/token")
+def create_profiling_token(current_user: User = Depends(get_current_superuser)):
+    """A signed header value that profiles any request sending it, until it expires"""
+    token, expires = create_profile_token(settings.PROFILE_TOKEN_TTL)
+    return {
+        "header": PROFILE_HEADER,
+        "token": token,
+        "expires_at": datetime.utcfromtimestamp(expires),
+    }
+
+
+@router.get("/profiles")
+def list_profiles(current_user: User = Depends(get_current_superuser)):
+    """Stored request profiles, newest first"""
+    return get_profile_store().list()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(
+    profile_id: str,
+    format: Literal["tree", "folded"] = "tree",
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    Download a request profile
+    
+    tree is a readable call tree; folded is collapsed stacks for flame graph
+    tools (flamegraph.pl, speedscope).
+    """
+    record = get_profile_store().get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    if format == "folded":
+        return PlainTextResponse(
+            render_folded(record),
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'}
+        )
+    return PlainTextResponse(render_tree(record))
+
+
+def _analytics_report(build):
+    """Run a report, turning a missing NumPy into 503"""
+    try:
+        return build()
+    except AnalyticsUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+
+@router.get("/analytics/completion-times")
+def get_completion_times(
+    cohort: Optional[str] = COHORT_QUERY,
+    current_user: User = Depends(get_current_superuser)
+):
+    """Time spent and elapsed time to complete each project: percentiles and histograms"""
+    return _analytics_report(lambda: get_analytics().completion_report(cohort))
+
+
+@router.get("/analytics/failure-rates")
+def get_failure_rates(
+    cohort: Optional[str] = COHORT_QUERY,
+    current_user: User = Depends(get_current_superuser)
+):
+    """Share of executions per project that ended in an error or timeout"""
+    report = _analytics_report(lambda: get_analytics().execution_report(cohort))
+    return {key: value for key, value in report.items() if key != "execution_times"}
+
+
+@router.get("/analytics/execution-times")
+def get_execution_times(
+    cohort: Optional[str] = COHORT_QUERY,
+    current_user: User = Depends(get_current_superuser)
+):
+    """Execution time percentiles and histogram per language"""
+    report = _analytics_report(lambda: get_analytics().execution_report(cohort))
+    return {key: value for key, value in report.items() if key != "failure_rates"}
@@ -1,6 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, load_only, noload, selectinload
+from collections import Counter
+from typing import Dict, List, Literal, Optional
+from datetime import datetime
+import os
 from app.api.v1.auth import get_current_user
 from app.models.user import User
 from app.models.execution import CodeExecution
@@ -8,26 +15,135 @@ from app.schemas.execution import (
     CodeExecutionRequest,
     CodeExecutionResponse,
     CodeExecutionHistory,
+    CodeExecutionSummary,
+    ExecutionInput,
     SupportedLanguage
 )
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import client_key, get_db, read_session_factory, write_tracker
+from app.core.pagination import encode_cursor, decode_cursor, invalid_cursor
+from app.core.responses import FastJSONResponse
+from app.services.blob_store import EXECUTION_BLOB_FIELDS, load_blob_previews
 from app.services.code_executor import get_code_executor
+from app.services.execution_rollups import get_rollup_recorder
+from app.services.project_catalog import get_project_catalog
+from app.services.history_export import EXPORT_FORMATS, export_executions
+from app.services.input_store import InputTooLarge, get_input_store
+from app.services.output_store import get_output_store, parse_range, iter_file_range
+from app.services.history_writer import get_history_writer
+from app.services.history_archive import get_history_archiver
+from app.services.analytics import mark_analytics_stale
+from app.services.user_summary import remove_executions
 
 router = APIRouter()
 
+HISTORY_FIELDS = tuple(CodeExecutionHistory.model_fields)
+SUMMARY_FIELDS = tuple(
+    field for field in CodeExecutionSummary.model_fields if not field.endswith("_preview")
+) + ("code", "output", "error")
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma-separated fields= list against the history schema"""
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in HISTORY_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return requested
+
+
+def _history_load_options(fields, preview: Optional[int]) -> list:
+    """
+    Load only the columns and text blobs the requested fields need
+
+    With a preview, blobs aren't loaded at all: their hashes are, and
+    load_blob_previews reads just a prefix of each.
+    """
+    columns = {"id", "created_at"}  # always needed for the keyset cursor
+    options = []
+    for field in fields:
+        columns.add(EXECUTION_BLOB_FIELDS.get(field, field))
+    for field in EXECUTION_BLOB_FIELDS:
+        blob = getattr(CodeExecution, f"{field}_blob")
+        options.append(selectinload(blob) if field in fields and not preview else noload(blob))
+    return [load_only(*(getattr(CodeExecution, column) for column in columns))] + options
+
+
+def flush_history(request: Request, user_id: int) -> None:
+    """
+    Commit a user's buffered executions before reading their history
+
+    The flush writes to the primary, so when it wrote anything the client
+    sticks to the primary like after any other write.
+    """
+    if get_history_writer().flush_for_user(user_id):
+        write_tracker.mark_write(client_key(request))
+
+
+def get_history_db(request: Request, current_user: User = Depends(get_current_user)):
+    """Dependency to get a read session for the user's history, after flushing it"""
+    flush_history(request, current_user.id)
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def history_export_response(
+    request: Request, filters: list, export_format: str, compress: bool
+) -> StreamingResponse:
+    """Stream an execution history export as a file download"""
+    filename = f"executions.{export_format}" + (".gz" if compress else "")
+    return StreamingResponse(
+        export_executions(filters, read_session_factory(request), export_format, compress),
+        media_type="application/gzip" if compress else EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def _history_text(execution: CodeExecution, field: str, previews: Optional[Dict[str, str]]) -> Optional[str]:
+    """A text field of an execution: its preview if previews were loaded, else the full text"""
+    if previews is not None:
+        return previews.get(getattr(execution, EXECUTION_BLOB_FIELDS[field]))
+    blob = getattr(execution, f"{field}_blob")
+    return blob.text if blob is not None else None
+
 
 @router.post("/execute", response_model=CodeExecutionResponse)
 async def execute_code(
     request: CodeExecutionRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Execute code in a sandboxed environment
     
     Supports Python, JavaScript, and TypeScript
-    Code is executed in an isolated environment with resource limits
+    Code is executed in an isolated environment with resource limits.
+    Large inputs can be uploaded to /inputs first and passed as stdin_id.
     """
+    stdin = request.stdin
+    stdin_path = None
+    if request.stdin_id:
+        if stdin:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Pass either stdin or stdin_id, not both"
+            )
+        stdin_path = get_input_store().path(current_user.id, request.stdin_id)
+        if stdin_path is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Input not found or expired"
+            )
+        # History records a reference, not the uploaded content
+        stdin = f"[uploaded input {request.stdin_id}, {os.path.getsize(stdin_path)} bytes]"
+    
     # Get executor instance (use_docker=False for development without Docker)
     executor = get_code_executor(use_docker=False)
     
@@ -35,60 +151,286 @@ async def execute_code(
     result = await executor.execute_code(
         code=request.code,
         language=request.language,
-        stdin=request.stdin
+        stdin=None if stdin_path else stdin,
+        output_owner=current_user.id,
+        stdin_path=stdin_path
     )
     
-    # Save to history if requested
+    # Count every run in the execution statistics, saved or not. Requests
+    # for unsupported languages never ran, and only catalog projects get
+    # their own series, so clients can't mint arbitrary rollup keys.
+    if request.language in executor.LANGUAGE_CONFIGS:
+        catalog = get_project_catalog().snapshot().by_id
+        get_rollup_recorder().add({
+            "created_at": datetime.utcnow(),
+            "language": request.language,
+            "project_id": request.project_id if request.project_id in catalog else None,
+            "status": result["status"],
+            "execution_time": result["execution_time"],
+        })
+    
+    # Save to history if requested (persisted in the background, in batches;
+    # in a thread since add() writes through when the flusher isn't running)
     if request.save_history:
         try:
-            execution = CodeExecution(
+            await run_in_threadpool(
+                get_history_writer().add,
                 user_id=current_user.id,
                 project_id=request.project_id,
                 language=request.language,
                 code=request.code,
-                stdin=request.stdin,
+                stdin=stdin,
                 output=result["output"],
                 error=result.get("error"),
                 execution_time=result["execution_time"],
                 status=result["status"],
-                exit_code=result["exit_code"]
+                exit_code=result["exit_code"],
+                output_id=result.get("output_id"),
+                error_id=result.get("error_id")
             )
-            db.add(execution)
-            db.commit()
         except Exception as e:
             # Don't fail execution if history save fails
             print(f"Failed to save execution history: {e}")
-            db.rollback()
     
     return CodeExecutionResponse(**result)
 
 
+@router.post("/inputs", response_model=ExecutionInput, status_code=status.HTTP_201_CREATED)
+async def upload_input(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload standard input for executions as the raw request body
+    
+    The body is streamed to disk, never held in memory, and stored under
+    its SHA-256 hash; pass the returned input_id as stdin_id to /execute.
+    Uploading the same content again reuses the user's stored copy.
+    """
+    try:
+        input_id, size = await get_input_store().save(current_user.id, request.stream())
+    except InputTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    return ExecutionInput(input_id=input_id, size=size)
+
+
+@router.head("/inputs/{input_id}")
+def check_input(
+    input_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Check whether the user has an input stored (clients can skip re-uploading it)"""
+    path = get_input_store().path(current_user.id, input_id)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Input not found or expired"
+        )
+    return Response(headers={"Content-Length": str(os.path.getsize(path))})
+
+
+@router.get("/outputs/{output_id}")
+def get_full_output(
+    output_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the full output of an execution whose output was previewed
+    
+    Supports a single "Range: bytes=start-end" header (206 Partial
+    Content). Outputs expire after OUTPUT_RETENTION_HOURS.
+    """
+    path = get_output_store().path(current_user.id, output_id)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Output not found or expired"
+        )
+    
+    size = os.path.getsize(path)
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail=str(e),
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    
+    start, end = byte_range or (0, size)
+    headers = {"Accept-Ranges": "bytes", "Content-Length": str(end - start)}
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    return StreamingResponse(
+        iter_file_range(path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+        media_type="text/plain; charset=utf-8",
+        headers=headers
+    )
+
+
 @router.get("/history", response_model=List[CodeExecutionHistory])
 def get_execution_history(
+    response: Response,
     project_id: int = None,
-    limit: int = 50,
+    limit: int = Query(50, ge=1),
+    cursor: Optional[str] = None,
+    summary: bool = Query(False, description="Return slim entries with text previews"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    preview: Optional[int] = Query(None, ge=1, description="Truncate text fields to this many characters"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_history_db)
 ):
     """
     Get user's code execution history
     
-    Optionally filter by project_id
+    Optionally filter by project_id. Results are newest first; when more
+    rows exist, the cursor for the next page is returned in the
+    X-Next-Cursor header and can be passed back as ?cursor=
+    
+    summary=true returns CodeExecutionSummary entries (metadata plus code,
+    output and error previews), fields= returns only the listed fields (not
+    combined with summary). Text that isn't needed is never loaded, and
+    previews read only a prefix of each text; the full record is available
+    from /history/{id}.
     """
-    query = db.query(CodeExecution).filter(CodeExecution.user_id == current_user.id)
+    requested = _parse_fields(fields)
+    if summary:
+        if requested is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Pass either summary or fields, not both"
+            )
+        load_fields = SUMMARY_FIELDS
+        preview = preview or settings.HISTORY_PREVIEW_CHARS
+    else:
+        load_fields = requested or HISTORY_FIELDS
+    
+    query = db.query(CodeExecution).options(*_history_load_options(load_fields, preview)).filter(
+        CodeExecution.user_id == current_user.id
+    )
     
     if project_id:
         query = query.filter(CodeExecution.project_id == project_id)
     
-    executions = query.order_by(CodeExecution.created_at.desc()).limit(limit).all()
-    return executions
+    after = decode_cursor(cursor, "created_at", "id")
+    if after:
+        try:
+            created_at, execution_id = datetime.fromisoformat(after[0]), int(after[1])
+        except (ValueError, TypeError):
+            raise invalid_cursor()
+        query = query.filter(or_(
+            CodeExecution.created_at < created_at,
+            and_(CodeExecution.created_at == created_at, CodeExecution.id < execution_id)
+        ))
+    
+    executions = query.order_by(
+        CodeExecution.created_at.desc(), CodeExecution.id.desc()
+    ).limit(limit + 1).all()
+    
+    headers = {}
+    if len(executions) > limit:
+        executions = executions[:limit]
+        last = executions[-1]
+        headers["X-Next-Cursor"] = encode_cursor(
+            created_at=last.created_at.isoformat(), id=last.id
+        )
+    
+    if not summary and requested is None and preview is None:
+        response.headers.update(headers)
+        return executions
+    
+    previews = None
+    if preview:
+        previews = load_blob_previews(db, (
+            getattr(execution, EXECUTION_BLOB_FIELDS[field])
+            for execution in executions for field in load_fields if field in EXECUTION_BLOB_FIELDS
+        ), preview)
+    
+    # Slim and sparse entries skip validation against the full history model
+    if summary:
+        records = [
+            CodeExecutionSummary(
+                **{field: getattr(execution, field) for field in SUMMARY_FIELDS if field not in EXECUTION_BLOB_FIELDS},
+                code_preview=_history_text(execution, "code", previews),
+                output_preview=_history_text(execution, "output", previews),
+                error_preview=_history_text(execution, "error", previews),
+            ).model_dump(mode="json")
+            for execution in executions
+        ]
+    else:
+        records = jsonable_encoder([
+            {
+                field: _history_text(execution, field, previews)
+                if field in EXECUTION_BLOB_FIELDS else getattr(execution, field)
+                for field in load_fields
+            }
+            for execution in executions
+        ])
+    return FastJSONResponse(records, headers=headers)
+
+
+@router.get("/history/export")
+def export_execution_history(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    compress: bool = Query(False, description="gzip the file"),
+    project_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export all of the user's executions, oldest first
+    
+    Streams NDJSON (one history record per line) or CSV, reading rows in
+    batches so memory use doesn't depend on the number of executions.
+    Archived executions are not included.
+    """
+    flush_history(request, current_user.id)
+    filters = [CodeExecution.user_id == current_user.id]
+    if project_id:
+        filters.append(CodeExecution.project_id == project_id)
+    return history_export_response(request, filters, format, compress)
+
+
+@router.get("/history/archived", response_model=List[CodeExecutionHistory])
+def get_archived_history(
+    project_id: int = None,
+    limit: int = Query(50, ge=1),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get user's archived code executions
+    
+    Executions past the retention policy are moved out of the database
+    into cold storage; this reads them back, newest first
+    """
+    return get_history_archiver().list_archived(current_user.id, project_id, limit)
+
+
+@router.get("/history/archived/{execution_id}", response_model=CodeExecutionHistory)
+def get_archived_execution(
+    execution_id: int,
+    current_user: User = Depends(get_current_user)
+):
+    """Get a specific archived execution by ID"""
+    execution = get_history_archiver().get_archived(current_user.id, execution_id)
+    if not execution:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archived execution not found"
+        )
+    return execution
 
 
 @router.get("/history/{execution_id}", response_model=CodeExecutionHistory)
 def get_execution_by_id(
     execution_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_history_db)
 ):
     """Get a specific execution by ID"""
     execution = db.query(CodeExecution).filter(
@@ -124,6 +466,8 @@ def delete_execution(
         )
     
     db.delete(execution)
+    remove_executions(db, Counter({current_user.id: 1}))
+    mark_analytics_stale(db, [current_user.id])
     db.commit()
     
     return {"message": "Execution deleted successfully"}
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.core.database import get_read_db
+from app.models.user import User
+from app.schemas.leaderboard import Leaderboard, LeaderboardMetric, LeaderboardPosition
+from app.services.leaderboards import get_leaderboards
+from app.api.v1.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/{metric}", response_model=Leaderboard)
+def get_leaderboard(
+    metric: LeaderboardMetric,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get the top users by completed projects, time spent or executions
+    
+    Served from the maintained ranking; only usernames are read from the database
+    """
+    leaderboards = get_leaderboards()
+    ranked = leaderboards.top(metric.value, limit, offset)
+    usernames = dict(db.query(User.id, User.username).filter(
+        User.id.in_([user_id for user_id, _ in ranked])
+    ).all()) if ranked else {}
+    
+    return {
+        "metric": metric,
+        "total_users": leaderboards.size(metric.value),
+        "entries": [
+            {"rank": offset + position, "user_id": user_id, "username": usernames.get(user_id, ""), "score": score}
+            for position, (user_id, score) in enumerate(ranked, start=1)
+        ],
+    }
+
+
+@router.get("/{metric}/me", response_model=LeaderboardPosition)
+def get_my_position(
+    metric: LeaderboardMetric,
+    current_user: User = Depends(get_current_user)
+):
+    """Get the current user's rank and score"""
+    leaderboards = get_leaderboards()
+    position = leaderboards.rank(metric.value, current_user.id)
+    rank, score = position if position else (None, 0)
+    return {
+        "metric": metric,
+        "total_users": leaderboards.size(metric.value),
+        "rank": rank,
+        "score": score,
+    }
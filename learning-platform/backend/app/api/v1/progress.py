@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.core.database import get_db
+from datetime import datetime
+from app.core.database import get_db, get_read_db, dialect_insert
 from app.models.progress import UserProgress, ProgressStatus
 from app.models.user import User
-from app.schemas.progress import ProgressResponse, ProgressUpdate
+from app.core.config import settings
+from app.models.summary import UserSummary
+from app.schemas.progress import (
+    ProgressResponse, ProgressUpdate, ProgressRoadmap, ProgressHeartbeat, ProgressSummary
+)
+from app.services.project_catalog import get_project_catalog
+from app.services.progress_heartbeats import get_progress_heartbeats, apply_pending
+from app.services.user_summary import empty_summary, current_streak, update_user_summaries
 from app.api.v1.auth import get_current_user
 
 router = APIRouter()
@@ -13,66 +21,188 @@ router = APIRouter()
 @router.get("/", response_model=List[ProgressResponse])
 def get_user_progress(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
+):
+    """Get all progress for current user, including unflushed heartbeats"""
+    heartbeats = get_progress_heartbeats()
+    pending = heartbeats.pending_for_user(current_user.id)
+    query = db.query(UserProgress).filter(UserProgress.user_id == current_user.id)
+    progress_list = query.all()
+    
+    # Heartbeats for projects without a progress row yet create the row on flush
+    if pending.keys() - {progress.project_id for progress in progress_list}:
+        heartbeats.flush()
+        pending = heartbeats.pending_for_user(current_user.id)
+        db.expire_all()
+        progress_list = query.all()
+    
+    return [
+        apply_pending(ProgressResponse.model_validate(progress).model_dump(), pending[progress.project_id])
+        if progress.project_id in pending else progress
+        for progress in progress_list
+    ]
+
+
+@router.get("/roadmap", response_model=ProgressRoadmap)
+def get_roadmap(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    """Get all progress for current user"""
-    progress_list = db.query(UserProgress).filter(
+    """
+    Get which projects are completed, unlocked, locked and recommended next
+    
+    Computed from the cached prerequisite graph and one progress query
+    """
+    statuses = dict(db.query(UserProgress.project_id, UserProgress.status).filter(
         UserProgress.user_id == current_user.id
-    ).all()
-    return progress_list
+    ).all())
+    
+    snapshot = get_project_catalog().snapshot()
+    roadmap = snapshot.graph.roadmap(statuses, recommend=settings.RECOMMENDATION_COUNT)
+    roadmap["recommended"] = [snapshot.by_id[project_id] for project_id in roadmap["recommended"]]
+    return roadmap
+
+
+@router.get("/summary", response_model=ProgressSummary)
+def get_summary(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get dashboard totals: per-phase completion, time spent, streaks and activity
+    
+    One primary-key read of the user's summary row (maintained on write)
+    plus the cached catalog and unflushed heartbeats
+    """
+    row = db.get(UserSummary, current_user.id)
+    summary = empty_summary(current_user.id)
+    if row is not None:
+        summary.update({column: getattr(row, column) for column in summary})
+    
+    pending = get_progress_heartbeats().pending_for_user(current_user.id)
+    summary["total_time_spent"] += sum(delta["time_spent"] for delta in pending.values())
+    
+    phase_totals = {}
+    for project in get_project_catalog().snapshot().projects:
+        phase_totals[project["phase"]] = phase_totals.get(project["phase"], 0) + 1
+    
+    return {
+        **summary,
+        "current_streak": current_streak(summary),
+        "total_projects": sum(phase_totals.values()),
+        "phases": [
+            {"phase": phase, "completed": summary["completed_by_phase"].get(phase, 0), "total": total}
+            for phase, total in phase_totals.items()
+        ],
+    }
 
 
 @router.get("/{project_id}", response_model=ProgressResponse)
 def get_project_progress(
     project_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get progress for a specific project"""
-    progress = db.query(UserProgress).filter(
+    """Get progress for a specific project, including unflushed heartbeats"""
+    heartbeats = get_progress_heartbeats()
+    query = db.query(UserProgress).filter(
         UserProgress.user_id == current_user.id,
         UserProgress.project_id == project_id
-    ).first()
+    )
+    progress = query.first()
+    delta = heartbeats.pending_for_user(current_user.id).get(project_id)
+    
+    if not progress and delta:
+        heartbeats.flush()
+        delta = heartbeats.pending_for_user(current_user.id).get(project_id)
+        progress = query.first()
     
     if not progress:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Progress not found"
         )
+    if delta:
+        return apply_pending(ProgressResponse.model_validate(progress).model_dump(), delta)
     return progress
 
 
+@router.post("/{project_id}/heartbeat", status_code=status.HTTP_204_NO_CONTENT)
+def progress_heartbeat(
+    project_id: int,
+    heartbeat: ProgressHeartbeat,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Report time spent (as an increment) and completion from the editor
+    
+    Heartbeats are merged in memory and applied to the progress row in
+    batches; reads include heartbeats that haven't been written yet.
+    """
+    _require_project(project_id)
+    
+    get_progress_heartbeats().add(
+        current_user.id,
+        project_id,
+        time_spent=heartbeat.time_spent,
+        completion_percentage=heartbeat.completion_percentage
+    )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def _require_project(project_id: int) -> None:
+    """404 unless the project exists (upserts would otherwise create orphan rows)"""
+    if project_id not in get_project_catalog().snapshot().by_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+
+def _upsert_progress(db: Session, user_id: int, project_id: int, values: dict, on_conflict: dict):
+    """
+    Insert a progress row or update the existing one in a single statement
+    
+    Args:
+        values: Column values for a new row (besides user and project)
+        on_conflict: Column values to set when the row already exists
+    """
+    now = datetime.utcnow()
+    insert = dialect_insert(db.get_bind())
+    statement = insert(UserProgress).values(
+        user_id=user_id,
+        project_id=project_id,
+        updated_at=now,
+        **values
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[UserProgress.user_id, UserProgress.project_id],
+        set_={"updated_at": now, **on_conflict}
+    ).returning(UserProgress)
+    progress = db.scalars(statement, execution_options={"populate_existing": True}).one()
+    
+    update_user_summaries(db, progress_users=[user_id], activity={user_id: now})
+    
+    # Serialize before commit expires the row, saving a refresh query
+    response = ProgressResponse.model_validate(progress)
+    db.commit()
+    return response
+
+
 @router.post("/", response_model=ProgressResponse, status_code=status.HTTP_201_CREATED)
 def create_progress(
     project_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Create or update progress for a project"""
-    # Check if progress already exists
-    progress = db.query(UserProgress).filter(
-        UserProgress.user_id == current_user.id,
-        UserProgress.project_id == project_id
-    ).first()
-    
-    if progress:
-        # Update last accessed
-        from datetime import datetime
-        progress.last_accessed = datetime.utcnow()
-        db.commit()
-        db.refresh(progress)
-        return progress
-    
-    # Create new progress
-    progress = UserProgress(
-        user_id=current_user.id,
-        project_id=project_id,
-        status=ProgressStatus.IN_PROGRESS.value
+    """Create progress for a project, or mark existing progress as accessed"""
+    _require_project(project_id)
+    now = datetime.utcnow()
+    return _upsert_progress(
+        db, current_user.id, project_id,
+        values={"status": ProgressStatus.IN_PROGRESS.value, "last_accessed": now},
+        on_conflict={"last_accessed": now}
     )
-    db.add(progress)
-    db.commit()
-    db.refresh(progress)
-    return progress
 
 
 @router.put("/{project_id}", response_model=ProgressResponse)
@@ -82,32 +212,25 @@ def update_progress(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Update progress for a project"""
-    progress = db.query(UserProgress).filter(
-        UserProgress.user_id == current_user.id,
-        UserProgress.project_id == project_id
-    ).first()
-    
-    if not progress:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Progress not found"
-        )
+    """Update progress for a project, creating it if needed"""
+    _require_project(project_id)
+    # Apply earlier heartbeats first so they don't land on top of these values
+    get_progress_heartbeats().flush_for_user(current_user.id)
     
-    # Update fields
+    fields = {}
     if progress_update.status:
-        progress.status = progress_update.status.value
+        fields["status"] = progress_update.status.value
     if progress_update.completion_percentage is not None:
-        progress.completion_percentage = progress_update.completion_percentage
+        fields["completion_percentage"] = progress_update.completion_percentage
     if progress_update.time_spent is not None:
-        progress.time_spent = progress_update.time_spent
+        fields["time_spent"] = progress_update.time_spent
     
     # Update completed_at if status is completed
     if progress_update.status == ProgressStatus.COMPLETED:
-        from datetime import datetime
-        progress.completed_at = datetime.utcnow()
+        fields["completed_at"] = datetime.utcnow()
     
-    db.commit()
-    db.refresh(progress)
-    return progress
-
+    return _upsert_progress(
+        db, current_user.id, project_id,
+        values={"status": ProgressStatus.IN_PROGRESS.value, **fields},
+        on_conflict=fields
+    )
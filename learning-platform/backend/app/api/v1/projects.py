@@ -1,57 +1,129 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from collections import Counter
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.core.database import get_db
-from app.models.project import Project
-from app.models.user import User
-from app.schemas.project import ProjectResponse, ProjectList
-from app.api.v1.auth import get_current_user
+from typing import Optional
+from app.core.database import get_read_db
+from app.core.etag import etag_json_response
+from app.core.pagination import encode_cursor, decode_cursor, invalid_cursor
+from app.schemas.project import ProjectResponse, ProjectList, ProjectSearchResults
+from app.services.project_catalog import get_project_catalog
+from app.services.project_search import search_project_ids
 
 router = APIRouter()
 
 
 @router.get("/", response_model=ProjectList)
 def list_projects(
+    request: Request,
     phase: Optional[str] = None,
     difficulty: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None
 ):
-    """List all projects with optional filters"""
-    query = db.query(Project)
+    """
+    List all projects with optional filters
     
-    if phase:
-        query = query.filter(Project.phase == phase)
-    if difficulty:
-        query = query.filter(Project.difficulty == difficulty)
+    Served from the in-memory catalog with a strong ETag; send it back in
+    If-None-Match to get 304 Not Modified. Pass the returned next_cursor
+    back as ?cursor= to fetch the next page.
+    """
+    after = decode_cursor(cursor, "project_number")
+    if after:
+        try:
+            after = int(after[0])
+        except (ValueError, TypeError):
+            raise invalid_cursor()
     
-    total = query.count()
-    projects = query.order_by(Project.project_number).offset(skip).limit(limit).all()
+    def build():
+        projects = [
+            project for project in snapshot.projects
+            if (not phase or project["phase"] == phase)
+            and (not difficulty or project["difficulty"] == difficulty)
+        ]
+        total = len(projects)
+        if after is not None:
+            projects = [p for p in projects if p["project_number"] > after]
+        else:
+            projects = projects[skip:]
+        
+        next_cursor = None
+        if len(projects) > limit:
+            projects = projects[:limit]
+            next_cursor = encode_cursor(project_number=projects[-1]["project_number"])
+        return {"projects": projects, "total": total, "next_cursor": next_cursor}
     
-    return ProjectList(projects=projects, total=total)
+    snapshot = get_project_catalog().snapshot()
+    body, etag = snapshot.render(("list", phase, difficulty, skip, limit, after), build)
+    return etag_json_response(request, body, etag)
 
 
-@router.get("/{project_id}", response_model=ProjectResponse)
-def get_project(project_id: int, db: Session = Depends(get_db)):
-    """Get a specific project by ID"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+@router.get("/search", response_model=ProjectSearchResults)
+def search_projects(
+    q: str = Query(..., min_length=1, description="Search terms (prefixes match)"),
+    phase: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Full-text search over project title, description and concept
+    
+    Results are ranked by relevance. Facets count the matches per phase and
+    difficulty, each ignoring its own filter so clients can show
+    alternatives next to the active one.
+    """
+    snapshot = get_project_catalog().snapshot()
+    matches = [
+        (snapshot.by_id[project_id], score)
+        for project_id, score in search_project_ids(db, q)
+        if project_id in snapshot.by_id
+    ]
+    
+    phase_counts = Counter(
+        project["phase"] for project, _ in matches
+        if not difficulty or project["difficulty"] == difficulty
+    )
+    difficulty_counts = Counter(
+        project["difficulty"] for project, _ in matches
+        if not phase or project["phase"] == phase
+    )
+    hits = [
+        {"project": project, "score": score}
+        for project, score in matches
+        if (not phase or project["phase"] == phase)
+        and (not difficulty or project["difficulty"] == difficulty)
+    ]
+    
+    return {
+        "results": hits[:limit],
+        "total": len(hits),
+        "facets": {"phase": dict(phase_counts), "difficulty": dict(difficulty_counts)},
+    }
+
+
+def _project_response(request: Request, snapshot, project: Optional[dict], key: tuple) -> Response:
+    """Serve one catalog project with an ETag, or 404"""
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
-    return project
+    body, etag = snapshot.render(key, lambda: project)
+    return etag_json_response(request, body, etag)
+
+
+@router.get("/{project_id}", response_model=ProjectResponse)
+def get_project(project_id: int, request: Request):
+    """Get a specific project by ID"""
+    snapshot = get_project_catalog().snapshot()
+    project = snapshot.by_id.get(project_id)
+    return _project_response(request, snapshot, project, ("id", project_id))
 
 
 @router.get("/number/{project_number}", response_model=ProjectResponse)
-def get_project_by_number(project_number: int, db: Session = Depends(get_db)):
+def get_project_by_number(project_number: int, request: Request):
     """Get a project by project number"""
-    project = db.query(Project).filter(Project.project_number == project_number).first()
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Project not found"
-        )
-    return project
-
+    snapshot = get_project_catalog().snapshot()
+    project = snapshot.by_number.get(project_number)
+    return _project_response(request, snapshot, project, ("number", project_number))
@@ -0,0 +1,177 @@
+"""
+Response Compression
+ASGI middleware that compresses responses with Brotli (when the brotli
+package is installed) or gzip, whichever the client prefers, once the body
+reaches a minimum size. Streaming responses are compressed chunk by chunk.
+"""
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, or None"""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        if name:
+            weights[name] = weight
+
+    default = weights.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best = max(candidates, key=lambda name: weights.get(name, default))
+    return best if weights.get(best, default) > 0 else None
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    """Encoded bytes differ from the original, so a strong validator no longer applies"""
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class _Compressor:
+    """Incremental gzip or Brotli compressor"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._gzip = None
+        else:
+            self._brotli = None
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it, so streamed output isn't held back"""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the last chunk and end the stream"""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._gzip.compress(data) + self._gzip.flush()
+
+
+class CompressionMiddleware:
+    """Negotiated gzip / Brotli compression with a size threshold"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressingResponder(self, encoding, send)(scope, receive, self.app)
+
+
+class _CompressingResponder:
+    """Compresses one response as its messages pass through"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, app: ASGIApp) -> None:
+        await app(scope, receive, self.send_compressed)
+
+    @staticmethod
+    def _compressible(start: Message) -> bool:
+        headers = Headers(raw=start["headers"])
+        content_type = headers.get("content-type", "")
+        return (
+            start["status"] not in (204, 206, 304)
+            and "content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        )
+
+    def _start_compressing(self, start: Message) -> None:
+        """Rewrite the start message's headers for an encoded body"""
+        headers = MutableHeaders(raw=start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["content-length"]
+        _weaken_etag(headers)
+        self.compressor = _Compressor(
+            self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+        )
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            # First body chunk: decide whether this response gets compressed
+            start, self.start_message = self.start_message, None
+            small = not more_body and len(body) < self.middleware.minimum_size
+            if small or not self._compressible(start):
+                if start["status"] == 304:
+                    # Match the ETag of the compressed 200 the client revalidates
+                    _weaken_etag(MutableHeaders(raw=start["headers"]))
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            self._start_compressing(start)
+            if more_body:
+                body = self.compressor.compress(body)
+            else:
+                body = self.compressor.finish(body)
+                MutableHeaders(raw=start["headers"])["Content-Length"] = str(len(body))
+            await self.send(start)
+        elif not self.passthrough:
+            body = self.compressor.compress(body) if more_body else self.compressor.finish(body)
+        else:
+            await self.send(message)
+            return
+
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -11,6 +11,34 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./learning_platform.db"
+    DATABASE_REPLICA_URL: str = ""  # optional read replica for GET endpoints
+    REPLICA_STICKINESS_SECONDS: float = 5.0  # reads stay on the primary after a write
+    
+    # Database engine (server databases such as PostgreSQL)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a pooled connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    
+    # Database engine (SQLite pragmas, applied on every new connection)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT: int = 5000  # milliseconds
+    SQLITE_CACHE_SIZE: int = -64000  # negative values are KiB (64 MB)
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes (256 MB)
+    
+    # SQL instrumentation (per-request query counts, slow query log, N+1 detection)
+    SQL_INSTRUMENTATION: bool = True
+    SLOW_QUERY_MS: float = 100.0
+    N_PLUS_ONE_THRESHOLD: int = 5  # identical statements per request
+    SQL_SLOWEST_KEPT: int = 3  # slowest statements remembered per request
+    SQL_DEBUG_HEADERS: bool = False  # X-DB-* response headers, which include SQL text
+    
+    # Project catalog cache
+    CATALOG_TTL_SECONDS: float = 60.0  # picks up writes from other processes
+    CATALOG_MAX_CACHED_RESPONSES: int = 1000  # rendered bodies per snapshot
+    RECOMMENDATION_COUNT: int = 3  # next projects suggested by /progress/roadmap
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -27,6 +55,75 @@ class Settings(BaseSettings):
     # Code Execution
     DOCKER_IMAGE: str = "python:3.11-slim"
     CODE_EXECUTION_TIMEOUT: int = 30
+    CODE_EXECUTION_MAX_CONCURRENT: int = 0  # sandboxes running at once; 0 is unlimited
+    
+    # Large execution output (spilled to disk, served in byte ranges until it expires)
+    OUTPUT_STORE_DIR: str = "./output_store"
+    OUTPUT_STORE_MAX_BYTES: int = 64 * 1024 * 1024  # per stream; the rest is only previewed
+    OUTPUT_RETENTION_HOURS: float = 24
+    OUTPUT_SWEEP_INTERVAL: int = 600  # seconds between deletions of expired outputs
+    
+    # Uploaded execution input (stored once per content hash, deleted when unused)
+    INPUT_STORE_DIR: str = "./input_store"
+    INPUT_MAX_BYTES: int = 64 * 1024 * 1024
+    INPUT_RETENTION_HOURS: float = 24  # since the input was last uploaded or used
+    INPUT_SWEEP_INTERVAL: int = 600  # seconds between deletions of unused inputs
+    
+    # Execution history write-behind buffer
+    HISTORY_WRITE_BEHIND: bool = True
+    HISTORY_FLUSH_SIZE: int = 100  # rows
+    HISTORY_FLUSH_INTERVAL: float = 1.0  # seconds
+    HISTORY_BUFFER_MAX: int = 10000  # rows kept for retry after failed flushes
+    BLOB_COMPRESSION_LEVEL: int = 6  # zlib level for stored code/output blobs
+    BLOB_GC_GRACE_SECONDS: int = 3600  # unreferenced blobs younger than this are kept
+    HISTORY_PREVIEW_CHARS: int = 200  # text preview length of summary history entries
+    EXPORT_BATCH_SIZE: int = 500  # executions read per batch by history exports
+    
+    # Response compression (Brotli if installed, else gzip)
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller bodies are sent as is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    
+    # Progress heartbeats (coalesced in memory, applied in batches)
+    PROGRESS_HEARTBEAT_BUFFERED: bool = True
+    PROGRESS_HEARTBEAT_FLUSH_INTERVAL: float = 5.0  # seconds
+    
+    # Execution history retention (a run is archived once it is older than
+    # HISTORY_RETENTION_DAYS and not among the newest HISTORY_RETENTION_KEEP_LAST
+    # runs of its user and project)
+    HISTORY_ARCHIVE_ENABLED: bool = False
+    HISTORY_RETENTION_DAYS: int = 90
+    HISTORY_RETENTION_KEEP_LAST: int = 100
+    HISTORY_ARCHIVE_DIR: str = "./archive"
+    HISTORY_ARCHIVE_BATCH_SIZE: int = 1000  # rows per delete transaction
+    HISTORY_ARCHIVE_INTERVAL: int = 3600  # seconds between archival runs
+    
+    # Leaderboards (in memory, or Redis sorted sets when USE_REDIS is on)
+    LEADERBOARD_RESYNC_INTERVAL: int = 300  # seconds between in-memory reloads
+    
+    # Execution statistics rollups (hourly, compacted into daily buckets)
+    ROLLUP_HOURLY_RETENTION_DAYS: int = 7
+    ROLLUP_COMPACTION_INTERVAL: int = 3600  # seconds between compaction runs
+    ROLLUP_FLUSH_INTERVAL: float = 5.0  # seconds executions are counted in memory
+    
+    # Instructor analytics (requires NumPy)
+    ANALYTICS_CHUNK_SIZE: int = 50000  # rows per streamed chunk
+    ANALYTICS_CACHE_TTL: int = 300  # seconds a cached report may be served
+    
+    # Prometheus metrics (/metrics)
+    METRICS_ENABLED: bool = True
+    
+    # Event loop watchdog (logs and counts callbacks that block the loop)
+    LOOP_WATCHDOG_ENABLED: bool = False
+    LOOP_WATCHDOG_THRESHOLD_MS: float = 100.0
+    
+    # Per-request profiling (signed X-Profile-Request header, or a sampled fraction)
+    PROFILE_SAMPLE_RATE: float = 0.0  # fraction of all requests to profile
+    PROFILE_INTERVAL_MS: float = 1.0
+    PROFILE_MAX_CONCURRENT: int = 2
+    PROFILE_TOKEN_TTL: int = 600  # seconds a profiling header token stays valid
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_MAX_STORED: int = 100
     
     # Redis (optional)
     REDIS_URL: str = "redis://localhost:6379"
@@ -1,16 +1,137 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import registry
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+
+def is_sqlite_url(url: str) -> bool:
+    """Check whether a database URL points at SQLite"""
+    return url.startswith("sqlite")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply performance pragmas to every new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str) -> Engine:
+    """
+    Create a database engine tuned for the given URL
+
+    SQLite gets WAL journaling, a busy timeout and cache/mmap pragmas so that
+    concurrent readers and writers don't fail with "database is locked".
+    Server databases get a sized connection pool with pre-ping and recycling.
+    """
+    if is_sqlite_url(url):
+        db_engine = create_engine(
+            url,
+            connect_args={
+                "check_same_thread": False,
+                "timeout": settings.SQLITE_BUSY_TIMEOUT / 1000,
+            },
+        )
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+        return db_engine
+
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+def dialect_insert(bind):
+    """Return the INSERT construct of the bound dialect (supports ON CONFLICT)"""
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+class WriteTracker:
+    """
+    Remembers which clients wrote recently, so their reads can stick to the
+    primary until replicas have caught up (read-your-writes)
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._last_write = {}
+        self._lock = threading.Lock()
+
+    def mark_write(self, key: Optional[str]) -> None:
+        """Record a write by the client identified by key"""
+        if not key or self.window <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._last_write[key] = now
+            if len(self._last_write) > 10000:
+                # Forget clients whose window has passed
+                self._last_write = {
+                    k: t for k, t in self._last_write.items() if now - t < self.window
+                }
+
+    def wrote_recently(self, key: Optional[str]) -> bool:
+        """Whether the client wrote within the stickiness window"""
+        if not key:
+            return False
+        last_write = self._last_write.get(key)
+        return last_write is not None and time.monotonic() - last_write < self.window
+
+
+# Create database engines (reads fall back to the primary without a replica)
+engine = create_db_engine(settings.DATABASE_URL)
+replica_engine = (
+    create_db_engine(settings.DATABASE_REPLICA_URL)
+    if settings.DATABASE_REPLICA_URL else engine
 )
 
-# Create session factory
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+write_tracker = WriteTracker(window=settings.REPLICA_STICKINESS_SECONDS)
+
+
+def _pool_stat(method: str):
+    """Read a connection pool statistic of each engine (pools without it are skipped)"""
+    def collect():
+        engines = {"primary": engine}
+        if replica_engine is not engine:
+            engines["replica"] = replica_engine
+        return {
+            (name,): getattr(db_engine.pool, method)()
+            for name, db_engine in engines.items() if hasattr(db_engine.pool, method)
+        }
+    return collect
+
+
+registry.callback("db_pool_size", "Connections kept in the pool", "gauge",
+                  _pool_stat("size"), ("database",))
+registry.callback("db_pool_checked_out", "Pooled connections in use", "gauge",
+                  _pool_stat("checkedout"), ("database",))
+registry.callback("db_pool_overflow", "Connections opened beyond the pool size", "gauge",
+                  _pool_stat("overflow"), ("database",))
 
 # Base class for models
 Base = declarative_base()
@@ -25,8 +146,52 @@ def get_db():
         db.close()
 
 
+def client_key(request: Request) -> Optional[str]:
+    """Identify the client for read-your-writes stickiness"""
+    return request.headers.get("authorization")
+
+
+def read_session_factory(request: Request) -> sessionmaker:
+    """
+    Session factory for a request's reads
+
+    GET requests are served from the replica, unless the same client wrote
+    within REPLICA_STICKINESS_SECONDS; everything else uses the primary.
+    """
+    use_replica = (
+        replica_engine is not engine
+        and request.method in ("GET", "HEAD")
+        and not write_tracker.wrote_recently(client_key(request))
+    )
+    return ReplicaSessionLocal if use_replica else SessionLocal
+
+
+def get_read_db(request: Request):
+    """Dependency to get a read-only database session (see read_session_factory)"""
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def init_db():
     """Initialize database tables"""
-    from app.models import user, project, progress, execution  # noqa
+    from app.models import user, project, progress, execution, blob, summary, rollup  # noqa
     Base.metadata.create_all(bind=engine)
-
+    
+    # create_all() skips tables that already exist, so add any indexes that
+    # were introduced after those tables were first created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except IntegrityError as e:
+                raise RuntimeError(
+                    f"Existing rows violate unique index {index.name}; "
+                    f"run the matching migrate_*.py script first"
+                ) from e
+    
+    # Full-text index over projects (FTS5 / tsvector, outside the ORM schema)
+    from app.services.project_search import create_search_index
+    create_search_index(engine)
@@ -0,0 +1,23 @@
+"""
+Conditional GET helpers (ETag / If-None-Match)
+"""
+from fastapi import Request, Response, status
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the client already holds the representation with this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def etag_json_response(request: Request, body: bytes, etag: str) -> Response:
+    """Serve a pre-rendered JSON body, or 304 if the client's copy is current"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
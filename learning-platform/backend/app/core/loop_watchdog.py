@@ -0,0 +1,215 @@
+"""
+Event Loop Watchdog
+Measures event-loop lag and catches callbacks that block the loop. A
+heartbeat task on the loop records how late it wakes up; a watchdog thread
+notices when the heartbeat stalls past the threshold and captures the loop
+thread's stack and the route being handled. Blocks are logged, counted in
+/metrics, and can be asserted on in tests.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger("app.loop")
+
+loop_lag = registry.histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a scheduled heartbeat",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+loop_blocks = registry.counter(
+    "event_loop_blocks_total", "Times a callback blocked the event loop past the threshold", ("route",)
+)
+
+# Requests being handled, by the task that runs their endpoint
+_request_scopes: Dict[asyncio.Task, Scope] = {}
+
+
+class EventLoopBlocked(AssertionError):
+    """Raised by LoopWatchdog.check() when the loop was blocked"""
+
+
+def _route_of(scope: Optional[Scope]) -> str:
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _is_idle(frame) -> bool:
+    """Whether a loop thread's innermost frame is the selector waiting for I/O"""
+    return frame.f_code.co_name == "select" and frame.f_code.co_filename.endswith("selectors.py")
+
+
+class LoopWatchdog:
+    """Detects event-loop blocking and reports the offending stack and route"""
+
+    def __init__(self, threshold: float = 0.1, max_reports: int = 100):
+        """
+        Initialize the watchdog
+
+        Args:
+            threshold: Seconds a callback may hold the loop before it is reported
+            max_reports: Recent block reports kept for check() and inspection
+        """
+        self.threshold = threshold
+        self.interval = threshold / 2  # heartbeat period
+        self.reports: Deque[Dict[str, Any]] = deque(maxlen=max_reports)
+        self.blocks = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._last_beat = 0.0
+        self._pending: Optional[Dict[str, Any]] = None  # captured while still blocked
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the heartbeat on the running loop and the watchdog thread"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop watching"""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def _beat(self) -> None:
+        """Wake up every interval and record how late the loop was"""
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            self._last_beat = now
+            loop_lag.observe(lag)
+            if lag >= self.threshold:
+                self._report(lag)
+            else:
+                self._pending = None
+
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop's stack while the heartbeat is stalled"""
+        poll = self.interval / 2
+        while not self._stopped.wait(poll):
+            stalled = time.monotonic() - self._last_beat - self.interval
+            if stalled < self.threshold or (self._pending is not None and not self._pending.get("idle")):
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            if _is_idle(frame):
+                # Waiting in the selector: no callback is running, the loop
+                # is late because another thread holds the GIL
+                self._pending = {"idle": True}
+                continue
+            task = getattr(asyncio.tasks, "_current_tasks", {}).get(self._loop)
+            self._pending = {
+                "route": _route_of(_request_scopes.get(task)),
+                "task": task.get_name() if task is not None else None,
+                "stack": "".join(traceback.format_stack(frame)),
+            }
+
+    def _report(self, lag: float) -> None:
+        """Record a block once the loop is running again"""
+        pending, self._pending = self._pending, None
+        if pending and pending.get("idle"):
+            return  # lag is in event_loop_lag_seconds, but nothing blocked the loop
+        report = {
+            "at": datetime.utcnow().isoformat(),
+            "duration": round(lag, 4),
+            "route": pending["route"] if pending else "unknown",
+            "task": pending["task"] if pending else None,
+            "stack": pending["stack"] if pending else None,
+        }
+        self.reports.append(report)
+        self.blocks += 1
+        loop_blocks.inc(report["route"])
+        logger.warning(
+            "Event loop blocked for %.0f ms on %s\n%s",
+            report["duration"] * 1000, report["route"],
+            report["stack"] or "(blocked too briefly to capture a stack)"
+        )
+
+    def check(self, since: int = 0) -> None:
+        """Raise EventLoopBlocked if the loop was blocked (after the first since blocks)"""
+        if self.blocks <= since:
+            return
+        reports = list(self.reports)[-(self.blocks - since):]
+        details = "\n".join(
+            f"- {report['duration'] * 1000:.0f} ms on {report['route']}\n{report['stack'] or ''}"
+            for report in reports
+        )
+        raise EventLoopBlocked(f"Event loop blocked {self.blocks - since} time(s):\n{details}")
+
+    @contextmanager
+    def no_blocking(self):
+        """
+        Assert that the enclosed code doesn't block the loop (for tests)
+
+        Use from test code running outside the event loop, e.g. around
+        TestClient requests.
+        """
+        before = self.blocks
+        yield
+        time.sleep(self.interval * 2)  # let the heartbeat report a block that just ended
+        self.check(since=before)
+
+
+class LoopWatchdogMiddleware:
+    """Records which request each task is handling, so blocks name their route"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        task = asyncio.current_task()
+        _request_scopes[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scopes.pop(task, None)
+
+
+# Global watchdog instance
+_loop_watchdog = None
+
+
+def get_loop_watchdog() -> LoopWatchdog:
+    """Get or create the event loop watchdog"""
+    global _loop_watchdog
+    if _loop_watchdog is None:
+        _loop_watchdog = LoopWatchdog(threshold=settings.LOOP_WATCHDOG_THRESHOLD_MS / 1000)
+    return _loop_watchdog
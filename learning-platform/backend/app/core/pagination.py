@@ -0,0 +1,43 @@
+"""
+Keyset (cursor) pagination helpers
+
+Cursors are opaque to clients: a URL-safe base64 encoding of the sort key of
+the last row on the current page. The next page is fetched with a
+``WHERE (sort_key) < (cursor)`` predicate that an index can seek to directly,
+so deep pages cost the same as the first one (unlike OFFSET).
+"""
+import base64
+import json
+from typing import Any, Optional, Tuple
+from fastapi import HTTPException, status
+
+
+def invalid_cursor() -> HTTPException:
+    """Error raised for cursors that can't be decoded"""
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+
+def encode_cursor(**values: Any) -> str:
+    """Encode a sort key into an opaque cursor string"""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], *keys: str) -> Optional[Tuple[Any, ...]]:
+    """
+    Decode a cursor string back into its sort key values
+
+    Returns None when no cursor was given. Raises 400 if the cursor is
+    malformed or doesn't carry every expected key.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return tuple(values[key] for key in keys)
+    except (ValueError, TypeError, KeyError):
+        raise invalid_cursor()
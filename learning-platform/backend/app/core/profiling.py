@@ -0,0 +1,347 @@
+"""
+Per-Request Profiling
+Profiles single requests with a sampling profiler, on demand: requests
+carrying a valid signed X-Profile-Request header (tokens come from the
+admin API), plus a random PROFILE_SAMPLE_RATE fraction of all requests.
+A sampler thread records the request's stacks every PROFILE_INTERVAL_MS:
+its task on the event loop (auth, async endpoints, the code executor),
+threadpool threads running its endpoint or dependencies (sync endpoints
+and their DB work), and the awaited coroutine chain while it waits.
+Unprofiled requests only pay for a header lookup.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+PROFILE_HEADER = "X-Profile-Request"
+PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+AWAIT_FRAME = "<await>"
+
+# Frame filenames are shown relative to these (backend, libraries, stdlib)
+_PATH_ROOTS = sorted({
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    *(path for key, path in sysconfig.get_paths().items() if key in ("purelib", "platlib", "stdlib")),
+}, key=len, reverse=True)
+
+
+def create_profile_token(ttl: int) -> Tuple[str, int]:
+    """A token for the profiling header, valid for ttl seconds"""
+    expires = int(time.time()) + ttl
+    return f"{expires}.{_sign(expires)}", expires
+
+
+def verify_profile_token(token: str) -> bool:
+    """Whether a profiling header token is authentic and unexpired"""
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _sign(int(expires)))
+
+
+def _sign(expires: int) -> str:
+    return hmac.new(
+        settings.SECRET_KEY.encode(), f"profile:{expires}".encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def _frame_label(frame) -> str:
+    """function (module path:line) for a stack frame"""
+    code = frame.f_code
+    filename = code.co_filename
+    for root in _PATH_ROOTS:
+        if filename.startswith(root + os.sep):
+            filename = filename[len(root) + 1:]
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame) -> List[Any]:
+    """Frames of a running thread, outermost first"""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _awaiting_stack(task: asyncio.Task) -> List[Any]:
+    """Frames of a suspended task's await chain, outermost first"""
+    frames = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return frames
+
+
+def _dependant_codes(dependant) -> Set[Any]:
+    """Code objects of an endpoint and all of its dependencies"""
+    codes = set()
+    pending = [dependant]
+    while pending:
+        current = pending.pop()
+        code = getattr(current.call, "__code__", None)
+        if code is not None:
+            codes.add(code)
+        pending.extend(current.dependencies)
+    return codes
+
+
+class RequestProfile:
+    """Sampled stacks of one request"""
+
+    def __init__(self, scope: Scope, interval: float):
+        self.id = uuid.uuid4().hex
+        self.scope = scope
+        self.interval = interval
+        self.started_at = datetime.utcnow()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._start = time.perf_counter()
+        self.duration = 0.0
+        self._task = asyncio.current_task()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._codes: Optional[Set[Any]] = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profile-{self.id[:8]}", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.duration = time.perf_counter() - self._start
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self._sample()
+            except Exception:
+                pass  # frames changed under us; skip this sample
+
+    def _request_codes(self) -> Set[Any]:
+        """Code of the matched endpoint and its dependencies, once routing is done"""
+        if self._codes is None:
+            route = self.scope.get("route")
+            dependant = getattr(route, "dependant", None)
+            if dependant is None:
+                return set()
+            self._codes = _dependant_codes(dependant)
+        return self._codes
+
+    def _add(self, frames: List[Any], leaf: Optional[str] = None) -> None:
+        labels = [_frame_label(frame) for frame in frames]
+        if leaf:
+            labels.append(leaf)
+        if labels:
+            self.stacks[";".join(labels)] += 1
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        sampled = False
+
+        current = getattr(asyncio.tasks, "_current_tasks", {}).get(self._loop)
+        if current is self._task and self._loop_thread in frames:
+            self._add(_thread_stack(frames[self._loop_thread]))
+            sampled = True
+
+        codes = self._request_codes()
+        if codes:
+            for thread_id, frame in frames.items():
+                if thread_id in (self._loop_thread, threading.get_ident()):
+                    continue
+                stack = _thread_stack(frame)
+                if any(f.f_code in codes for f in stack):
+                    self._add(stack)
+                    sampled = True
+
+        if not sampled and not self._task.done():
+            self._add(_awaiting_stack(self._task), leaf=AWAIT_FRAME)
+            sampled = True
+
+        if sampled:
+            self.samples += 1
+
+    def record(self, status_code: Optional[int]) -> Dict[str, Any]:
+        route = self.scope.get("route")
+        return {
+            "id": self.id,
+            "method": self.scope.get("method"),
+            "path": self.scope.get("path"),
+            "route": getattr(route, "path", None),
+            "status_code": status_code,
+            "started_at": self.started_at.isoformat(),
+            "duration": round(self.duration, 6),
+            "interval": self.interval,
+            "samples": self.samples,
+            "stacks": dict(self.stacks.most_common()),
+        }
+
+
+class ProfileStore:
+    """Recent request profiles as JSON files, oldest deleted beyond max_profiles"""
+
+    def __init__(self, root: str, max_profiles: int = 100):
+        self.root = root
+        self.max_profiles = max_profiles
+
+    def save(self, record: Dict[str, Any]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, f"{record['id']}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(record, f)
+        os.replace(path + ".tmp", path)
+        for stale in self._paths()[self.max_profiles:]:
+            try:
+                os.unlink(stale)
+            except FileNotFoundError:
+                pass
+
+    def _paths(self) -> List[str]:
+        """Profile files, newest first"""
+        if not os.path.isdir(self.root):
+            return []
+        entries = [entry for entry in os.scandir(self.root) if entry.name.endswith(".json")]
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        return [entry.path for entry in entries]
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of stored profiles, newest first"""
+        profiles = []
+        for path in self._paths():
+            try:
+                with open(path) as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            record.pop("stacks", None)
+            profiles.append(record)
+        return profiles
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(os.path.join(self.root, f"{profile_id}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+def render_folded(record: Dict[str, Any]) -> str:
+    """Collapsed stacks ("frame;frame;frame count"), for flamegraph.pl or speedscope"""
+    return "".join(f"{stack} {count}\n" for stack, count in record["stacks"].items())
+
+
+def render_tree(record: Dict[str, Any], min_percent: float = 0.5) -> str:
+    """Indented call tree with each node's share of the samples"""
+    tree: Dict[str, Any] = {}
+    total = 0
+    for stack, count in record["stacks"].items():
+        total += count
+        node = tree
+        for label in stack.split(";"):
+            child = node.setdefault(label, {"count": 0, "children": {}})
+            child["count"] += count
+            node = child["children"]
+
+    lines = [
+        f"{record['method']} {record['path']} ({record.get('route')}) - "
+        f"{record['duration'] * 1000:.1f} ms, {total} samples every {record['interval'] * 1000:.1f} ms"
+    ]
+
+    def walk(nodes: Dict[str, Any], depth: int) -> None:
+        for label, node in sorted(nodes.items(), key=lambda item: -item[1]["count"]):
+            percent = 100.0 * node["count"] / total
+            if percent < min_percent:
+                continue
+            lines.append(f"{'  ' * depth}{percent:5.1f}%  {label}")
+            walk(node["children"], depth + 1)
+
+    if total:
+        walk(tree, 0)
+    return "\n".join(lines) + "\n"
+
+
+class ProfilingMiddleware:
+    """Profiles requests that ask for it with a signed header, or are sampled"""
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 0.0, interval: float = 0.001,
+                 max_concurrent: int = 2):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self._header = PROFILE_HEADER.lower().encode()
+
+    def _wants_profile(self, scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == self._header:
+                return verify_profile_token(value.decode("latin-1"))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or self.active >= self.max_concurrent
+            or not self._wants_profile(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope, self.interval)
+        status_code = None
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile.id.encode())
+                ]
+            await send(message)
+
+        self.active += 1
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop()
+            self.active -= 1
+            try:
+                await asyncio.to_thread(get_profile_store().save, profile.record(status_code))
+            except Exception as e:
+                print(f"Failed to save request profile: {e}")
+
+
+# Global store instance
+_profile_store = None
+
+
+def get_profile_store() -> ProfileStore:
+    """Get or create the profile store"""
+    global _profile_store
+    if _profile_store is None:
+        _profile_store = ProfileStore(root=settings.PROFILE_DIR, max_profiles=settings.PROFILE_MAX_STORED)
+    return _profile_store
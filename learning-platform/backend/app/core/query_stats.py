@@ -0,0 +1,149 @@
+"""
+Per-request SQL instrumentation
+Counts and times every statement issued while handling a request, logs slow
+queries and flags statements repeated within one request (N+1 patterns)
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger("app.sql")
+
+
+class RequestQueryStats:
+    """SQL statistics of a single request"""
+
+    def __init__(self, route: str = ""):
+        self.route = route
+        self.count = 0
+        self.total_time = 0.0  # seconds
+        self.slowest: List[Tuple[float, str]] = []
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        """Record one executed statement"""
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+        self.slowest.append((duration, statement))
+        self.slowest.sort(reverse=True)
+        del self.slowest[settings.SQL_SLOWEST_KEPT:]
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """Statements run often enough within the request to look like N+1"""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= settings.N_PLUS_ONE_THRESHOLD
+        ]
+
+
+class QueryMetrics:
+    """Per-route SQL totals across requests"""
+
+    def __init__(self):
+        self._routes: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stats: RequestQueryStats) -> None:
+        """Add a finished request's statistics"""
+        with self._lock:
+            route = self._routes.setdefault(stats.route, {
+                "requests": 0,
+                "queries": 0,
+                "db_time": 0.0,
+                "max_queries": 0,
+                "n_plus_one": 0,
+            })
+            route["requests"] += 1
+            route["queries"] += stats.count
+            route["db_time"] += stats.total_time
+            route["max_queries"] = max(route["max_queries"], stats.count)
+            if stats.repeated():
+                route["n_plus_one"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Copy of the per-route totals"""
+        with self._lock:
+            return {route: dict(values) for route, values in self._routes.items()}
+
+
+def _route_totals(key: str):
+    return lambda: {(route,): values[key] for route, values in query_metrics.snapshot().items()}
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+query_metrics = QueryMetrics()
+
+registry.callback("db_queries_total", "SQL statements executed", "counter",
+                  _route_totals("queries"), ("route",))
+registry.callback("db_query_seconds_total", "Time spent in SQL statements", "counter",
+                  _route_totals("db_time"), ("route",))
+registry.callback("db_n_plus_one_requests_total", "Requests with repeated statements (possible N+1)",
+                  "counter", _route_totals("n_plus_one"), ("route",))
+
+
+def start_request_stats(route: str = "") -> RequestQueryStats:
+    """Begin collecting statistics for the current request"""
+    stats = RequestQueryStats(route)
+    _current_stats.set(stats)
+    return stats
+
+
+def finish_request_stats(stats: RequestQueryStats) -> None:
+    """Publish a finished request's statistics to metrics and the log"""
+    query_metrics.observe(stats)
+    for statement, count in stats.repeated():
+        logger.warning(
+            "Possible N+1 on %s: statement ran %d times: %s",
+            stats.route, count, statement[:500]
+        )
+
+
+def debug_headers(stats: RequestQueryStats) -> Dict[str, str]:
+    """Response headers describing the request's SQL activity"""
+    headers = {
+        "X-DB-Query-Count": str(stats.count),
+        "X-DB-Time-Ms": f"{stats.total_time * 1000:.2f}",
+    }
+    if stats.slowest:
+        duration, statement = stats.slowest[0]
+        headers["X-DB-Slowest"] = f"{duration * 1000:.2f}ms {' '.join(statement.split())[:200]}"
+    repeated = stats.repeated()
+    if repeated:
+        headers["X-DB-Repeated-Statements"] = str(len(repeated))
+    return headers
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    if duration * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s",
+            duration * 1000, stats.route if stats else "-", statement[:500]
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    start_times = context.connection.info.get("query_start_time") if context.connection else None
+    if start_times:
+        start_times.pop()
@@ -0,0 +1,27 @@
+"""
+Fast JSON Responses
+Renders JSON with orjson when it is installed (several times faster than the
+standard library for large payloads), falling back to json otherwise
+"""
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize JSON-compatible content to compact UTF-8 bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class of the API"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,7 +1,62 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
-from app.api.v1 import auth, projects, progress, code
+from app.core.compression import CompressionMiddleware
+from app.core.responses import FastJSONResponse
+from app.core.database import write_tracker, client_key
+from app.core.loop_watchdog import LoopWatchdogMiddleware, get_loop_watchdog
+from app.core.profiling import ProfilingMiddleware
+from app.core.metrics import registry, http_requests, http_request_duration, http_requests_in_flight
+from app.core.query_stats import start_request_stats, finish_request_stats, debug_headers
+from app.api.v1 import auth, projects, progress, code, admin, leaderboards
+from app.services.history_writer import get_history_writer
+from app.services.history_archive import get_history_archiver
+from app.services.progress_heartbeats import get_progress_heartbeats
+from app.services.leaderboards import get_leaderboards
+from app.services.execution_rollups import get_rollup_compactor, get_rollup_recorder
+from app.services.output_store import get_output_store
+from app.services.input_store import get_input_store
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background services and flush them on shutdown"""
+    loop_watchdog = get_loop_watchdog()
+    if settings.LOOP_WATCHDOG_ENABLED:
+        await loop_watchdog.start()
+    history_writer = get_history_writer()
+    history_archiver = get_history_archiver()
+    progress_heartbeats = get_progress_heartbeats()
+    leaderboard_service = get_leaderboards()
+    rollup_recorder = get_rollup_recorder()
+    rollup_compactor = get_rollup_compactor()
+    output_store = get_output_store()
+    input_store = get_input_store()
+    if settings.HISTORY_WRITE_BEHIND:
+        await history_writer.start()
+    if settings.HISTORY_ARCHIVE_ENABLED:
+        await history_archiver.start()
+    if settings.PROGRESS_HEARTBEAT_BUFFERED:
+        await progress_heartbeats.start()
+    await leaderboard_service.start()
+    await rollup_recorder.start()
+    await rollup_compactor.start()
+    await output_store.start()
+    await input_store.start()
+    yield
+    await input_store.stop()
+    await output_store.stop()
+    await rollup_compactor.stop()
+    await rollup_recorder.stop()
+    await leaderboard_service.stop()
+    await progress_heartbeats.stop()
+    await history_archiver.stop()
+    await history_writer.stop()
+    await loop_watchdog.stop()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -9,7 +64,9 @@ app = FastAPI(
     description="Interactive learning platform API",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -19,13 +76,85 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Content-Range", "X-Profile-Id"],
+)
+
+# Compress large responses (Brotli or gzip, as the client accepts)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
 )
 
+# Attribute event-loop blocks to the request being handled (opt-in)
+if settings.LOOP_WATCHDOG_ENABLED:
+    app.add_middleware(LoopWatchdogMiddleware)
+
+# Profile requests that carry a signed X-Profile-Request header, or are sampled
+app.add_middleware(
+    ProfilingMiddleware,
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    interval=settings.PROFILE_INTERVAL_MS / 1000,
+    max_concurrent=settings.PROFILE_MAX_CONCURRENT,
+)
+
+@app.middleware("http")
+async def track_writes(request: Request, call_next):
+    """Pin a client's reads to the primary for a while after it writes"""
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        write_tracker.mark_write(client_key(request))
+    return response
+
+
+@app.middleware("http")
+async def instrument_sql(request: Request, call_next):
+    """Collect SQL statistics per request (headers if SQL_DEBUG_HEADERS, metrics always)"""
+    if not settings.SQL_INSTRUMENTATION:
+        return await call_next(request)
+    
+    stats = start_request_stats(request.url.path)
+    response = await call_next(request)
+    route = request.scope.get("route")
+    stats.route = getattr(route, "path", "unmatched")
+    finish_request_stats(stats)
+    if settings.SQL_DEBUG_HEADERS:
+        response.headers.update(debug_headers(stats))
+    return response
+
+
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count and time requests per route template for /metrics"""
+    if not settings.METRICS_ENABLED:
+        return await call_next(request)
+    
+    start = time.perf_counter()
+    status_code = 500
+    http_requests_in_flight.inc()
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        http_requests_in_flight.dec()
+        method = request.method if request.method in HTTP_METHODS else "OTHER"
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        http_requests.inc(method, route, str(status_code))
+        http_request_duration.observe(time.perf_counter() - start, method, route)
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["authentication"])
 app.include_router(projects.router, prefix="/api/v1/projects", tags=["projects"])
 app.include_router(progress.router, prefix="/api/v1/progress", tags=["progress"])
 app.include_router(code.router, prefix="/api/v1/code", tags=["code"])
+app.include_router(leaderboards.router, prefix="/api/v1/leaderboards", tags=["leaderboards"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
 
 
 @app.get("/")
@@ -38,8 +167,22 @@ def read_root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics in the text exposition format"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "history_buffer": get_history_writer().stats(),
+        "progress_heartbeats": get_progress_heartbeats().stats()
+    }
 
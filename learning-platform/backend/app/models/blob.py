@@ -0,0 +1,39 @@
+"""
+Content-Addressed Blob Models
+"""
+import zlib
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from app.core.database import Base
+from datetime import datetime
+
+
+class BlobCompression:
+    """Compression codecs for stored blobs"""
+    NONE = "none"
+    ZLIB = "zlib"
+
+
+class ContentBlob(Base):
+    """Immutable text content keyed by its SHA-256 hash"""
+    __tablename__ = "content_blobs"
+
+    hash = Column(String(64), primary_key=True)
+    compression = Column(String, nullable=False, default=BlobCompression.ZLIB)
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)  # uncompressed bytes
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Refreshed whenever an execution stores this content again, so garbage
+    # collection spares blobs that a commit in flight is about to reference
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    @property
+    def text(self) -> str:
+        """Decompressed content"""
+        cached = self.__dict__.get("_text")
+        if cached is None:
+            if self.compression == BlobCompression.ZLIB:
+                raw = zlib.decompress(self.data)
+            else:
+                raw = self.data
+            cached = self.__dict__["_text"] = raw.decode()
+        return cached
@@ -1,31 +1,41 @@
 """
 Code Execution Models
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.blob import ContentBlob
 from datetime import datetime
+from typing import Optional
 
 
 class CodeExecution(Base):
     """Model for storing code execution history"""
     __tablename__ = "code_executions"
+    __table_args__ = (
+        # Keyset pagination of history: newest first, per user and per project
+        Index("ix_code_executions_user_created", "user_id", "created_at", "id"),
+        Index("ix_code_executions_user_project_created", "user_id", "project_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
     
-    # Code details
+    # Code details (text lives in content_blobs, referenced by hash)
     language = Column(String, nullable=False, default="python")
-    code = Column(Text, nullable=False)
-    stdin = Column(Text, nullable=True)
+    code_hash = Column(String(64), ForeignKey("content_blobs.hash"), nullable=False)
+    stdin_hash = Column(String(64), ForeignKey("content_blobs.hash"), nullable=True)
     
     # Execution results
-    output = Column(Text, nullable=True)
-    error = Column(Text, nullable=True)
+    output_hash = Column(String(64), ForeignKey("content_blobs.hash"), nullable=True)
+    error_hash = Column(String(64), ForeignKey("content_blobs.hash"), nullable=True)
     execution_time = Column(Float, nullable=False)  # seconds
     status = Column(String, nullable=False)  # success, error, timeout
     exit_code = Column(Integer, nullable=True)
+    # Full output in the output store when output/error are head/tail previews
+    output_id = Column(String(32), nullable=True)
+    error_id = Column(String(32), nullable=True)
     
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -33,6 +43,30 @@ class CodeExecution(Base):
     # Relationships
     user = relationship("User", back_populates="code_executions")
     project = relationship("Project")
+    code_blob = relationship(ContentBlob, foreign_keys=[code_hash], lazy="selectin")
+    stdin_blob = relationship(ContentBlob, foreign_keys=[stdin_hash], lazy="selectin")
+    output_blob = relationship(ContentBlob, foreign_keys=[output_hash], lazy="selectin")
+    error_blob = relationship(ContentBlob, foreign_keys=[error_hash], lazy="selectin")
+    
+    @property
+    def code(self) -> Optional[str]:
+        """Source code, loaded from its content blob"""
+        return self.code_blob.text if self.code_blob else None
+    
+    @property
+    def stdin(self) -> Optional[str]:
+        """Standard input, loaded from its content blob"""
+        return self.stdin_blob.text if self.stdin_blob else None
+    
+    @property
+    def output(self) -> Optional[str]:
+        """Program output, loaded from its content blob"""
+        return self.output_blob.text if self.output_blob else None
+    
+    @property
+    def error(self) -> Optional[str]:
+        """Error output, loaded from its content blob"""
+        return self.error_blob.text if self.error_blob else None
 
 
 # Add relationship to User model
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -15,6 +15,10 @@ class ProgressStatus(str, enum.Enum):
 class UserProgress(Base):
     """User progress model"""
     __tablename__ = "user_progress"
+    __table_args__ = (
+        # One row per user and project; also the conflict target of upserts
+        Index("uq_user_progress_user_project", "user_id", "project_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
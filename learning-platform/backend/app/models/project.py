@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -25,6 +25,11 @@ class ProjectDifficulty(str, enum.Enum):
 class Project(Base):
     """Project model"""
     __tablename__ = "projects"
+    __table_args__ = (
+        # Keyset pagination of filtered catalog listings
+        Index("ix_projects_phase_number", "phase", "project_number"),
+        Index("ix_projects_difficulty_number", "difficulty", "project_number"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     project_number = Column(Integer, unique=True, nullable=False, index=True)
@@ -0,0 +1,47 @@
+"""
+Execution Statistics Rollup Models
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index
+from app.core.database import Base
+
+
+class RollupGranularity:
+    """Bucket sizes of execution rollups"""
+    HOUR = "hour"
+    DAY = "day"
+
+
+class ExecutionRollup(Base):
+    """Execution counts and timings of one language and project in one time bucket"""
+    __tablename__ = "execution_rollups"
+    __table_args__ = (
+        Index(
+            "uq_execution_rollups_bucket",
+            "granularity", "bucket_start", "language", "project_id",
+            unique=True
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    granularity = Column(String(4), nullable=False)  # hour, day
+    bucket_start = Column(DateTime, nullable=False)
+    language = Column(String, nullable=False)
+    project_id = Column(Integer, nullable=False, default=0)  # 0 = no project
+
+    executions = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    timeouts = Column(Integer, nullable=False, default=0)
+    total_time = Column(Float, nullable=False, default=0.0)  # seconds
+    max_time = Column(Float, nullable=False, default=0.0)  # seconds
+
+
+class ExecutionRollupBin(Base):
+    """Count of executions of a rollup bucket within one latency histogram bin"""
+    __tablename__ = "execution_rollup_bins"
+
+    granularity = Column(String(4), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    language = Column(String, primary_key=True)
+    project_id = Column(Integer, primary_key=True)
+    bin = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
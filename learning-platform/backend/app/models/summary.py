@@ -0,0 +1,27 @@
+"""
+User Dashboard Summary Models
+"""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON
+from app.core.database import Base
+from datetime import datetime
+
+
+class UserSummary(Base):
+    """Per-user dashboard totals, kept up to date as progress and executions change"""
+    __tablename__ = "user_summaries"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+
+    # Derived from user_progress
+    completed_count = Column(Integer, nullable=False, default=0)
+    in_progress_count = Column(Integer, nullable=False, default=0)
+    completed_by_phase = Column(JSON, nullable=False, default=dict)  # {phase: count}
+    total_time_spent = Column(Integer, nullable=False, default=0)  # in seconds
+
+    # Derived from activity (progress writes and code executions)
+    executions_count = Column(Integer, nullable=False, default=0)
+    current_streak = Column(Integer, nullable=False, default=0)  # consecutive active days
+    longest_streak = Column(Integer, nullable=False, default=0)
+    last_activity_at = Column(DateTime, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -11,6 +11,10 @@ class CodeExecutionRequest(BaseModel):
     code: str = Field(..., description="Source code to execute", max_length=50000)
     language: str = Field(default="python", description="Programming language")
     stdin: Optional[str] = Field(None, description="Standard input for the program")
+    stdin_id: Optional[str] = Field(
+        None, description="ID of an uploaded input to stream as standard input instead",
+        pattern=r"^[0-9a-f]{64}$"
+    )
     project_id: Optional[int] = Field(None, description="Associated project ID")
     save_history: bool = Field(default=True, description="Whether to save execution in history")
 
@@ -22,6 +26,8 @@ class CodeExecutionResponse(BaseModel):
     execution_time: float = Field(description="Execution time in seconds")
     status: str = Field(description="Execution status: success, error, or timeout")
     exit_code: int = Field(description="Process exit code")
+    output_id: Optional[str] = Field(None, description="ID of the full output when output is a head/tail preview")
+    error_id: Optional[str] = Field(None, description="ID of the full error output when error is a head/tail preview")
     
     class Config:
         from_attributes = True
@@ -41,11 +47,33 @@ class CodeExecutionHistory(BaseModel):
     status: str
     exit_code: Optional[int]
     created_at: datetime
+    output_id: Optional[str] = Field(None, description="ID of the full output (GET /outputs/{id}) while it is stored")
+    error_id: Optional[str] = Field(None, description="ID of the full error output while it is stored")
     
     class Config:
         from_attributes = True
 
 
+class CodeExecutionSummary(BaseModel):
+    """Schema for a history sidebar entry: metadata and truncated text previews"""
+    id: int
+    project_id: Optional[int]
+    language: str
+    execution_time: float
+    status: str
+    exit_code: Optional[int]
+    created_at: datetime
+    code_preview: Optional[str] = None
+    output_preview: Optional[str] = None
+    error_preview: Optional[str] = None
+
+
+class ExecutionInput(BaseModel):
+    """Schema for an uploaded execution input"""
+    input_id: str = Field(description="SHA-256 hex digest of the content")
+    size: int = Field(description="Size in bytes")
+
+
 class SupportedLanguage(BaseModel):
     """Schema for supported language info"""
     name: str
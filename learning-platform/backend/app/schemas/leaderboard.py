@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import List, Optional
+import enum
+
+
+class LeaderboardMetric(str, enum.Enum):
+    """What a leaderboard ranks users by"""
+    COMPLETED = "completed"
+    TIME_SPENT = "time_spent"
+    EXECUTIONS = "executions"
+
+
+class LeaderboardEntry(BaseModel):
+    """One ranked user"""
+    rank: int
+    user_id: int
+    username: str
+    score: int
+
+
+class Leaderboard(BaseModel):
+    """Schema for a page of a leaderboard"""
+    metric: LeaderboardMetric
+    total_users: int
+    entries: List[LeaderboardEntry]
+
+
+class LeaderboardPosition(BaseModel):
+    """Schema for the current user's position on a leaderboard"""
+    metric: LeaderboardMetric
+    total_users: int
+    rank: Optional[int]
+    score: int
@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from app.models.progress import ProgressStatus
+from app.schemas.project import ProjectResponse
 
 
 class ProgressCreate(BaseModel):
@@ -16,6 +17,12 @@ class ProgressUpdate(BaseModel):
     time_spent: Optional[int] = None
 
 
+class ProgressHeartbeat(BaseModel):
+    """Schema for a progress heartbeat from the editor"""
+    time_spent: int = Field(0, ge=0)  # seconds since the previous heartbeat
+    completion_percentage: Optional[float] = Field(None, ge=0, le=100)
+
+
 class ProgressResponse(BaseModel):
     """Schema for progress response"""
     id: int
@@ -32,3 +39,38 @@ class ProgressResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class LockedProject(BaseModel):
+    """A project whose prerequisites aren't completed yet"""
+    project_id: int
+    missing_prerequisites: List[int]
+
+
+class ProgressRoadmap(BaseModel):
+    """Schema for a user's unlocked, locked and recommended projects"""
+    completed: List[int]
+    in_progress: List[int]
+    unlocked: List[int]
+    locked: List[LockedProject]
+    recommended: List[ProjectResponse]
+
+
+class PhaseSummary(BaseModel):
+    """Completed and total projects of one phase"""
+    phase: str
+    completed: int
+    total: int
+
+
+class ProgressSummary(BaseModel):
+    """Schema for a user's dashboard summary"""
+    completed_count: int
+    in_progress_count: int
+    total_projects: int
+    total_time_spent: int  # in seconds
+    executions_count: int
+    current_streak: int  # consecutive days with activity
+    longest_streak: int
+    last_activity_at: Optional[datetime]
+    phases: List[PhaseSummary]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from app.models.project import ProjectPhase, ProjectDifficulty
 
 
@@ -25,4 +25,18 @@ class ProjectList(BaseModel):
     """Schema for project list response"""
     projects: List[ProjectResponse]
     total: int
+    next_cursor: Optional[str] = None
 
+
+
+class ProjectSearchHit(BaseModel):
+    """Schema for a ranked search match"""
+    project: ProjectResponse
+    score: float
+
+
+class ProjectSearchResults(BaseModel):
+    """Schema for project search response"""
+    results: List[ProjectSearchHit]
+    total: int
+    facets: Dict[str, Dict[str, int]]
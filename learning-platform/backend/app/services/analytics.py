@@ -0,0 +1,363 @@
+"""
+Cohort Analytics
+Instructor reports computed over user_progress and code_executions without
+ORM objects: queries select only numbers (strings are dictionary-encoded and
+timestamps converted to epoch seconds in SQL), rows are fetched from the
+driver cursor in chunks straight into NumPy arrays and folded into per-group
+log-scale histograms. Memory stays bounded by the number of groups and bins
+no matter how many rows are scanned; percentiles are read from the
+histograms (within one bin, about 3% relative error).
+
+Reports are cached per cohort (users by signup month) for
+ANALYTICS_CACHE_TTL, so new runs and progress show up within the TTL.
+Deleting or archiving executions drops the affected cohorts' reports (and
+the all-users ones) when it commits.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import case, event, func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import engine
+from app.models.execution import CodeExecution
+from app.models.progress import UserProgress, ProgressStatus
+from app.models.user import User
+from app.services.project_catalog import get_project_catalog
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class AnalyticsUnavailable(RuntimeError):
+    """Raised when NumPy isn't installed"""
+
+
+class GroupedHistogram:
+    """Log-scale histograms of positive values, one per group key"""
+
+    def __init__(self, low: float, high: float, bins: int = 400):
+        """
+        Initialize histograms
+
+        Args:
+            low: Upper edge of the underflow bin
+            high: Lower edge of the overflow bin
+            bins: Log-spaced bins between low and high
+        """
+        self.edges = np.geomspace(low, high, bins + 1)
+        self.width = bins + 2  # plus underflow and overflow
+        self.keys: Dict[Any, int] = {}
+        self.counts = np.zeros((0, self.width), dtype=np.int64)
+        self.sums = np.zeros(0)
+        self.mins = np.zeros(0)
+        self.maxs = np.zeros(0)
+
+    def group_index(self, keys: "np.ndarray") -> "np.ndarray":
+        """Row index of every key, registering unseen keys"""
+        uniques, inverse = np.unique(keys, return_inverse=True)
+        for key in uniques.tolist():
+            if key not in self.keys:
+                self.keys[key] = len(self.keys)
+        missing = len(self.keys) - len(self.sums)
+        if missing:
+            self.counts = np.vstack([self.counts, np.zeros((missing, self.width), dtype=np.int64)])
+            self.sums = np.concatenate([self.sums, np.zeros(missing)])
+            self.mins = np.concatenate([self.mins, np.full(missing, np.inf)])
+            self.maxs = np.concatenate([self.maxs, np.full(missing, -np.inf)])
+        return np.array([self.keys[key] for key in uniques.tolist()], dtype=np.int64)[inverse]
+
+    def add(self, keys: "np.ndarray", values: "np.ndarray") -> None:
+        """Add one chunk of (key, value) pairs"""
+        if len(values) == 0:
+            return
+        index = self.group_index(keys)
+        groups = len(self.keys)
+        bins = np.searchsorted(self.edges, values, side="right")
+        self.counts += np.bincount(
+            index * self.width + bins, minlength=groups * self.width
+        ).reshape(groups, self.width)
+        self.sums += np.bincount(index, weights=values, minlength=groups)
+        np.minimum.at(self.mins, index, values)
+        np.maximum.at(self.maxs, index, values)
+
+    def percentiles(self, row: int, quantiles=PERCENTILES) -> Dict[str, float]:
+        """Percentiles of one group, interpolated geometrically within a bin"""
+        counts = self.counts[row]
+        cumulative = np.cumsum(counts)
+        total = cumulative[-1]
+        result = {}
+        for q in quantiles:
+            target = q / 100 * total
+            bin_index = int(np.searchsorted(cumulative, target))
+            below = cumulative[bin_index - 1] if bin_index else 0
+            fraction = (target - below) / counts[bin_index] if counts[bin_index] else 0.0
+            low = self.edges[bin_index - 1] if bin_index else self.mins[row]
+            high = self.edges[bin_index] if bin_index < len(self.edges) else self.maxs[row]
+            low, high = max(low, self.mins[row]), min(high, self.maxs[row])
+            value = low * (high / low) ** fraction if low > 0 else low + (high - low) * fraction
+            result[f"p{q}"] = round(float(value), 6)
+        return result
+
+    def histogram(self, row: int, buckets: int = 20) -> List[Dict[str, float]]:
+        """Coarse histogram of one group: upper bucket edges and counts"""
+        fine = self.counts[row]
+        inner = fine[1:-1].reshape(buckets, -1).sum(axis=1)
+        inner[0] += fine[0]
+        inner[-1] += fine[-1]
+        edges = self.edges[::(len(self.edges) - 1) // buckets][1:]
+        return [
+            {"le": round(float(edge), 6), "count": int(count)}
+            for edge, count in zip(edges, inner)
+        ]
+
+    def summary(self, row: int) -> Dict[str, Any]:
+        """Count, mean, min, max, percentiles and histogram of one group"""
+        count = int(self.counts[row].sum())
+        return {
+            "count": count,
+            "mean": round(float(self.sums[row] / count), 6) if count else None,
+            "min": float(self.mins[row]) if count else None,
+            "max": float(self.maxs[row]) if count else None,
+            **self.percentiles(row),
+            "histogram": self.histogram(row),
+        }
+
+
+def cohort_user_ids(cohort: Optional[str]):
+    """Subquery of users who signed up in a cohort month ("YYYY-MM"), or None for all"""
+    if cohort is None:
+        return None
+    year, month = map(int, cohort.split("-"))
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    return select(User.id).where(User.created_at >= start, User.created_at < end)
+
+
+def epoch_seconds(column, dialect: str):
+    """SQL expression for a timestamp column as seconds since the epoch"""
+    if dialect == "postgresql":
+        return func.extract("epoch", column)
+    return (func.julianday(column) - 2440587.5) * 86400.0
+
+
+def iter_arrays(conn, statement, chunk_size: int):
+    """
+    Stream a query of numeric columns as 2-D float arrays of chunk_size rows
+
+    Rows come from the Result, not its raw cursor: a streaming Result has
+    already prefetched the first row, which reading the cursor would skip.
+    """
+    result = conn.execution_options(stream_results=True).execute(statement)
+    try:
+        for rows in result.partitions(chunk_size):
+            yield np.array(rows, dtype=np.float64)
+    finally:
+        result.close()
+
+
+class CohortAnalytics:
+    """Cached, vectorized instructor reports"""
+
+    def __init__(self, chunk_size: int = 50000, ttl: float = 300.0, max_cached: int = 64):
+        self.chunk_size = chunk_size
+        self.ttl = ttl
+        self.max_cached = max_cached
+        self._cache: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+        self._cache_lock = threading.Lock()
+        # One report computes at a time, which bounds memory and deduplicates work
+        self._compute_lock = threading.Lock()
+
+    def invalidate(self, cohorts: Iterable[str]) -> None:
+        """Drop the cached reports of cohorts, and of all users"""
+        stale = set(cohorts) | {None}
+        with self._cache_lock:
+            for key in [key for key in self._cache if key[1] in stale]:
+                del self._cache[key]
+
+    def _cached(self, key: Tuple, compute) -> Dict[str, Any]:
+        """Cached report for key, computing it at most once at a time"""
+        if np is None:
+            raise AnalyticsUnavailable("Analytics requires NumPy (pip install numpy)")
+
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+
+        with self._compute_lock:
+            cached = self._cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                return cached[1]
+            started = time.perf_counter()
+            report = compute(key[1])
+            report["computed_at"] = datetime.utcnow().isoformat()
+            report["compute_seconds"] = round(time.perf_counter() - started, 3)
+            with self._cache_lock:
+                if len(self._cache) >= self.max_cached:
+                    self._cache.clear()
+                self._cache[key] = (time.monotonic(), report)
+            return report
+
+    def execution_report(self, cohort: Optional[str] = None) -> Dict[str, Any]:
+        """Failure rates per project and execution-time distribution per language"""
+        return self._cached(("executions", cohort), self._compute_executions)
+
+    def completion_report(self, cohort: Optional[str] = None) -> Dict[str, Any]:
+        """Time-to-complete distribution per project"""
+        return self._cached(("completion", cohort), self._compute_completion)
+
+    def _compute_executions(self, cohort: Optional[str]) -> Dict[str, Any]:
+        times = GroupedHistogram(low=1e-4, high=1e3)
+        project_rows: Dict[int, int] = {}
+        project_counts = np.zeros((0, 3), dtype=np.int64)  # total, error, timeout
+        rows = 0
+
+        with engine.connect() as conn:
+            languages = sorted(language for (language,) in conn.execute(
+                select(CodeExecution.language).distinct()
+            ))
+            statement = select(
+                func.coalesce(CodeExecution.project_id, 0),
+                case({language: code for code, language in enumerate(languages)},
+                     value=CodeExecution.language, else_=-1),
+                case({"error": 1, "timeout": 2}, value=CodeExecution.status, else_=0),
+                CodeExecution.execution_time,
+            )
+            users = cohort_user_ids(cohort)
+            if users is not None:
+                statement = statement.where(CodeExecution.user_id.in_(users))
+
+            for chunk in iter_arrays(conn, statement, self.chunk_size):
+                rows += len(chunk)
+                project_ids = chunk[:, 0].astype(np.int64)
+                statuses = chunk[:, 2]
+                times.add(chunk[:, 1].astype(np.int64), chunk[:, 3])
+
+                uniques, inverse = np.unique(project_ids, return_inverse=True)
+                for project_id in uniques.tolist():
+                    project_rows.setdefault(project_id, len(project_rows))
+                if len(project_rows) > len(project_counts):
+                    project_counts = np.vstack([
+                        project_counts,
+                        np.zeros((len(project_rows) - len(project_counts), 3), dtype=np.int64)
+                    ])
+                index = np.array([project_rows[p] for p in uniques.tolist()], dtype=np.int64)[inverse]
+                minlength = len(project_rows)
+                project_counts[:, 0] += np.bincount(index, minlength=minlength)
+                project_counts[:, 1] += np.bincount(index[statuses == 1], minlength=minlength)
+                project_counts[:, 2] += np.bincount(index[statuses == 2], minlength=minlength)
+
+        catalog = get_project_catalog().snapshot().by_id
+        failure_rates = []
+        for project_id, row in sorted(project_rows.items()):
+            total, errors, timeouts = (int(value) for value in project_counts[row])
+            project = catalog.get(project_id)
+            failure_rates.append({
+                "project_id": project_id or None,
+                "title": project["title"] if project else None,
+                "executions": total,
+                "errors": errors,
+                "timeouts": timeouts,
+                "failure_rate": round((errors + timeouts) / total, 4) if total else 0.0,
+            })
+
+        return {
+            "cohort": cohort,
+            "rows": rows,
+            "failure_rates": failure_rates,
+            "execution_times": [
+                {"language": languages[code] if code >= 0 else None, **times.summary(row)}
+                for code, row in sorted(times.keys.items())
+            ],
+        }
+
+    def _compute_completion(self, cohort: Optional[str]) -> Dict[str, Any]:
+        dialect = engine.dialect.name
+        statement = select(
+            UserProgress.project_id,
+            func.coalesce(UserProgress.time_spent, 0),
+            epoch_seconds(UserProgress.completed_at, dialect)
+            - epoch_seconds(UserProgress.created_at, dialect),
+        ).where(
+            UserProgress.status == ProgressStatus.COMPLETED.value,
+            UserProgress.completed_at.is_not(None)
+        )
+        users = cohort_user_ids(cohort)
+        if users is not None:
+            statement = statement.where(UserProgress.user_id.in_(users))
+
+        active = GroupedHistogram(low=1.0, high=1e7)  # time spent, seconds
+        elapsed = GroupedHistogram(low=1.0, high=1e8)  # started to completed, seconds
+        rows = 0
+
+        with engine.connect() as conn:
+            for chunk in iter_arrays(conn, statement, self.chunk_size):
+                rows += len(chunk)
+                project_ids = chunk[:, 0].astype(np.int64)
+                active.add(project_ids, chunk[:, 1])
+                durations = chunk[:, 2]
+                valid = ~np.isnan(durations)
+                elapsed.add(project_ids[valid], np.maximum(durations[valid], 0.0))
+
+        catalog = get_project_catalog().snapshot().by_id
+        projects = []
+        for project_id, row in sorted(active.keys.items()):
+            project = catalog.get(project_id)
+            elapsed_row = elapsed.keys.get(project_id)
+            projects.append({
+                "project_id": project_id,
+                "title": project["title"] if project else None,
+                "time_spent": active.summary(row),
+                "elapsed": elapsed.summary(elapsed_row) if elapsed_row is not None else None,
+            })
+
+        return {"cohort": cohort, "rows": rows, "projects": projects}
+
+
+# Global analytics instance
+_analytics = None
+
+
+def get_analytics() -> CohortAnalytics:
+    """Get or create the analytics service"""
+    global _analytics
+    if _analytics is None:
+        _analytics = CohortAnalytics(
+            chunk_size=settings.ANALYTICS_CHUNK_SIZE,
+            ttl=settings.ANALYTICS_CACHE_TTL
+        )
+    return _analytics
+
+
+def cohort_of(signed_up: datetime) -> str:
+    """Cohort ("YYYY-MM") of a user who signed up at signed_up"""
+    return signed_up.strftime("%Y-%m")
+
+
+def mark_analytics_stale(session: Session, user_ids: Iterable[int]) -> None:
+    """Invalidate the cached reports of these users' cohorts when this session commits"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    signups = session.execute(
+        select(User.created_at).where(User.id.in_(user_ids))
+    ).scalars()
+    stale: Set[str] = session.info.setdefault("analytics_stale", set())
+    stale.update(cohort_of(signed_up) for signed_up in signups if signed_up is not None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_analytics(session):
+    stale = session.info.pop("analytics_stale", None)
+    if stale is not None:
+        get_analytics().invalidate(stale)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_analytics_changes(session):
+    session.info.pop("analytics_stale", None)
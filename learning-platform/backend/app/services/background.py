@@ -0,0 +1,60 @@
+"""
+Background Flushing
+Shared plumbing for in-process write buffers that are flushed to the
+database by a background task, periodically or on demand
+"""
+import asyncio
+from typing import Optional
+
+
+class PeriodicFlusher:
+    """Runs flush() every flush_interval seconds, or sooner when requested"""
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flusher is active"""
+        return self._task is not None and not self._task.done()
+
+    def flush(self) -> int:
+        """Write buffered data to the database, returning the number of rows"""
+        raise NotImplementedError
+
+    def request_flush(self) -> None:
+        """Wake the background task to flush early (thread-safe)"""
+        if self.running:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start(self) -> None:
+        """Start the background flusher on the running event loop"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background flusher and flush whatever is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    async def _run(self) -> None:
+        """Flush every flush_interval seconds, or sooner when woken"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await asyncio.to_thread(self.flush)
@@ -0,0 +1,175 @@
+"""
+Content Blob Store
+Deduplicates and compresses large text fields (code, stdin, output, error)
+by storing each distinct value once in content_blobs, keyed by SHA-256
+"""
+import hashlib
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import LargeBinary, func, or_, select, union
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.models.blob import ContentBlob, BlobCompression
+from app.models.execution import CodeExecution
+
+# CodeExecution text fields stored as blobs, mapped to their hash columns
+EXECUTION_BLOB_FIELDS = {
+    "code": "code_hash",
+    "stdin": "stdin_hash",
+    "output": "output_hash",
+    "error": "error_hash",
+}
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest used as the blob key"""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def encode_blob(text: str) -> Dict[str, Any]:
+    """Build a content_blobs row, compressing only when it saves space"""
+    raw = text.encode()
+    compressed = zlib.compress(raw, settings.BLOB_COMPRESSION_LEVEL)
+    if len(compressed) < len(raw):
+        data, compression = compressed, BlobCompression.ZLIB
+    else:
+        data, compression = raw, BlobCompression.NONE
+    return {
+        "hash": content_hash(text),
+        "compression": compression,
+        "data": data,
+        "size": len(raw),
+    }
+
+
+def decode_blob(compression: str, data: bytes) -> str:
+    """Text of a content_blobs row (the inverse of encode_blob)"""
+    raw = zlib.decompress(data) if compression == BlobCompression.ZLIB else data
+    return raw.decode()
+
+
+def load_blob_texts(db: Session, hashes: Iterable[Optional[str]]) -> Dict[str, str]:
+    """Texts of the given blobs by hash, in one query"""
+    hashes = {blob_hash for blob_hash in hashes if blob_hash is not None}
+    if not hashes:
+        return {}
+    rows = db.execute(
+        select(ContentBlob.hash, ContentBlob.compression, ContentBlob.data)
+        .where(ContentBlob.hash.in_(hashes))
+    )
+    return {blob_hash: decode_blob(compression, data) for blob_hash, compression, data in rows}
+
+
+def decode_blob_preview(compression: str, data: bytes, chars: int) -> str:
+    """First chars characters of a blob, decompressing only as much as that needs"""
+    limit = chars * 4  # UTF-8 uses at most 4 bytes per character
+    if compression == BlobCompression.ZLIB:
+        raw = zlib.decompressobj().decompress(data, limit)
+    else:
+        raw = data[:limit]
+    return raw.decode(errors="ignore")[:chars]
+
+
+def load_blob_previews(db: Session, hashes: Iterable[Optional[str]], chars: int) -> Dict[str, str]:
+    """
+    First chars characters of the given blobs by hash, in one query
+
+    Only a prefix of each blob is read from the database. Deflate spends
+    at most about 2 bytes per output byte plus a few hundred per block
+    header, so the prefix always decompresses to enough text.
+    """
+    hashes = {blob_hash for blob_hash in hashes if blob_hash is not None}
+    if not hashes:
+        return {}
+    prefix = chars * 4 * 2 + 1024
+    rows = db.execute(
+        select(
+            ContentBlob.hash,
+            ContentBlob.compression,
+            func.substr(ContentBlob.data, 1, prefix, type_=LargeBinary)
+        ).where(ContentBlob.hash.in_(hashes))
+    )
+    return {
+        blob_hash: decode_blob_preview(compression, bytes(data), chars)
+        for blob_hash, compression, data in rows
+    }
+
+
+def put_blobs(db: Session, texts: Iterable[Optional[str]]) -> None:
+    """
+    Store any of the given texts that aren't stored yet, in one statement
+
+    Blobs that are already stored get their last_used_at refreshed (at most
+    every half grace period), which keeps delete_orphan_blobs from removing
+    them before the executions that reference them commit. On PostgreSQL
+    the conflicting rows are also locked until this transaction ends.
+    """
+    now = datetime.utcnow()
+    rows = {}
+    for text in texts:
+        if text is not None:
+            blob = encode_blob(text)
+            blob["created_at"] = blob["last_used_at"] = now
+            rows.setdefault(blob["hash"], blob)
+    if not rows:
+        return
+
+    insert = dialect_insert(db.get_bind())
+    statement = insert(ContentBlob)
+    refresh_before = now - timedelta(seconds=settings.BLOB_GC_GRACE_SECONDS / 2)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["hash"],
+            set_={"last_used_at": statement.excluded.last_used_at},
+            where=or_(
+                ContentBlob.last_used_at.is_(None),
+                ContentBlob.last_used_at < refresh_before
+            )
+        ),
+        list(rows.values())
+    )
+
+
+def store_execution_blobs(db: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Move the text fields of CodeExecution row dicts into content_blobs
+
+    Returns new row dicts carrying *_hash columns instead of the texts,
+    ready for a bulk insert into code_executions.
+    """
+    put_blobs(db, (row.get(field) for row in rows for field in EXECUTION_BLOB_FIELDS))
+
+    stored = []
+    for row in rows:
+        row = dict(row)
+        for field, hash_column in EXECUTION_BLOB_FIELDS.items():
+            text = row.pop(field, None)
+            row[hash_column] = content_hash(text) if text is not None else None
+        stored.append(row)
+    return stored
+
+
+def delete_orphan_blobs(db: Session) -> int:
+    """
+    Delete blobs no longer referenced by any execution
+
+    Only blobs unused for BLOB_GC_GRACE_SECONDS go: a history flush may have
+    found a blob already stored and not yet committed the execution that
+    references it.
+    """
+    used_since = datetime.utcnow() - timedelta(seconds=settings.BLOB_GC_GRACE_SECONDS)
+    referenced = union(*(
+        select(getattr(CodeExecution, hash_column)).where(
+            getattr(CodeExecution, hash_column).is_not(None)
+        )
+        for hash_column in EXECUTION_BLOB_FIELDS.values()
+    ))
+    result = db.execute(
+        ContentBlob.__table__.delete().where(
+            ContentBlob.hash.not_in(referenced),
+            or_(ContentBlob.last_used_at.is_(None), ContentBlob.last_used_at < used_since)
+        )
+    )
+    return result.rowcount
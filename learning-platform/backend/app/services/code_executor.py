@@ -5,10 +5,37 @@ Handles safe code execution in Docker containers with resource limits
 import asyncio
 import time
 import uuid
+from contextlib import asynccontextmanager
 from typing import Dict, Optional, Tuple
 import tempfile
 import os
 import shutil
+from app.core.config import settings
+from app.core.metrics import registry
+from app.services.output_store import OutputSpool, get_output_store
+
+# Executor metrics (labels: supported languages, statuses and stream names only)
+active_sandboxes = registry.gauge("executor_active_sandboxes", "Sandboxed programs running")
+queue_depth = registry.gauge("executor_queue_depth", "Executions waiting for a free sandbox slot")
+spawn_latency = registry.histogram(
+    "executor_spawn_seconds", "Time to start a sandboxed program",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+executions_total = registry.counter(
+    "executor_executions_total", "Finished executions", ("language", "status")
+)
+execution_duration = registry.histogram(
+    "executor_execution_seconds", "Execution time of sandboxed programs", ("language",)
+)
+timeouts_total = registry.counter(
+    "executor_timeouts_total", "Executions killed at the time limit", ("language",)
+)
+output_spills_total = registry.counter(
+    "executor_output_spills_total", "Output streams too large to return inline", ("stream",)
+)
+output_truncations_total = registry.counter(
+    "executor_output_truncations_total", "Output streams not stored in full", ("stream",)
+)
 
 
 class CodeExecutor:
@@ -17,7 +44,8 @@ class CodeExecutor:
     # Resource limits
     MAX_EXECUTION_TIME = 30  # seconds
     MAX_MEMORY = "128m"  # 128 MB
-    MAX_OUTPUT_SIZE = 10000  # characters
+    MAX_OUTPUT_SIZE = 10000  # bytes per stream kept inline; more is spilled to disk
+    READ_CHUNK_SIZE = 65536  # bytes read from the program's pipes at a time
     
     # Supported languages and their Docker images
     LANGUAGE_CONFIGS = {
@@ -47,6 +75,10 @@ class CodeExecutor:
         """
         self.use_docker = use_docker
         self._check_docker_available()
+        
+        # Sandboxes allowed at once (further executions queue); None is unlimited
+        max_concurrent = settings.CODE_EXECUTION_MAX_CONCURRENT
+        self._slots = asyncio.Semaphore(max_concurrent) if max_concurrent > 0 else None
     
     def _check_docker_available(self) -> bool:
         """Check if Docker is available"""
@@ -69,7 +101,9 @@ class CodeExecutor:
         self,
         code: str,
         language: str = "python",
-        stdin: Optional[str] = None
+        stdin: Optional[str] = None,
+        output_owner: Optional[int] = None,
+        stdin_path: Optional[str] = None
     ) -> Dict[str, any]:
         """
         Execute code in a sandboxed environment
@@ -78,12 +112,14 @@ class CodeExecutor:
             code: Source code to execute
             language: Programming language
             stdin: Optional standard input
+            stdin_path: File streamed to standard input instead of stdin
+            output_owner: User whose large outputs are kept in the output
+                store (without one, large output is only previewed)
         
         Returns:
-            Dict with output, error, execution_time, and status
+            Dict with output, error, execution_time, and status, plus
+            output_id / error_id of spilled outputs
         """
-        start_time = time.time()
-        
         # Validate language
         if language not in self.LANGUAGE_CONFIGS:
             return {
@@ -104,39 +140,62 @@ class CodeExecutor:
                 "exit_code": 1
             }
         
-        try:
-            if self.use_docker:
-                result = await self._execute_in_docker(code, language, stdin)
-            else:
-                result = await self._execute_local(code, language, stdin)
-            
-            execution_time = time.time() - start_time
-            result["execution_time"] = execution_time
+        async with self._sandbox_slot():
+            start_time = time.time()
+            try:
+                if self.use_docker:
+                    result = await self._execute_in_docker(code, language, stdin, output_owner, stdin_path)
+                else:
+                    result = await self._execute_local(code, language, stdin, output_owner, stdin_path)
+                
+                execution_time = time.time() - start_time
+                result["execution_time"] = execution_time
             
-            return result
+            except asyncio.TimeoutError:
+                timeouts_total.inc(language)
+                result = {
+                    "output": "",
+                    "error": f"Execution timed out after {self.MAX_EXECUTION_TIME} seconds",
+                    "execution_time": self.MAX_EXECUTION_TIME,
+                    "status": "timeout",
+                    "exit_code": 124
+                }
+            except Exception as e:
+                result = {
+                    "output": "",
+                    "error": f"Execution error: {str(e)}",
+                    "execution_time": time.time() - start_time,
+                    "status": "error",
+                    "exit_code": 1
+                }
         
-        except asyncio.TimeoutError:
-            return {
-                "output": "",
-                "error": f"Execution timed out after {self.MAX_EXECUTION_TIME} seconds",
-                "execution_time": self.MAX_EXECUTION_TIME,
-                "status": "timeout",
-                "exit_code": 124
-            }
-        except Exception as e:
-            return {
-                "output": "",
-                "error": f"Execution error: {str(e)}",
-                "execution_time": time.time() - start_time,
-                "status": "error",
-                "exit_code": 1
-            }
+        executions_total.inc(language, result["status"])
+        execution_duration.observe(result["execution_time"], language)
+        return result
+    
+    @asynccontextmanager
+    async def _sandbox_slot(self):
+        """Wait for a free sandbox slot when concurrency is limited"""
+        if self._slots is None:
+            yield
+            return
+        queue_depth.inc()
+        try:
+            await self._slots.acquire()
+        finally:
+            queue_depth.dec()
+        try:
+            yield
+        finally:
+            self._slots.release()
     
     async def _execute_in_docker(
         self,
         code: str,
         language: str,
-        stdin: Optional[str] = None
+        stdin: Optional[str] = None,
+        output_owner: Optional[int] = None,
+        stdin_path: Optional[str] = None
     ) -> Dict[str, any]:
         """Execute code in a Docker container"""
         import subprocess
@@ -157,6 +216,7 @@ class CodeExecutor:
             docker_cmd = [
                 "docker", "run",
                 "--rm",  # Remove container after execution
+                *(["--interactive"] if stdin or stdin_path else []),  # Attach stdin
                 "--network", "none",  # No network access
                 "--memory", self.MAX_MEMORY,
                 "--cpus", "0.5",  # Limit CPU usage
@@ -169,35 +229,7 @@ class CodeExecutor:
                 f"code{config['extension']}"
             ]
             
-            # Execute in Docker with timeout
-            process = await asyncio.create_subprocess_exec(
-                *docker_cmd,
-                stdin=asyncio.subprocess.PIPE if stdin else None,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(input=stdin.encode() if stdin else None),
-                    timeout=self.MAX_EXECUTION_TIME
-                )
-                
-                # Decode output
-                output = stdout.decode()[:self.MAX_OUTPUT_SIZE]
-                error = stderr.decode()[:self.MAX_OUTPUT_SIZE]
-                
-                return {
-                    "output": output,
-                    "error": error if error else None,
-                    "status": "success" if process.returncode == 0 else "error",
-                    "exit_code": process.returncode
-                }
-            
-            except asyncio.TimeoutError:
-                process.kill()
-                await process.wait()
-                raise
+            return await self._run_process(docker_cmd, stdin, output_owner, stdin_path=stdin_path)
         
         finally:
             # Clean up temporary directory
@@ -207,7 +239,9 @@ class CodeExecutor:
         self,
         code: str,
         language: str,
-        stdin: Optional[str] = None
+        stdin: Optional[str] = None,
+        output_owner: Optional[int] = None,
+        stdin_path: Optional[str] = None
     ) -> Dict[str, any]:
         """
         Execute code locally (for development without Docker)
@@ -230,38 +264,120 @@ class CodeExecutor:
             # Execute locally
             cmd = [config["command"], code_file]
             
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdin=asyncio.subprocess.PIPE if stdin else None,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=temp_dir
+            return await self._run_process(cmd, stdin, output_owner, cwd=temp_dir, stdin_path=stdin_path)
+        
+        finally:
+            # Clean up
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    async def _run_process(
+        self,
+        cmd: list,
+        stdin: Optional[str],
+        output_owner: Optional[int],
+        cwd: Optional[str] = None,
+        stdin_path: Optional[str] = None
+    ) -> Dict[str, any]:
+        """
+        Run a sandboxed program, streaming its input and output
+        
+        Output beyond MAX_OUTPUT_SIZE bytes is written to the output store
+        as it arrives and only its head and tail are kept in memory, so
+        memory use doesn't grow with the output. Input from stdin_path is
+        piped in chunks, waiting for the program to consume each one.
+        """
+        store = get_output_store()
+        stdout = store.spool(self.MAX_OUTPUT_SIZE, output_owner)
+        stderr = store.spool(self.MAX_OUTPUT_SIZE, output_owner)
+        
+        spawn_start = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE if stdin or stdin_path else None,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd
+        )
+        spawn_latency.observe(time.perf_counter() - spawn_start)
+        
+        async def communicate():
+            await asyncio.gather(
+                self._feed_file(process.stdin, stdin_path) if stdin_path
+                else self._feed(process.stdin, stdin.encode() if stdin else None),
+                self._drain(process.stdout, stdout),
+                self._drain(process.stderr, stderr)
             )
-            
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(input=stdin.encode() if stdin else None),
-                    timeout=self.MAX_EXECUTION_TIME
-                )
-                
-                output = stdout.decode()[:self.MAX_OUTPUT_SIZE]
-                error = stderr.decode()[:self.MAX_OUTPUT_SIZE]
-                
-                return {
-                    "output": output,
-                    "error": error if error else None,
-                    "status": "success" if process.returncode == 0 else "error",
-                    "exit_code": process.returncode
-                }
-            
-            except asyncio.TimeoutError:
+            await process.wait()
+        
+        active_sandboxes.inc()
+        try:
+            await asyncio.wait_for(communicate(), timeout=self.MAX_EXECUTION_TIME)
+        except BaseException:
+            if process.returncode is None:
                 process.kill()
                 await process.wait()
-                raise
+            stdout.discard()
+            stderr.discard()
+            raise
+        finally:
+            active_sandboxes.dec()
+        
+        for name, spool in (("stdout", stdout), ("stderr", stderr)):
+            if spool.spilled:
+                output_spills_total.inc(name)
+            if spool.truncated:
+                output_truncations_total.inc(name)
         
+        output, output_id = stdout.finish()
+        error, error_id = stderr.finish()
+        return {
+            "output": output,
+            "error": error if error else None,
+            "status": "success" if process.returncode == 0 else "error",
+            "exit_code": process.returncode,
+            "output_id": output_id,
+            "error_id": error_id
+        }
+    
+    @staticmethod
+    async def _feed(pipe: Optional[asyncio.StreamWriter], data: Optional[bytes]) -> None:
+        """Write standard input to the program and close it"""
+        if pipe is None:
+            return
+        try:
+            pipe.write(data)
+            await pipe.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the program exited without reading all of its input
         finally:
-            # Clean up
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            pipe.close()
+    
+    async def _feed_file(self, pipe: asyncio.StreamWriter, path: str) -> None:
+        """Stream a file to the program's standard input and close it"""
+        try:
+            with open(path, "rb") as f:
+                while True:
+                    chunk = f.read(self.READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    pipe.write(chunk)
+                    await pipe.drain()  # backpressure: wait until the program reads
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the program exited without reading all of its input
+        finally:
+            pipe.close()
+    
+    async def _drain(self, pipe: asyncio.StreamReader, spool: OutputSpool) -> None:
+        """Read an output pipe to the end, writing spilled output from a thread"""
+        while True:
+            chunk = await pipe.read(self.READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            spool.write(chunk)
+            if spool.flush_due:
+                await asyncio.to_thread(spool.flush)
+        if spool.spilled:
+            await asyncio.to_thread(spool.flush)
     
     def get_supported_languages(self) -> list:
         """Get list of supported programming languages"""
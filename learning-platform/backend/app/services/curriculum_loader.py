@@ -0,0 +1,224 @@
+"""
+Curriculum Loader
+Parses PROJECT_CURRICULUM.md into project records and synchronizes the
+projects table with them: one query to diff, one bulk upsert and one
+batched prerequisite update, all in a single transaction
+"""
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from app.core.database import dialect_insert
+from app.models.project import Project, ProjectPhase, ProjectDifficulty
+from app.services.project_catalog import mark_catalog_dirty
+
+# Columns the curriculum owns (prerequisites are resolved separately,
+# because they reference project IDs that only exist after inserting)
+MANAGED_COLUMNS = (
+    "title", "description", "concept", "phase", "difficulty", "estimated_time"
+)
+
+PHASE_HEADING = re.compile(r"^## Phase [\d.]+: (?P<name>.+)$")
+PROJECT_HEADING = re.compile(r"^### Project (?P<number>\d+): (?P<title>.+?)\s*(✅)?$")
+FIELD_LINE = re.compile(r"^\*\*(?P<name>[\w ]+)\*\*:\s*(?P<value>.*?)\s*$")
+SECTION_HEADING = re.compile(r"^#### (?P<name>.+)$")
+
+
+class CurriculumError(ValueError):
+    """Raised when the curriculum source can't be parsed"""
+
+
+def parse_phase(name: str) -> ProjectPhase:
+    """Map a "## Phase N: ..." heading to a project phase"""
+    lowered = name.lower()
+    if "capstone" in lowered:
+        return ProjectPhase.CAPSTONE
+    if "ai" in lowered.split() or "machine learning" in lowered:
+        return ProjectPhase.AI_ML
+    return ProjectPhase(lowered.split()[0])
+
+
+def parse_difficulty(value: str) -> ProjectDifficulty:
+    """Map a difficulty like "⭐⭐ Intermediate" to its enum"""
+    return ProjectDifficulty(value.split()[-1].lower())
+
+
+def parse_minutes(value: str) -> Optional[int]:
+    """Convert a time like "30 minutes" or "2-3 hours" to minutes (upper bound)"""
+    match = re.match(r"(?:\d+\s*-\s*)?(\d+)\s*(minute|hour)", value.lower())
+    if not match:
+        return None
+    amount = int(match.group(1))
+    return amount if match.group(2) == "minute" else amount * 60
+
+
+def parse_curriculum(source: str) -> List[Dict[str, Any]]:
+    """
+    Parse curriculum markdown into project records
+
+    Each "### Project N: Title" under a "## Phase" heading becomes a record.
+    Description defaults to the learning objectives (or features) and
+    prerequisites default to the previous project, unless the project
+    has explicit **Description** / **Prerequisites** lines.
+    """
+    records = []
+    phase = None
+    current = None
+    section = None
+    bullets: Dict[str, List[str]] = {}
+
+    def finish():
+        if current is None:
+            return
+        if not current.get("description"):
+            items = bullets.get("learning objectives") or bullets.get("features") or []
+            current["description"] = "; ".join(items) + "." if items else None
+        missing = [field for field in ("concept", "difficulty") if field not in current]
+        if missing:
+            raise CurriculumError(
+                f"Project {current['project_number']} is missing {', '.join(missing)}"
+            )
+        records.append(current)
+
+    for line in source.splitlines():
+        line = line.rstrip()
+        if line.startswith("## "):
+            finish()
+            current = None
+            match = PHASE_HEADING.match(line)
+            phase = parse_phase(match.group("name")) if match else None
+            continue
+
+        match = PROJECT_HEADING.match(line)
+        if match:
+            finish()
+            if phase is None:
+                raise CurriculumError(f"Project {match.group('number')} is outside a phase")
+            current = {
+                "project_number": int(match.group("number")),
+                "title": match.group("title"),
+                "phase": phase,
+                "estimated_time": None,
+                "prerequisite_numbers": None,
+            }
+            section = None
+            bullets = {}
+            continue
+
+        if current is None:
+            continue
+
+        match = SECTION_HEADING.match(line)
+        if match:
+            section = match.group("name").strip().lower()
+            continue
+
+        match = FIELD_LINE.match(line)
+        if match and section is None:
+            name, value = match.group("name").lower(), match.group("value")
+            if name in ("concept", "concepts"):
+                current["concept"] = value
+            elif name == "difficulty":
+                current["difficulty"] = parse_difficulty(value)
+            elif name == "time":
+                current["estimated_time"] = parse_minutes(value)
+            elif name == "description":
+                current["description"] = value
+            elif name == "prerequisites":
+                current["prerequisite_numbers"] = [int(n) for n in re.findall(r"\d+", value)]
+            continue
+
+        if section and line.startswith("- "):
+            bullets.setdefault(section, []).append(line[2:].strip())
+
+    finish()
+
+    numbers = [record["project_number"] for record in records]
+    if len(numbers) != len(set(numbers)):
+        raise CurriculumError("Duplicate project numbers in curriculum")
+
+    previous = None
+    for record in records:
+        if record["prerequisite_numbers"] is None:
+            record["prerequisite_numbers"] = [previous] if previous else []
+        previous = record["project_number"]
+    return records
+
+
+def load_curriculum(db: Session, records: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """
+    Insert new and update changed projects from curriculum records
+
+    Runs inside the caller's transaction; the caller commits (or rolls
+    back for a dry run). Returns the project numbers that were inserted
+    and updated, and those left unchanged.
+    """
+    existing = {
+        row.project_number: row
+        for row in db.execute(select(
+            Project.id, Project.project_number, Project.prerequisites,
+            *(getattr(Project, column) for column in MANAGED_COLUMNS)
+        ))
+    }
+
+    inserted, updated = [], set()
+    upserts = []
+    for record in records:
+        row = existing.get(record["project_number"])
+        values = {column: record[column] for column in MANAGED_COLUMNS}
+        if row is None:
+            inserted.append(record["project_number"])
+        elif any(getattr(row, column) != value for column, value in values.items()):
+            updated.add(record["project_number"])
+        else:
+            continue
+        upserts.append({
+            "project_number": record["project_number"],
+            "created_at": datetime.utcnow(),
+            **values,
+        })
+
+    ids = {number: row.id for number, row in existing.items()}
+    if upserts:
+        insert = dialect_insert(db.get_bind())
+        statement = insert(Project).values(upserts)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Project.project_number],
+            set_={column: statement.excluded[column] for column in MANAGED_COLUMNS}
+        ).returning(Project.id, Project.project_number)
+        ids.update({number: project_id for project_id, number in db.execute(statement)})
+
+    # Prerequisites reference IDs, which new projects only have now
+    prerequisite_updates = []
+    for record in records:
+        prerequisites = json.dumps([
+            ids[number] for number in record["prerequisite_numbers"] if number in ids
+        ]) if record["prerequisite_numbers"] else None
+        row = existing.get(record["project_number"])
+        if record["project_number"] in inserted or row.prerequisites != prerequisites:
+            prerequisite_updates.append({
+                "number": record["project_number"],
+                "value": prerequisites,
+            })
+            if record["project_number"] not in inserted:
+                updated.add(record["project_number"])
+
+    if prerequisite_updates:
+        db.execute(
+            update(Project.__table__)
+            .where(Project.__table__.c.project_number == bindparam("number"))
+            .values(prerequisites=bindparam("value")),
+            prerequisite_updates
+        )
+
+    if inserted or updated:
+        mark_catalog_dirty(db)
+
+    loaded = {record["project_number"] for record in records}
+    return {
+        "inserted": inserted,
+        "updated": sorted(updated),
+        "unchanged": sorted(loaded - set(inserted) - updated),
+    }
@@ -0,0 +1,413 @@
+"""
+Execution Statistics Rollups
+Hourly execution counts, error and timeout counts and latency histograms per
+language and project, counted in memory as executions finish and flushed
+with additive upserts (so concurrent writers never lose counts). A compaction job folds
+hourly buckets older than ROLLUP_HOURLY_RETENTION_DAYS into daily buckets.
+
+Latency histograms use fixed log-scale bins (each 10% wider than the last),
+so buckets merge by adding counts and percentiles are accurate to ~5%.
+"""
+import asyncio
+import math
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import case, delete, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, dialect_insert
+from app.models.execution import CodeExecution
+from app.models.rollup import ExecutionRollup, ExecutionRollupBin, RollupGranularity
+from app.services.background import PeriodicFlusher
+
+BIN_LOW = 1e-4  # seconds; faster runs share bin 0
+BIN_GROWTH = 1.1
+BIN_COUNT = 170  # up to ~1000 seconds, slower runs share the last bin
+
+COUNTERS = ("executions", "errors", "timeouts", "total_time")
+Key = Tuple[str, datetime, str, int]  # granularity, bucket_start, language, project_id
+
+
+def latency_bin(seconds: float) -> int:
+    """Histogram bin of an execution time"""
+    if seconds <= BIN_LOW:
+        return 0
+    return min(int(math.log(seconds / BIN_LOW, BIN_GROWTH)) + 1, BIN_COUNT)
+
+
+def bin_bounds(index: int) -> Tuple[float, float]:
+    """Lower and upper execution time of a bin"""
+    if index == 0:
+        return 0.0, BIN_LOW
+    return BIN_LOW * BIN_GROWTH ** (index - 1), BIN_LOW * BIN_GROWTH ** index
+
+
+def percentile(bins: Dict[int, int], q: float, max_time: Optional[float] = None) -> Optional[float]:
+    """Percentile q (0-100) of a latency histogram, interpolated within its bin"""
+    total = sum(bins.values())
+    if not total:
+        return None
+    target = q / 100 * total
+    seen = 0
+    for index in sorted(bins):
+        count = bins[index]
+        if seen + count >= target:
+            low, high = bin_bounds(index)
+            if max_time is not None:
+                high = min(high, max_time)
+            value = low + (high - low) * (target - seen) / count
+            return round(value, 6)
+        seen += count
+    return max_time
+
+
+def bucket_start(at: datetime, granularity: str) -> datetime:
+    """Start of the hour or day containing a time"""
+    if granularity == RollupGranularity.DAY:
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+class RollupBatch:
+    """Rollup counters and histogram bins accumulated in memory"""
+
+    def __init__(self):
+        self.rollups: Dict[Key, Dict[str, float]] = defaultdict(
+            lambda: {"executions": 0, "errors": 0, "timeouts": 0, "total_time": 0.0, "max_time": 0.0}
+        )
+        self.bins: Dict[Key, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def add_execution(self, granularity: str, execution: Dict[str, Any]) -> None:
+        """Count one execution (a dict with CodeExecution columns)"""
+        key = (
+            granularity,
+            bucket_start(execution["created_at"], granularity),
+            execution["language"],
+            execution.get("project_id") or 0,
+        )
+        rollup = self.rollups[key]
+        rollup["executions"] += 1
+        rollup["errors"] += execution["status"] == "error"
+        rollup["timeouts"] += execution["status"] == "timeout"
+        rollup["total_time"] += execution["execution_time"]
+        rollup["max_time"] = max(rollup["max_time"], execution["execution_time"])
+        self.bins[key][latency_bin(execution["execution_time"])] += 1
+
+    def add_rollup(self, key: Key, values: Dict[str, float], bins: Dict[int, int]) -> None:
+        """Merge an existing rollup (and its bins) into this batch"""
+        rollup = self.rollups[key]
+        for counter in COUNTERS:
+            rollup[counter] += values[counter]
+        rollup["max_time"] = max(rollup["max_time"], values["max_time"])
+        for index, count in bins.items():
+            self.bins[key][index] += count
+
+    def save(self, db: Session) -> None:
+        """Add the batch to the stored rollups (caller commits)"""
+        if not self.rollups:
+            return
+        insert = dialect_insert(db.get_bind())
+
+        statement = insert(ExecutionRollup)
+        table = ExecutionRollup.__table__
+        changes = {counter: table.c[counter] + statement.excluded[counter] for counter in COUNTERS}
+        changes["max_time"] = case(
+            (statement.excluded.max_time > table.c.max_time, statement.excluded.max_time),
+            else_=table.c.max_time
+        )
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["granularity", "bucket_start", "language", "project_id"],
+                set_=changes
+            ),
+            [
+                {
+                    "granularity": key[0], "bucket_start": key[1],
+                    "language": key[2], "project_id": key[3],
+                    **values,
+                }
+                for key, values in self.rollups.items()
+            ]
+        )
+
+        statement = insert(ExecutionRollupBin)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["granularity", "bucket_start", "language", "project_id", "bin"],
+                set_={"count": ExecutionRollupBin.__table__.c["count"] + statement.excluded["count"]}
+            ),
+            [
+                {
+                    "granularity": key[0], "bucket_start": key[1],
+                    "language": key[2], "project_id": key[3],
+                    "bin": index, "count": count,
+                }
+                for key, bins in self.bins.items()
+                for index, count in bins.items()
+            ]
+        )
+
+
+def record_execution_rollups(db: Session, executions: Iterable[Dict[str, Any]]) -> None:
+    """Add new executions to the hourly rollups (in the caller's transaction)"""
+    batch = RollupBatch()
+    for execution in executions:
+        batch.add_execution(RollupGranularity.HOUR, execution)
+    batch.save(db)
+
+
+class RollupRecorder(PeriodicFlusher):
+    """
+    Counts finished executions in memory and adds them to the hourly
+    rollups every flush_interval seconds
+
+    Every execution is counted, whether or not it is saved to history.
+    """
+
+    def __init__(self, flush_interval: float = 5.0):
+        super().__init__(flush_interval)
+        self._batch = RollupBatch()
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.failed_flushes = 0
+
+    def add(self, execution: Dict[str, Any]) -> None:
+        """Count one execution (created_at, language, project_id, status, execution_time)"""
+        with self._lock:
+            self._batch.add_execution(RollupGranularity.HOUR, execution)
+            self.recorded += 1
+
+    def flush(self) -> int:
+        """Add the buffered counts to the stored rollups, returning how many rollups changed"""
+        with self._lock:
+            batch, self._batch = self._batch, RollupBatch()
+        if not batch.rollups:
+            return 0
+
+        db = SessionLocal()
+        try:
+            batch.save(db)
+            db.commit()
+            return len(batch.rollups)
+        except Exception as e:
+            db.rollback()
+            self.failed_flushes += 1
+            print(f"Failed to flush execution rollups: {e}")
+            with self._lock:
+                for key, values in batch.rollups.items():
+                    self._batch.add_rollup(key, values, batch.bins[key])
+            return 0
+        finally:
+            db.close()
+
+
+def _rollup_values(row) -> Dict[str, float]:
+    return {column: getattr(row, column) for column in COUNTERS + ("max_time",)}
+
+
+def compact_rollups(db: Session, before: datetime) -> int:
+    """
+    Fold hourly rollups of days before a time into daily rollups (caller commits)
+
+    Returns the number of hourly rollups compacted.
+    """
+    cutoff = bucket_start(before, RollupGranularity.DAY)
+    hourly = (
+        ExecutionRollup.granularity == RollupGranularity.HOUR,
+        ExecutionRollup.bucket_start < cutoff,
+    )
+    rows = db.execute(select(ExecutionRollup).where(*hourly)).scalars().all()
+    if not rows:
+        return 0
+
+    bins: Dict[Key, Dict[int, int]] = defaultdict(dict)
+    for row in db.execute(select(ExecutionRollupBin).where(
+        ExecutionRollupBin.granularity == RollupGranularity.HOUR,
+        ExecutionRollupBin.bucket_start < cutoff
+    )).scalars():
+        bins[(row.granularity, row.bucket_start, row.language, row.project_id)][row.bin] = row.count
+
+    batch = RollupBatch()
+    for row in rows:
+        key = (row.granularity, row.bucket_start, row.language, row.project_id)
+        daily = (RollupGranularity.DAY, bucket_start(row.bucket_start, RollupGranularity.DAY), row.language, row.project_id)
+        batch.add_rollup(daily, _rollup_values(row), bins.get(key, {}))
+    batch.save(db)
+
+    db.execute(delete(ExecutionRollupBin).where(
+        ExecutionRollupBin.granularity == RollupGranularity.HOUR,
+        ExecutionRollupBin.bucket_start < cutoff
+    ))
+    db.execute(delete(ExecutionRollup).where(*hourly))
+    return len(rows)
+
+
+def backfill_rollups(db: Session, batch_size: int = 10000) -> int:
+    """
+    Rebuild every rollup from code_executions (caller commits)
+
+    Only executions saved to history can be counted again; live rollups
+    also include runs that weren't saved.
+    """
+    db.execute(delete(ExecutionRollupBin))
+    db.execute(delete(ExecutionRollup))
+
+    columns = ("created_at", "language", "project_id", "status", "execution_time")
+    result = db.execute(
+        select(*(getattr(CodeExecution, column) for column in columns))
+        .execution_options(yield_per=batch_size)
+    )
+    total = 0
+    for rows in result.partitions():
+        record_execution_rollups(db, (dict(zip(columns, row)) for row in rows))
+        total += len(rows)
+    return total
+
+
+def query_series(
+    db: Session,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    language: Optional[str] = None,
+    project_id: Optional[int] = None,
+    group_by: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Time series of execution statistics
+
+    Daily series also include hourly rollups that aren't compacted yet.
+
+    Args:
+        group_by: "language" or "project" for one series each, None for totals
+    """
+    granularities = [granularity]
+    if granularity == RollupGranularity.DAY:
+        granularities.append(RollupGranularity.HOUR)
+
+    def filters(model):
+        conditions = [
+            model.granularity.in_(granularities),
+            model.bucket_start >= bucket_start(start, granularity),
+            model.bucket_start < end,
+        ]
+        if language is not None:
+            conditions.append(model.language == language)
+        if project_id is not None:
+            conditions.append(model.project_id == project_id)
+        return conditions
+
+    def series_key(key: Key):
+        _, start_of_bucket, row_language, row_project_id = key
+        group = None
+        if group_by == "language":
+            group = row_language
+        elif group_by == "project":
+            group = row_project_id or None
+        return bucket_start(start_of_bucket, granularity), group
+
+    bins: Dict[Key, Dict[int, int]] = defaultdict(dict)
+    for row in db.execute(select(ExecutionRollupBin).where(*filters(ExecutionRollupBin))).scalars():
+        bins[(row.granularity, row.bucket_start, row.language, row.project_id)][row.bin] = row.count
+
+    batch = RollupBatch()
+    for row in db.execute(select(ExecutionRollup).where(*filters(ExecutionRollup))).scalars():
+        key = (row.granularity, row.bucket_start, row.language, row.project_id)
+        batch.add_rollup(series_key(key), _rollup_values(row), bins.get(key, {}))
+
+    series = []
+    for (bucket, group), values in sorted(batch.rollups.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+        executions = values["executions"]
+        histogram = batch.bins.get((bucket, group), {})
+        point = {
+            "bucket_start": bucket,
+            "executions": executions,
+            "error_rate": round(values["errors"] / executions, 4) if executions else 0.0,
+            "timeout_rate": round(values["timeouts"] / executions, 4) if executions else 0.0,
+            "mean_time": round(values["total_time"] / executions, 6) if executions else None,
+            "p50_time": percentile(histogram, 50, values["max_time"]),
+            "p95_time": percentile(histogram, 95, values["max_time"]),
+            "max_time": values["max_time"],
+        }
+        if group_by == "language":
+            point["language"] = group
+        elif group_by == "project":
+            point["project_id"] = group
+        series.append(point)
+    return series
+
+
+class RollupCompactor:
+    """Periodically compacts hourly rollups past their retention into daily ones"""
+
+    def __init__(self, hourly_retention_days: int = 7, interval: int = 3600):
+        self.hourly_retention_days = hourly_retention_days
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def compact(self) -> int:
+        """Compact once, returning the number of hourly rollups folded"""
+        db = SessionLocal()
+        try:
+            compacted = compact_rollups(
+                db, datetime.utcnow() - timedelta(days=self.hourly_retention_days)
+            )
+            db.commit()
+            return compacted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def start(self) -> None:
+        """Start periodic compaction on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop periodic compaction"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Compact every interval seconds"""
+        while True:
+            try:
+                compacted = await asyncio.to_thread(self.compact)
+                if compacted:
+                    print(f"Compacted {compacted} hourly execution rollups")
+            except Exception as e:
+                print(f"Failed to compact execution rollups: {e}")
+            await asyncio.sleep(self.interval)
+
+
+# Global instances
+_rollup_recorder = None
+_rollup_compactor = None
+
+
+def get_rollup_recorder() -> RollupRecorder:
+    """Get or create the rollup recorder"""
+    global _rollup_recorder
+    if _rollup_recorder is None:
+        _rollup_recorder = RollupRecorder(flush_interval=settings.ROLLUP_FLUSH_INTERVAL)
+    return _rollup_recorder
+
+
+def get_rollup_compactor() -> RollupCompactor:
+    """Get or create the rollup compactor"""
+    global _rollup_compactor
+    if _rollup_compactor is None:
+        _rollup_compactor = RollupCompactor(
+            hourly_retention_days=settings.ROLLUP_HOURLY_RETENTION_DAYS,
+            interval=settings.ROLLUP_COMPACTION_INTERVAL
+        )
+    return _rollup_compactor
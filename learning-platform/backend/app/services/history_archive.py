@@ -0,0 +1,325 @@
+"""
+Execution History Archive
+Applies the retention policy to code_executions: expired rows are exported
+to gzip-compressed JSONL files on local disk and then deleted in bounded
+transactions. Archived runs can still be fetched on demand.
+"""
+import asyncio
+import glob
+import gzip
+import heapq
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.execution import CodeExecution
+from app.schemas.execution import CodeExecutionHistory
+from app.services.analytics import mark_analytics_stale
+from app.services.blob_store import delete_orphan_blobs
+from app.services.user_summary import remove_executions
+
+MANIFEST = "manifest.json"
+
+
+def _recency(created_at: str, execution_id: int) -> tuple:
+    """Sort key of an archived record, oldest first"""
+    return datetime.fromisoformat(created_at), execution_id
+
+
+class HistoryArchiver:
+    """Moves executions past the retention policy into cold storage"""
+
+    def __init__(
+        self,
+        archive_dir: str,
+        retention_days: int = 90,
+        keep_last: int = 100,
+        batch_size: int = 1000,
+        interval: int = 3600
+    ):
+        """
+        Initialize history archiver
+
+        Args:
+            archive_dir: Directory that holds the archive files
+            retention_days: Executions newer than this are always kept
+            keep_last: Newest executions always kept per user and project
+            batch_size: Rows exported and deleted per transaction
+            interval: Seconds between background archival runs
+        """
+        self.archive_dir = archive_dir
+        self.retention_days = retention_days
+        self.keep_last = keep_last
+        self.batch_size = batch_size
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._manifest_lock = threading.Lock()
+
+    def find_expired_partitions(self, db, cutoff: datetime) -> List[Tuple[int, Optional[int]]]:
+        """(user_id, project_id) pairs with more than keep_last runs, some older than cutoff"""
+        return db.execute(
+            select(CodeExecution.user_id, CodeExecution.project_id)
+            .group_by(CodeExecution.user_id, CodeExecution.project_id)
+            .having(
+                func.count() > self.keep_last,
+                func.min(CodeExecution.created_at) < cutoff
+            )
+            .order_by(CodeExecution.user_id, CodeExecution.project_id)
+        ).all()
+
+    def find_expired_ids(
+        self,
+        db,
+        cutoff: datetime,
+        user_id: int,
+        project_id: Optional[int]
+    ) -> List[int]:
+        """
+        IDs of one user's executions of one project that are both older
+        than cutoff and outside the newest keep_last, in ID order
+
+        Filtering to the partition first means the window function only
+        ranks that partition's rows (through its user/project index).
+        """
+        ranked = select(
+            CodeExecution.id,
+            CodeExecution.created_at,
+            func.row_number().over(
+                order_by=(CodeExecution.created_at.desc(), CodeExecution.id.desc())
+            ).label("recency")
+        ).where(
+            CodeExecution.user_id == user_id,
+            CodeExecution.project_id.is_(None) if project_id is None
+            else CodeExecution.project_id == project_id
+        ).subquery()
+        return db.execute(
+            select(ranked.c.id)
+            .where(ranked.c.created_at < cutoff, ranked.c.recency > self.keep_last)
+            .order_by(ranked.c.id)
+        ).scalars().all()
+
+    def archive(self) -> int:
+        """Run one archival pass, returning the number of archived executions"""
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        archived = 0
+        expired: List[int] = []
+        db = SessionLocal()
+        try:
+            partitions = self.find_expired_partitions(db, cutoff)
+            db.rollback()
+            for user_id, project_id in partitions:
+                expired.extend(self.find_expired_ids(db, cutoff, user_id, project_id))
+                db.rollback()  # end the read transaction before writing
+                while len(expired) >= self.batch_size:
+                    archived += self._archive_batch(expired[:self.batch_size])
+                    del expired[:self.batch_size]
+        finally:
+            db.close()
+        if expired:
+            archived += self._archive_batch(expired)
+
+        if archived:
+            db = SessionLocal()
+            try:
+                delete_orphan_blobs(db)
+                db.commit()
+            finally:
+                db.close()
+        return archived
+
+    def _archive_batch(self, ids: List[int]) -> int:
+        """Export one batch to disk, then delete it in its own transaction"""
+        db = SessionLocal()
+        try:
+            executions = db.query(CodeExecution).filter(
+                CodeExecution.id.in_(ids)
+            ).order_by(CodeExecution.id).all()
+
+            by_user: Dict[int, List[Dict[str, Any]]] = {}
+            for execution in executions:
+                record = CodeExecutionHistory.model_validate(execution).model_dump(mode="json")
+                by_user.setdefault(execution.user_id, []).append(record)
+            for user_id, records in by_user.items():
+                self._write_file(user_id, records)
+
+            # Files are on disk before the rows go away
+            db.query(CodeExecution).filter(
+                CodeExecution.id.in_([execution.id for execution in executions])
+            ).delete(synchronize_session=False)
+            remove_executions(db, Counter(execution.user_id for execution in executions))
+            mark_analytics_stale(db, by_user)
+            db.commit()
+            return len(executions)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _user_dir(self, user_id: int) -> str:
+        """Archive directory of a single user"""
+        return os.path.join(self.archive_dir, f"user_{user_id}")
+
+    def _write_file(self, user_id: int, records: List[Dict[str, Any]]) -> None:
+        """Atomically write a gzip JSONL file named after its ID range, and index it"""
+        user_dir = self._user_dir(user_id)
+        os.makedirs(user_dir, exist_ok=True)
+        name = f"executions_{records[0]['id']}_{records[-1]['id']}.jsonl.gz"
+        path = os.path.join(user_dir, name)
+        temp_path = f"{path}.tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        os.replace(temp_path, path)
+        with self._manifest_lock:
+            manifest = self._load_manifest(user_id)
+            manifest[name] = self._file_entry(records)
+            self._save_manifest(user_id, manifest)
+
+    def _user_files(self, user_id: int) -> List[tuple]:
+        """(first_id, last_id, path) of a user's archive files, newest first"""
+        files = []
+        for path in glob.glob(os.path.join(self._user_dir(user_id), "executions_*.jsonl.gz")):
+            first_id, last_id = os.path.basename(path)[len("executions_"):-len(".jsonl.gz")].split("_")
+            files.append((int(first_id), int(last_id), path))
+        return sorted(files, key=lambda f: f[1], reverse=True)
+
+    @staticmethod
+    def _read_file(path: str) -> List[Dict[str, Any]]:
+        """Load every record of an archive file"""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    @staticmethod
+    def _file_entry(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Manifest entry of an archive file: its newest record and its projects"""
+        newest = max(records, key=lambda record: _recency(record["created_at"], record["id"]))
+        return {
+            "newest": [newest["created_at"], newest["id"]],
+            "project_ids": list({record["project_id"] for record in records}),
+        }
+
+    def _load_manifest(self, user_id: int) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(os.path.join(self._user_dir(user_id), MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, user_id: int, manifest: Dict[str, Dict[str, Any]]) -> None:
+        path = os.path.join(self._user_dir(user_id), MANIFEST)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(f"{path}.tmp", path)
+
+    def _manifest(self, user_id: int) -> List[Tuple[Dict[str, Any], str]]:
+        """(manifest entry, path) of every archive file of a user, indexing unlisted files"""
+        with self._manifest_lock:
+            manifest = self._load_manifest(user_id)
+            paths = {os.path.basename(path): path for _, _, path in self._user_files(user_id)}
+            changed = False
+            for name, path in paths.items():
+                if name not in manifest:
+                    # Written before manifests existed, or by an interrupted pass
+                    manifest[name] = self._file_entry(self._read_file(path))
+                    changed = True
+            for name in set(manifest) - set(paths):
+                del manifest[name]
+                changed = True
+            if changed:
+                self._save_manifest(user_id, manifest)
+        return [(manifest[name], path) for name, path in paths.items()]
+
+    def list_archived(
+        self,
+        user_id: int,
+        project_id: Optional[int] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """A user's archived executions, newest first"""
+        # Files are cut per archival batch, and a later pass can archive runs
+        # older than an earlier file's, so files are visited by their newest
+        # record (from the manifest) until no remaining file can make the cut
+        files = sorted(
+            (
+                (_recency(*entry["newest"]), path)
+                for entry, path in self._manifest(user_id)
+                if project_id is None or project_id in entry["project_ids"]
+            ),
+            reverse=True
+        )
+        newest: List[tuple] = []  # min-heap of the newest limit records
+        seen = set()
+        for file_newest, path in files:
+            if len(newest) >= limit and file_newest < newest[0][0]:
+                break
+            for record in self._read_file(path):
+                if record["id"] in seen:
+                    continue
+                seen.add(record["id"])
+                if project_id is not None and record["project_id"] != project_id:
+                    continue
+                item = (_recency(record["created_at"], record["id"]), record)
+                if len(newest) < limit:
+                    heapq.heappush(newest, item)
+                elif item[0] > newest[0][0]:
+                    heapq.heapreplace(newest, item)
+        return [record for _, record in sorted(newest, key=lambda item: item[0], reverse=True)]
+
+    def get_archived(self, user_id: int, execution_id: int) -> Optional[Dict[str, Any]]:
+        """Fetch a single archived execution of a user"""
+        for first_id, last_id, path in self._user_files(user_id):
+            if first_id <= execution_id <= last_id:
+                for record in self._read_file(path):
+                    if record["id"] == execution_id:
+                        return record
+        return None
+
+    async def start(self) -> None:
+        """Start periodic archival on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop periodic archival"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Archive every interval seconds"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                archived = await asyncio.to_thread(self.archive)
+                if archived:
+                    print(f"Archived {archived} executions")
+            except Exception as e:
+                print(f"Failed to archive execution history: {e}")
+
+
+# Global archiver instance
+_history_archiver = None
+
+
+def get_history_archiver() -> HistoryArchiver:
+    """Get or create the execution history archiver"""
+    global _history_archiver
+    if _history_archiver is None:
+        _history_archiver = HistoryArchiver(
+            archive_dir=settings.HISTORY_ARCHIVE_DIR,
+            retention_days=settings.HISTORY_RETENTION_DAYS,
+            keep_last=settings.HISTORY_RETENTION_KEEP_LAST,
+            batch_size=settings.HISTORY_ARCHIVE_BATCH_SIZE,
+            interval=settings.HISTORY_ARCHIVE_INTERVAL
+        )
+    return _history_archiver
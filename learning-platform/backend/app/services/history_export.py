@@ -0,0 +1,115 @@
+"""
+Execution History Export
+Streams code_executions as NDJSON or CSV, optionally gzip-compressed,
+in constant memory: rows are read in batches and encoded as they go.
+"""
+import csv
+import io
+import zlib
+from typing import Any, Dict, Iterator, List
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.responses import dumps
+from app.models.execution import CodeExecution
+from app.schemas.execution import CodeExecutionHistory
+from app.services.blob_store import EXECUTION_BLOB_FIELDS, load_blob_texts
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+EXPORT_FIELDS = list(CodeExecutionHistory.model_fields)
+
+
+def _records(db: Session, rows) -> List[Dict[str, Any]]:
+    """Turn execution rows into history records, loading their texts in one query"""
+    texts = load_blob_texts(db, (
+        getattr(row, hash_column) for row in rows for hash_column in EXECUTION_BLOB_FIELDS.values()
+    ))
+    records = []
+    for row in rows:
+        record = row._asdict()
+        for field, hash_column in EXECUTION_BLOB_FIELDS.items():
+            record[field] = texts.get(record.pop(hash_column))
+        record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+        records.append({field: record[field] for field in EXPORT_FIELDS})
+    return records
+
+
+def iter_executions(
+    filters: List[Any], batch_size: int, session_factory: sessionmaker
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield batches of matching executions as history records, oldest first
+
+    Reads go through session_factory, the request's read_session_factory,
+    so clients that just wrote are served from the primary.
+
+    PostgreSQL streams one query through a server-side cursor (yield_per),
+    which reads a consistent snapshot without blocking writers. SQLite reads
+    keyset-paginated batches, each in its own short transaction, so a long
+    export never pins the WAL or holds a lock that writers wait on.
+    """
+    columns = [
+        getattr(CodeExecution, field) for field in EXPORT_FIELDS if field not in EXECUTION_BLOB_FIELDS
+    ] + [getattr(CodeExecution, hash_column) for hash_column in EXECUTION_BLOB_FIELDS.values()]
+    statement = select(*columns).where(*filters).order_by(CodeExecution.id)
+
+    db = session_factory()
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            result = db.execute(statement.execution_options(yield_per=batch_size))
+            for rows in result.partitions():
+                yield _records(db, rows)
+            return
+
+        last_id = 0
+        while True:
+            rows = db.execute(statement.where(CodeExecution.id > last_id).limit(batch_size)).all()
+            batch = _records(db, rows)
+            db.rollback()  # end the read transaction between batches
+            if not batch:
+                return
+            last_id = batch[-1]["id"]
+            yield batch
+    finally:
+        db.close()
+
+
+def encode_batch(records: List[Dict[str, Any]], export_format: str, header: bool = False) -> bytes:
+    """Encode a batch of records as NDJSON lines or CSV rows"""
+    if export_format == "ndjson":
+        return b"".join(dumps(record) + b"\n" for record in records)
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    if header:
+        writer.writeheader()
+    writer.writerows(records)
+    return buffer.getvalue().encode()
+
+
+def export_executions(
+    filters: List[Any],
+    session_factory: sessionmaker,
+    export_format: str = "ndjson",
+    compress: bool = False
+) -> Iterator[bytes]:
+    """Stream matching executions in an export format, gzip-compressed if asked"""
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31) if compress else None
+    first = True
+    for batch in iter_executions(filters, settings.EXPORT_BATCH_SIZE, session_factory):
+        chunk = encode_batch(batch, export_format, header=first)
+        first = False
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+
+    if first and export_format == "csv":
+        # No rows: still a valid CSV with its header
+        chunk = encode_batch([], export_format, header=True)
+        yield compressor.compress(chunk) if compressor is not None else chunk
+    if compressor is not None:
+        yield compressor.flush()
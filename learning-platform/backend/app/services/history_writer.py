@@ -0,0 +1,197 @@
+"""
+Execution History Write-Behind Buffer
+Collects CodeExecution rows in memory and persists them in bulk inserts,
+keeping the history commit off the latency path of /code/execute
+"""
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import registry
+from app.models.execution import CodeExecution
+from app.services.background import PeriodicFlusher
+from app.services.blob_store import store_execution_blobs
+from app.services.user_summary import update_user_summaries
+
+
+class HistoryWriter(PeriodicFlusher):
+    """Buffers execution history rows and flushes them by size or time"""
+
+    def __init__(
+        self,
+        flush_size: int = 100,
+        flush_interval: float = 1.0,
+        max_buffered: int = 10000
+    ):
+        """
+        Initialize history writer
+
+        Args:
+            flush_size: Number of buffered rows that triggers an early flush
+            flush_interval: Maximum seconds a row waits before being flushed
+            max_buffered: Rows kept for retry after failed flushes before dropping
+        """
+        super().__init__(flush_interval)
+        self.flush_size = flush_size
+        self.max_buffered = max_buffered
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._pending_users: Counter = Counter()
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self.flushed_rows = 0
+        self.dropped_rows = 0
+        self.rejected_rows = 0
+        self.failed_flushes = 0
+
+    @property
+    def buffered_rows(self) -> int:
+        """Rows accepted but not yet committed to the database"""
+        return sum(self._pending_users.values())
+
+    def add(self, **values: Any) -> None:
+        """
+        Queue a CodeExecution row for insertion
+
+        Without a running background flusher (scripts, tests without a
+        lifespan) the row is written through immediately, so call this from
+        a thread (run_in_threadpool) in async code.
+        """
+        values.setdefault("created_at", datetime.utcnow())
+        with self._buffer_lock:
+            self._buffer.append(values)
+            self._pending_users[values["user_id"]] += 1
+            buffered = len(self._buffer)
+
+        if not self.running:
+            self.flush()
+        elif buffered >= self.flush_size:
+            self.request_flush()
+
+    def has_pending(self, user_id: int) -> bool:
+        """Whether a user has rows that aren't readable from the database yet"""
+        return self._pending_users.get(user_id, 0) > 0
+
+    def flush_for_user(self, user_id: int) -> int:
+        """Flush before a read so users always see their own executions (returns rows written)"""
+        if self.has_pending(user_id):
+            return self.flush()
+        return 0
+
+    def flush(self) -> int:
+        """Write all buffered rows in one bulk insert, returning the row count"""
+        with self._flush_lock:
+            with self._buffer_lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+
+            try:
+                self._write(rows)
+                written, failed = rows, []
+            except Exception as e:
+                self.failed_flushes += 1
+                print(f"Failed to flush execution history, retrying row by row: {e}")
+                written, failed = self._write_each(rows)
+
+            if failed:
+                self._requeue(failed)
+            retried = {id(row) for row in failed}
+            with self._buffer_lock:
+                self._pending_users.subtract(row["user_id"] for row in rows if id(row) not in retried)
+                self._pending_users += Counter()  # drop zero counts
+            self.flushed_rows += len(written)
+            return len(written)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert rows and update their users' summaries in one transaction"""
+        db = SessionLocal()
+        try:
+            db.execute(insert(CodeExecution), store_execution_blobs(db, rows))
+            activity: Dict[int, datetime] = {}
+            for row in rows:
+                activity[row["user_id"]] = max(activity.get(row["user_id"], row["created_at"]), row["created_at"])
+            update_user_summaries(
+                db,
+                activity=activity,
+                executions=Counter(row["user_id"] for row in rows)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write_each(self, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Write rows one at a time after a failed bulk flush
+
+        Rows the database rejects (constraint or data errors, e.g. an unknown
+        project_id) are dropped and counted so one bad row can't block the
+        rest. Any other error (database unavailable) stops the retry, and the
+        row with all that follow it is returned to be flushed later.
+        Returns (written, failed) rows.
+        """
+        written = []
+        for index, row in enumerate(rows):
+            try:
+                self._write([row])
+                written.append(row)
+            except (IntegrityError, DataError) as e:
+                self.rejected_rows += 1
+                print(f"Dropped execution history row of user {row['user_id']}: {e}")
+            except Exception:
+                return written, rows[index:]
+        return written, []
+
+    def _requeue(self, rows: List[Dict[str, Any]]) -> None:
+        """Put rows from a failed flush back, dropping the oldest past the cap"""
+        with self._buffer_lock:
+            combined = rows + self._buffer
+            overflow = max(0, len(combined) - self.max_buffered)
+            if overflow:
+                self._pending_users.subtract(row["user_id"] for row in combined[:overflow])
+                self._pending_users += Counter()
+                self.dropped_rows += overflow
+                print(f"Dropped {overflow} execution history rows (buffer full)")
+            self._buffer = combined[overflow:]
+
+    def stats(self) -> Dict[str, int]:
+        """Buffer metrics"""
+        return {
+            "buffered_rows": self.buffered_rows,
+            "flushed_rows": self.flushed_rows,
+            "dropped_rows": self.dropped_rows,
+            "rejected_rows": self.rejected_rows,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+# Global writer instance
+_history_writer = None
+
+
+def get_history_writer() -> HistoryWriter:
+    """Get or create the execution history writer"""
+    global _history_writer
+    if _history_writer is None:
+        _history_writer = HistoryWriter(
+            flush_size=settings.HISTORY_FLUSH_SIZE,
+            flush_interval=settings.HISTORY_FLUSH_INTERVAL,
+            max_buffered=settings.HISTORY_BUFFER_MAX
+        )
+    return _history_writer
+
+
+registry.stats(
+    "history_buffer", "Execution history write-behind buffer",
+    lambda: get_history_writer().stats(),
+    counters=("flushed_rows", "dropped_rows", "rejected_rows", "failed_flushes"),
+    gauges=("buffered_rows",)
+)
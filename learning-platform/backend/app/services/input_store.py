@@ -0,0 +1,167 @@
+"""
+Execution Input Store
+Standard input for executions, uploaded as a stream and stored on disk
+under its owner's directory and SHA-256 hash, so a dataset used for many
+runs is stored once per user (and other users can't probe for it).
+Executions read it back in chunks while piping it to the program.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import time
+from typing import AsyncIterator, Optional, Tuple
+from app.core.config import settings
+
+INPUT_ID = re.compile(r"^[0-9a-f]{64}$")
+
+
+class InputTooLarge(ValueError):
+    """Raised when an upload exceeds the store's size limit"""
+
+
+class InputStore:
+    """Content-addressed input files per owner, deleted once unused for the retention period"""
+
+    WRITE_SIZE = 1024 * 1024
+
+    def __init__(self, root: str, retention_hours: float = 24, max_bytes: int = 0,
+                 sweep_interval: float = 600):
+        self.root = root
+        self.retention = retention_hours * 3600
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def save(self, owner: int, chunks: AsyncIterator[bytes]) -> Tuple[str, int]:
+        """
+        Store a streamed upload for owner, hashing it as it is written
+
+        Returns its input ID (SHA-256 hex digest) and size. Uploading
+        content the owner already stored only refreshes its retention.
+        Chunks are buffered into WRITE_SIZE writes, which (like hashing
+        and the other file operations) run in a thread, off the event loop.
+        """
+        owner_dir = os.path.join(self.root, str(owner))
+        fd, temp_path = await asyncio.to_thread(_temp_file, owner_dir)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            f = os.fdopen(fd, "wb")
+            try:
+                pending = bytearray()
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise InputTooLarge(f"Input is too large (max {self.max_bytes} bytes)")
+                    pending += chunk
+                    if len(pending) >= self.WRITE_SIZE:
+                        await asyncio.to_thread(_append, f, digest, pending)
+                        pending = bytearray()
+                await asyncio.to_thread(_append, f, digest, pending)
+            finally:
+                await asyncio.to_thread(f.close)
+            input_id = digest.hexdigest()
+            await asyncio.to_thread(_keep, temp_path, os.path.join(owner_dir, input_id))
+            return input_id, size
+        finally:
+            await asyncio.to_thread(_discard, temp_path)
+
+    def path(self, owner: int, input_id: str) -> Optional[str]:
+        """Path of an owner's stored input (refreshing its retention), or None if unknown"""
+        if not INPUT_ID.match(input_id):
+            return None
+        path = os.path.join(self.root, str(owner), input_id)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def sweep(self) -> int:
+        """Delete inputs unused for the retention period, returning how many"""
+        cutoff = time.time() - self.retention
+        deleted = 0
+        if not os.path.isdir(self.root):
+            return 0
+        for owner in os.scandir(self.root):
+            # Files directly under root predate per-owner directories
+            entries = os.scandir(owner.path) if owner.is_dir() else [owner]
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        deleted += 1
+                except FileNotFoundError:
+                    pass
+        return deleted
+
+    async def start(self) -> None:
+        """Start periodic sweeping on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop periodic sweeping"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Sweep every sweep_interval seconds"""
+        while True:
+            try:
+                deleted = await asyncio.to_thread(self.sweep)
+                if deleted:
+                    print(f"Deleted {deleted} unused execution inputs")
+            except Exception as e:
+                print(f"Failed to sweep execution inputs: {e}")
+            await asyncio.sleep(self.sweep_interval)
+
+
+def _temp_file(directory: str) -> Tuple[int, str]:
+    """Create a temporary upload file in directory"""
+    os.makedirs(directory, exist_ok=True)
+    return tempfile.mkstemp(dir=directory, prefix=".upload-")
+
+
+def _append(f, digest, data: bytes) -> None:
+    """Hash and write a buffered part of an upload"""
+    digest.update(data)
+    f.write(data)
+
+
+def _keep(temp_path: str, path: str) -> None:
+    """Move a finished upload into place, or refresh the copy already stored"""
+    if os.path.exists(path):
+        os.utime(path)
+    else:
+        os.replace(temp_path, path)
+
+
+def _discard(temp_path: str) -> None:
+    """Delete what is left of an upload's temporary file"""
+    if os.path.exists(temp_path):
+        os.unlink(temp_path)
+
+
+# Global store instance
+_input_store = None
+
+
+def get_input_store() -> InputStore:
+    """Get or create the input store"""
+    global _input_store
+    if _input_store is None:
+        _input_store = InputStore(
+            root=settings.INPUT_STORE_DIR,
+            retention_hours=settings.INPUT_RETENTION_HOURS,
+            max_bytes=settings.INPUT_MAX_BYTES,
+            sweep_interval=settings.INPUT_SWEEP_INTERVAL
+        )
+    return _input_store
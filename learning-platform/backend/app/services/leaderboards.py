@@ -0,0 +1,274 @@
+"""
+Leaderboards
+Ranks users by completed projects, time spent and executions without
+sorting the users table per request. Scores come from user_summaries: they
+are loaded once, then updated as summaries change (after commit), and kept
+either in an in-memory sorted index or in Redis sorted sets (USE_REDIS).
+"""
+import asyncio
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.summary import UserSummary
+
+# Leaderboard name -> user_summaries column it ranks by
+METRICS = {
+    "completed": "completed_count",
+    "time_spent": "total_time_spent",
+    "executions": "executions_count",
+}
+
+Scores = Dict[int, Dict[str, int]]  # user_id -> {metric: score}
+
+
+class SortedIndex:
+    """Users of one leaderboard kept in rank order (score desc, then user ID)"""
+
+    def __init__(self, scores: Optional[Dict[int, int]] = None):
+        self._scores: Dict[int, int] = dict(scores or {})
+        self._keys: List[Tuple[int, int]] = sorted(
+            (-score, user_id) for user_id, score in self._scores.items()
+        )
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def set(self, user_id: int, score: int) -> None:
+        """Insert or move a user (binary search plus one list shift)"""
+        old = self._scores.get(user_id)
+        if old == score:
+            return
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, user_id))]
+        insort(self._keys, (-score, user_id))
+        self._scores[user_id] = score
+
+    def rank(self, user_id: int) -> Optional[Tuple[int, int]]:
+        """1-based rank and score of a user, by binary search"""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        return bisect_left(self._keys, (-score, user_id)) + 1, score
+
+    def top(self, limit: int, offset: int = 0) -> List[Tuple[int, int]]:
+        """(user_id, score) pairs from rank offset + 1"""
+        return [(user_id, -score) for score, user_id in self._keys[offset:offset + limit]]
+
+
+class MemoryLeaderboardStore:
+    """Leaderboards held in process memory"""
+
+    def __init__(self):
+        self._indexes = {metric: SortedIndex() for metric in METRICS}
+        self._lock = threading.Lock()
+
+    def replace(self, scores: Scores) -> None:
+        """Swap in leaderboards built from complete scores"""
+        indexes = {
+            metric: SortedIndex({user_id: values[metric] for user_id, values in scores.items()})
+            for metric in METRICS
+        }
+        with self._lock:
+            self._indexes = indexes
+
+    def update(self, scores: Scores) -> None:
+        """Apply new scores of some users"""
+        with self._lock:
+            for user_id, values in scores.items():
+                for metric, score in values.items():
+                    self._indexes[metric].set(user_id, score)
+
+    def top(self, metric: str, limit: int, offset: int = 0) -> List[Tuple[int, int]]:
+        with self._lock:
+            return self._indexes[metric].top(limit, offset)
+
+    def rank(self, metric: str, user_id: int) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            return self._indexes[metric].rank(user_id)
+
+    def size(self, metric: str) -> int:
+        return len(self._indexes[metric])
+
+
+class RedisLeaderboardStore:
+    """Leaderboards held in Redis sorted sets, shared by every API process"""
+
+    def __init__(self, url: str, prefix: str = "leaderboard:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, metric: str) -> str:
+        return f"{self.prefix}{metric}"
+
+    def is_empty(self) -> bool:
+        return not self.client.exists(*(self._key(metric) for metric in METRICS))
+
+    def replace(self, scores: Scores, chunk_size: int = 10000) -> None:
+        users = list(scores.items())
+        for metric in METRICS:
+            staging = self._key(metric) + ":loading"
+            pipeline = self.client.pipeline()
+            pipeline.delete(staging)
+            for start in range(0, len(users), chunk_size):
+                pipeline.zadd(staging, {
+                    user_id: values[metric] for user_id, values in users[start:start + chunk_size]
+                })
+            if users:
+                pipeline.rename(staging, self._key(metric))
+            else:
+                pipeline.delete(self._key(metric))
+            pipeline.execute()
+
+    def update(self, scores: Scores) -> None:
+        pipeline = self.client.pipeline()
+        for user_id, values in scores.items():
+            for metric, score in values.items():
+                pipeline.zadd(self._key(metric), {user_id: score})
+        pipeline.execute()
+
+    def top(self, metric: str, limit: int, offset: int = 0) -> List[Tuple[int, int]]:
+        entries = self.client.zrevrange(self._key(metric), offset, offset + limit - 1, withscores=True)
+        return [(int(user_id), int(score)) for user_id, score in entries]
+
+    def rank(self, metric: str, user_id: int) -> Optional[Tuple[int, int]]:
+        pipeline = self.client.pipeline()
+        pipeline.zrevrank(self._key(metric), user_id)
+        pipeline.zscore(self._key(metric), user_id)
+        rank, score = pipeline.execute()
+        return None if rank is None else (rank + 1, int(score))
+
+    def size(self, metric: str) -> int:
+        return self.client.zcard(self._key(metric))
+
+
+class Leaderboards:
+    """Loads leaderboards from user_summaries and keeps them current"""
+
+    def __init__(self, store, resync_interval: float = 300.0):
+        """
+        Initialize leaderboards
+
+        Args:
+            store: MemoryLeaderboardStore or RedisLeaderboardStore
+            resync_interval: Seconds between full reloads of an in-memory
+                store, which picks up summaries changed by other processes
+        """
+        self.store = store
+        self.resync_interval = resync_interval
+        self.loaded = False
+        self._load_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def load(self) -> int:
+        """Rebuild every leaderboard from user_summaries"""
+        db = SessionLocal()
+        try:
+            rows = db.execute(select(
+                UserSummary.user_id, *(getattr(UserSummary, column) for column in METRICS.values())
+            )).all()
+        finally:
+            db.close()
+        self.store.replace({
+            row[0]: dict(zip(METRICS, (score or 0 for score in row[1:]))) for row in rows
+        })
+        self.loaded = True
+        return len(rows)
+
+    def ensure_loaded(self) -> None:
+        """Load on first use (a shared Redis store is only loaded when empty)"""
+        if self.loaded:
+            return
+        with self._load_lock:
+            if self.loaded:
+                return
+            if isinstance(self.store, RedisLeaderboardStore) and not self.store.is_empty():
+                self.loaded = True
+            else:
+                self.load()
+
+    def update(self, scores: Scores) -> None:
+        """Apply committed score changes (ignored until the first load)"""
+        if self.loaded:
+            self.store.update(scores)
+
+    def top(self, metric: str, limit: int = 10, offset: int = 0) -> List[Tuple[int, int]]:
+        """(user_id, score) pairs of the best ranked users"""
+        self.ensure_loaded()
+        return self.store.top(metric, limit, offset)
+
+    def rank(self, metric: str, user_id: int) -> Optional[Tuple[int, int]]:
+        """Rank and score of one user, or None if they have no summary yet"""
+        self.ensure_loaded()
+        return self.store.rank(metric, user_id)
+
+    def size(self, metric: str) -> int:
+        """Number of ranked users"""
+        self.ensure_loaded()
+        return self.store.size(metric)
+
+    async def start(self) -> None:
+        """Load the leaderboards and resync an in-memory store periodically"""
+        await asyncio.to_thread(self.ensure_loaded)
+        if isinstance(self.store, MemoryLeaderboardStore) and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop periodic resyncing"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Reload every resync_interval seconds"""
+        while True:
+            await asyncio.sleep(self.resync_interval)
+            try:
+                await asyncio.to_thread(self.load)
+            except Exception as e:
+                print(f"Failed to reload leaderboards: {e}")
+
+
+# Global leaderboards instance
+_leaderboards = None
+
+
+def get_leaderboards() -> Leaderboards:
+    """Get or create the leaderboards"""
+    global _leaderboards
+    if _leaderboards is None:
+        if settings.USE_REDIS:
+            store = RedisLeaderboardStore(settings.REDIS_URL)
+        else:
+            store = MemoryLeaderboardStore()
+        _leaderboards = Leaderboards(store, resync_interval=settings.LEADERBOARD_RESYNC_INTERVAL)
+    return _leaderboards
+
+
+def stage_leaderboard_scores(session: Session, scores: Scores) -> None:
+    """Publish users' new scores once this session commits"""
+    session.info.setdefault("leaderboard_scores", {}).update(scores)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_leaderboard_scores(session):
+    scores = session.info.pop("leaderboard_scores", None)
+    if scores:
+        try:
+            get_leaderboards().update(scores)
+        except Exception as e:
+            print(f"Failed to update leaderboards: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_leaderboard_scores(session):
+    session.info.pop("leaderboard_scores", None)
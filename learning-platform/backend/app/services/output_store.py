@@ -0,0 +1,249 @@
+"""
+Execution Output Store
+Large program output is streamed to files on disk while it is produced,
+instead of being truncated. Executions keep a head/tail preview; the full
+output is served in byte ranges from memory-mapped files until it expires.
+"""
+import asyncio
+import mmap
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Iterator, Optional, Tuple
+from app.core.config import settings
+
+OUTPUT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class OutputSpool:
+    """
+    Collects one output stream of a running program
+
+    Output up to inline_limit bytes stays in memory. Beyond that everything
+    is stored to path (up to max_bytes) and only the head and tail of the
+    stream are kept in memory for the preview. Stored output is buffered
+    until FLUSH_SIZE bytes are pending; flush() writes them to disk and
+    blocks, so async callers run it in a thread.
+    """
+
+    FLUSH_SIZE = 1024 * 1024
+
+    def __init__(self, inline_limit: int, path: Optional[str] = None, max_bytes: int = 0):
+        self.inline_limit = inline_limit
+        self.path = path  # None keeps only the preview of large output
+        self.max_bytes = max_bytes
+        self.size = 0  # bytes produced
+        self.stored = 0  # bytes stored to path (written or pending)
+        self._buffer = bytearray()  # all output, then only its head
+        self._tail = bytearray()
+        self._tail_size = inline_limit - inline_limit // 2
+        self._pending = bytearray()  # stored bytes not yet written
+        self._file = None
+        self._lock = threading.Lock()  # a flush thread may outlive a cancelled execution
+        self._discarded = False
+        self.spilled = False
+
+    def write(self, chunk: bytes) -> None:
+        """Add a chunk of output"""
+        self.size += len(chunk)
+        if not self.spilled:
+            self._buffer += chunk
+            if len(self._buffer) <= self.inline_limit:
+                return
+            self.spilled = True
+            self._store(self._buffer)
+            head = self.inline_limit // 2
+            self._tail = self._buffer[head:]
+            del self._buffer[head:]
+        else:
+            self._store(chunk)
+            self._tail += chunk
+        del self._tail[:-self._tail_size]
+
+    @property
+    def truncated(self) -> bool:
+        """Whether some of the output is only in the preview, not stored"""
+        return self.spilled and self.stored < self.size
+
+    @property
+    def flush_due(self) -> bool:
+        """Whether enough stored output is pending for a disk write"""
+        return len(self._pending) >= self.FLUSH_SIZE
+
+    def _store(self, data) -> None:
+        if self.path is None or self.stored >= self.max_bytes:
+            return
+        data = data[:self.max_bytes - self.stored]
+        self._pending += data
+        self.stored += len(data)
+
+    def flush(self) -> None:
+        """Write pending output to disk, creating the file once output spills"""
+        with self._lock:
+            if not self.spilled or self.path is None or self._discarded:
+                return
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "wb")
+            if self._pending:
+                data, self._pending = self._pending, bytearray()
+                self._file.write(data)
+
+    def finish(self) -> Tuple[str, Optional[str]]:
+        """
+        Close the spool
+
+        Returns the text to keep with the execution (all of it, or a
+        head/tail preview of spilled output) and the ID of the stored full
+        output, if any.
+        """
+        if not self.spilled:
+            return self._buffer.decode(errors="replace"), None
+
+        self.flush()  # normally a no-op: the reader flushed at end of stream
+        output_id = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            output_id = os.path.basename(self.path)
+        omitted = self.size - len(self._buffer) - len(self._tail)
+        preview = (
+            self._buffer.decode(errors="ignore")
+            + f"\n\n... [{omitted} bytes omitted, {self.size} bytes total] ...\n\n"
+            + self._tail.decode(errors="ignore")
+        )
+        return preview, output_id
+
+    def discard(self) -> None:
+        """Close the spool and delete anything written to disk"""
+        with self._lock:
+            self._discarded = True
+            self._pending = bytearray()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                os.unlink(self.path)
+
+
+class OutputStore:
+    """Full program outputs on disk, one file per output under its owner's directory"""
+
+    def __init__(self, root: str, retention_hours: float = 24, max_bytes: int = 0,
+                 sweep_interval: float = 600):
+        self.root = root
+        self.retention = retention_hours * 3600
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._task: Optional[asyncio.Task] = None
+
+    def spool(self, inline_limit: int, owner: Optional[int] = None) -> OutputSpool:
+        """A spool that stores large output for owner (or only previews it, without one)"""
+        path = None
+        if owner is not None:
+            path = os.path.join(self.root, str(owner), uuid.uuid4().hex)
+        return OutputSpool(inline_limit, path, self.max_bytes)
+
+    def path(self, owner: int, output_id: str) -> Optional[str]:
+        """Path of a stored output, or None if it doesn't exist or has expired"""
+        if not OUTPUT_ID.match(output_id):
+            return None
+        path = os.path.join(self.root, str(owner), output_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.retention:
+                return None
+        except OSError:
+            return None
+        return path
+
+    def sweep(self) -> int:
+        """Delete outputs older than the retention period, returning how many"""
+        cutoff = time.time() - self.retention
+        deleted = 0
+        if not os.path.isdir(self.root):
+            return 0
+        for owner in os.scandir(self.root):
+            if not owner.is_dir():
+                continue
+            for entry in os.scandir(owner.path):
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        deleted += 1
+                except FileNotFoundError:
+                    pass
+        return deleted
+
+    async def start(self) -> None:
+        """Start periodic sweeping on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop periodic sweeping"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Sweep every sweep_interval seconds"""
+        while True:
+            try:
+                deleted = await asyncio.to_thread(self.sweep)
+                if deleted:
+                    print(f"Deleted {deleted} expired execution outputs")
+            except Exception as e:
+                print(f"Failed to sweep execution outputs: {e}")
+            await asyncio.sleep(self.sweep_interval)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=" Range header into a [start, end) byte range
+
+    Returns None for a missing header and raises ValueError for a range
+    that can't be satisfied. Multiple ranges are not supported.
+    """
+    if not header:
+        return None
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", header)
+    if not match or not (match.group(1) or match.group(2)):
+        raise ValueError(f"Unsupported range: {header}")
+    first, last = match.groups()
+    if not first:  # suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size
+    else:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+    if start >= end:
+        raise ValueError(f"Range not satisfiable: {header}")
+    return start, end
+
+
+def iter_file_range(path: str, start: int, end: int, chunk_size: int = 65536) -> Iterator[bytes]:
+    """Read bytes [start, end) of a file through a memory map, chunk by chunk"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for offset in range(start, end, chunk_size):
+            yield mapped[offset:min(offset + chunk_size, end)]
+
+
+# Global store instance
+_output_store = None
+
+
+def get_output_store() -> OutputStore:
+    """Get or create the output store"""
+    global _output_store
+    if _output_store is None:
+        _output_store = OutputStore(
+            root=settings.OUTPUT_STORE_DIR,
+            retention_hours=settings.OUTPUT_RETENTION_HOURS,
+            max_bytes=settings.OUTPUT_STORE_MAX_BYTES,
+            sweep_interval=settings.OUTPUT_SWEEP_INTERVAL
+        )
+    return _output_store
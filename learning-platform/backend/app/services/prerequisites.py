@@ -0,0 +1,106 @@
+"""
+Project Prerequisite Graph
+Parses Project.prerequisites (a JSON array of project IDs) into a DAG once
+per catalog snapshot, and answers unlock / recommendation questions
+against a user's progress without further queries
+"""
+import json
+import logging
+from collections import deque
+from typing import Any, Dict, List, Set
+from app.models.progress import ProgressStatus
+
+logger = logging.getLogger(__name__)
+
+
+def parse_prerequisites(raw: Any) -> List[int]:
+    """Parse a prerequisites value like "[1, 2]" into project IDs"""
+    if not raw:
+        return []
+    try:
+        values = json.loads(raw) if isinstance(raw, str) else raw
+        return [int(value) for value in values]
+    except (ValueError, TypeError):
+        logger.warning("Ignoring malformed prerequisites: %r", raw)
+        return []
+
+
+class PrerequisiteGraph:
+    """Indexed prerequisite DAG with a topological order"""
+
+    def __init__(self, projects: List[Dict[str, Any]]):
+        """
+        Build the graph
+
+        Args:
+            projects: Catalog projects (dicts with id and prerequisites),
+                ordered by project_number, which breaks ties in the order
+        """
+        known = {project["id"] for project in projects}
+        self.prerequisites: Dict[int, List[int]] = {}
+        self.dependents: Dict[int, List[int]] = {project["id"]: [] for project in projects}
+
+        for project in projects:
+            prerequisites = []
+            for prerequisite in parse_prerequisites(project.get("prerequisites")):
+                if prerequisite not in known or prerequisite == project["id"]:
+                    logger.warning(
+                        "Project %s has invalid prerequisite %s", project["id"], prerequisite
+                    )
+                    continue
+                prerequisites.append(prerequisite)
+                self.dependents[prerequisite].append(project["id"])
+            self.prerequisites[project["id"]] = prerequisites
+
+        self.order, self.cyclic = self._topological_sort([project["id"] for project in projects])
+        if self.cyclic:
+            logger.warning("Prerequisite cycle between projects %s", sorted(self.cyclic))
+
+    def _topological_sort(self, project_ids: List[int]):
+        """Kahn's algorithm; projects left over are part of a cycle"""
+        remaining = {project_id: len(self.prerequisites[project_id]) for project_id in project_ids}
+        ready = deque(project_id for project_id in project_ids if remaining[project_id] == 0)
+        order = []
+        while ready:
+            project_id = ready.popleft()
+            order.append(project_id)
+            for dependent in self.dependents[project_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        ordered = set(order)
+        return order, {project_id for project_id in project_ids if project_id not in ordered}
+
+    def roadmap(self, statuses: Dict[int, str], recommend: int = 3) -> Dict[str, Any]:
+        """
+        Classify every project for a user
+
+        Args:
+            statuses: Progress status per project ID for the user
+            recommend: Number of next projects to recommend
+        """
+        completed: Set[int] = {
+            project_id for project_id, status in statuses.items()
+            if status == ProgressStatus.COMPLETED.value
+        }
+        result = {"completed": [], "in_progress": [], "unlocked": [], "locked": []}
+
+        for project_id in self.order + sorted(self.cyclic):
+            status = statuses.get(project_id)
+            if status == ProgressStatus.COMPLETED.value:
+                result["completed"].append(project_id)
+            elif status == ProgressStatus.IN_PROGRESS.value:
+                result["in_progress"].append(project_id)
+            else:
+                missing = [p for p in self.prerequisites[project_id] if p not in completed]
+                if missing or project_id in self.cyclic:
+                    result["locked"].append({
+                        "project_id": project_id,
+                        "missing_prerequisites": missing,
+                    })
+                else:
+                    result["unlocked"].append(project_id)
+
+        # Finish what was started first, then the next unlocked projects
+        result["recommended"] = (result["in_progress"] + result["unlocked"])[:recommend]
+        return result
@@ -0,0 +1,257 @@
+"""
+Progress Heartbeat Buffer
+Coalesces the editor's frequent progress heartbeats in memory per
+(user, project) and applies the merged deltas to user_progress as batched
+upserts once per flush interval
+"""
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.exc import DataError, IntegrityError
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.database import SessionLocal, dialect_insert
+from app.models.progress import UserProgress, ProgressStatus
+from app.services.background import PeriodicFlusher
+from app.services.user_summary import update_user_summaries
+
+Key = Tuple[int, int]  # (user_id, project_id)
+
+
+class ProgressHeartbeats(PeriodicFlusher):
+    """Aggregates progress heartbeats and flushes them on an interval"""
+
+    def __init__(self, flush_interval: float = 5.0):
+        """
+        Initialize heartbeat buffer
+
+        Args:
+            flush_interval: Maximum seconds a heartbeat waits before being flushed
+        """
+        super().__init__(flush_interval)
+        self._pending: Dict[Key, Dict[str, Any]] = {}
+        self._in_flight: Dict[Key, Dict[str, Any]] = {}
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self.received = 0
+        self.flushed_rows = 0
+        self.rejected_rows = 0
+        self.failed_flushes = 0
+
+    def add(
+        self,
+        user_id: int,
+        project_id: int,
+        time_spent: int = 0,
+        completion_percentage: Optional[float] = None
+    ) -> None:
+        """
+        Merge a heartbeat into the pending delta of its user and project
+
+        time_spent is an increment in seconds; completion_percentage is the
+        latest absolute value. Without a running background flusher the
+        heartbeat is written through immediately.
+        """
+        with self._buffer_lock:
+            delta = self._pending.setdefault((user_id, project_id), {
+                "time_spent": 0,
+                "completion_percentage": None,
+            })
+            delta["time_spent"] += time_spent
+            if completion_percentage is not None:
+                delta["completion_percentage"] = completion_percentage
+            delta["last_accessed"] = datetime.utcnow()
+            self.received += 1
+
+        if not self.running:
+            self.flush()
+
+    def pending_for_user(self, user_id: int) -> Dict[int, Dict[str, Any]]:
+        """Unflushed deltas of a user by project ID (including a flush in progress)"""
+        merged: Dict[int, Dict[str, Any]] = {}
+        with self._buffer_lock:
+            for buffer in (self._in_flight, self._pending):
+                for (owner, project_id), delta in buffer.items():
+                    if owner == user_id:
+                        _merge(merged.setdefault(project_id, {
+                            "time_spent": 0,
+                            "completion_percentage": None,
+                        }), delta)
+        return merged
+
+    def flush_for_user(self, user_id: int) -> None:
+        """Flush before an absolute write so it isn't overtaken by older deltas"""
+        if self.pending_for_user(user_id):
+            self.flush()
+
+    def flush(self) -> int:
+        """Apply all pending deltas, returning the number of progress rows touched"""
+        with self._flush_lock:
+            with self._buffer_lock:
+                self._in_flight, self._pending = self._pending, {}
+                deltas = self._in_flight
+            if not deltas:
+                return 0
+
+            try:
+                self._write(deltas)
+                written, failed = deltas, {}
+            except Exception as e:
+                self.failed_flushes += 1
+                print(f"Failed to flush progress heartbeats, retrying row by row: {e}")
+                written, failed = self._write_each(deltas)
+
+            self._settle(failed)
+            self.flushed_rows += len(written)
+            return len(written)
+
+    def _write(self, deltas: Dict[Key, Dict[str, Any]]) -> None:
+        """Apply deltas in one transaction"""
+        db = SessionLocal()
+        try:
+            self._apply(db, deltas)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write_each(
+        self, deltas: Dict[Key, Dict[str, Any]]
+    ) -> Tuple[Dict[Key, Dict[str, Any]], Dict[Key, Dict[str, Any]]]:
+        """
+        Apply deltas one at a time after a failed batch
+
+        Deltas the database rejects (e.g. for a project deleted since the
+        heartbeat was accepted) are dropped and counted. Any other error
+        stops the retry and returns the rest to be flushed later.
+        Returns (written, failed) deltas.
+        """
+        written: Dict[Key, Dict[str, Any]] = {}
+        items = list(deltas.items())
+        for index, (key, delta) in enumerate(items):
+            try:
+                self._write({key: delta})
+                written[key] = delta
+            except (IntegrityError, DataError) as e:
+                self.rejected_rows += 1
+                print(f"Dropped progress heartbeats of user {key[0]} for project {key[1]}: {e}")
+            except Exception:
+                return written, dict(items[index:])
+        return written, {}
+
+    @staticmethod
+    def _apply(db, deltas: Dict[Key, Dict[str, Any]]) -> None:
+        """Upsert every delta, batched into one statement per column set"""
+        table = UserProgress.__table__
+        now = datetime.utcnow()
+        with_completion: List[Dict[str, Any]] = []
+        time_only: List[Dict[str, Any]] = []
+        for (user_id, project_id), delta in deltas.items():
+            row = {
+                "user_id": user_id,
+                "project_id": project_id,
+                "status": ProgressStatus.IN_PROGRESS.value,
+                "time_spent": delta["time_spent"],
+                "completion_percentage": delta["completion_percentage"] or 0.0,
+                "last_accessed": delta["last_accessed"],
+                "created_at": now,
+                "updated_at": now,
+            }
+            if delta["completion_percentage"] is None:
+                time_only.append(row)
+            else:
+                with_completion.append(row)
+
+        insert = dialect_insert(db.get_bind())
+        for rows, set_completion in ((with_completion, True), (time_only, False)):
+            if not rows:
+                continue
+            statement = insert(table)
+            changes = {
+                "time_spent": func.coalesce(table.c.time_spent, 0) + statement.excluded.time_spent,
+                "last_accessed": statement.excluded.last_accessed,
+                "updated_at": statement.excluded.updated_at,
+            }
+            if set_completion:
+                changes["completion_percentage"] = statement.excluded.completion_percentage
+            db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[table.c.user_id, table.c.project_id],
+                    set_=changes
+                ),
+                rows
+            )
+
+        activity: Dict[int, datetime] = {}
+        for (user_id, _), delta in deltas.items():
+            activity[user_id] = max(activity.get(user_id, delta["last_accessed"]), delta["last_accessed"])
+        update_user_summaries(db, progress_users=activity, activity=activity)
+
+    def _settle(self, failed: Dict[Key, Dict[str, Any]]) -> None:
+        """
+        End a flush: forget the in-flight deltas and merge failed ones back
+        under any newer heartbeats, in one step so readers never count both
+        """
+        with self._buffer_lock:
+            self._in_flight = {}
+            for key, delta in failed.items():
+                newer = self._pending.get(key)
+                self._pending[key] = delta
+                if newer is not None:
+                    _merge(delta, newer)
+
+    def stats(self) -> Dict[str, int]:
+        """Buffer metrics"""
+        with self._buffer_lock:
+            pending = len(self._pending) + len(self._in_flight)
+        return {
+            "pending_rows": pending,
+            "received_heartbeats": self.received,
+            "flushed_rows": self.flushed_rows,
+            "rejected_rows": self.rejected_rows,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+def _merge(target: Dict[str, Any], newer: Dict[str, Any]) -> None:
+    """Fold a newer delta into an older one"""
+    target["time_spent"] += newer["time_spent"]
+    if newer["completion_percentage"] is not None:
+        target["completion_percentage"] = newer["completion_percentage"]
+    target["last_accessed"] = newer["last_accessed"]
+
+
+def apply_pending(progress: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """A progress response with an unflushed delta applied on top"""
+    progress = dict(progress)
+    progress["time_spent"] = (progress["time_spent"] or 0) + delta["time_spent"]
+    if delta["completion_percentage"] is not None:
+        progress["completion_percentage"] = delta["completion_percentage"]
+    progress["last_accessed"] = delta["last_accessed"]
+    return progress
+
+
+# Global heartbeat buffer
+_progress_heartbeats = None
+
+
+def get_progress_heartbeats() -> ProgressHeartbeats:
+    """Get or create the progress heartbeat buffer"""
+    global _progress_heartbeats
+    if _progress_heartbeats is None:
+        _progress_heartbeats = ProgressHeartbeats(
+            flush_interval=settings.PROGRESS_HEARTBEAT_FLUSH_INTERVAL
+        )
+    return _progress_heartbeats
+
+
+registry.stats(
+    "progress_heartbeats", "Progress heartbeat buffer",
+    lambda: get_progress_heartbeats().stats(),
+    counters=("received_heartbeats", "flushed_rows", "rejected_rows", "failed_flushes"),
+    gauges=("pending_rows",)
+)
@@ -0,0 +1,124 @@
+"""
+Project Catalog Cache
+Serves the project catalog from an in-memory snapshot. The catalog only
+changes when projects are seeded or loaded, so the snapshot is rebuilt
+after commits that touch projects, and at most every CATALOG_TTL_SECONDS
+to pick up writes made by other processes (e.g. seed_data.py).
+"""
+import hashlib
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.responses import dumps
+from app.models.project import Project
+from app.schemas.project import ProjectResponse
+from app.services.prerequisites import PrerequisiteGraph
+
+
+class CatalogSnapshot:
+    """Immutable view of every project at one catalog version"""
+
+    def __init__(self, version: int, projects: List[Dict[str, Any]]):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.projects = projects  # ordered by project_number
+        self.by_id = {project["id"]: project for project in projects}
+        self.by_number = {project["project_number"]: project for project in projects}
+        self.graph = PrerequisiteGraph(projects)
+        self._bodies: Dict[Tuple, Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def render(self, key: Tuple, build) -> Tuple[bytes, str]:
+        """JSON body and strong ETag for a response, built once per key"""
+        cached = self._bodies.get(key)
+        if cached is None:
+            body = dumps(build())
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            cached = (body, etag)
+            with self._lock:
+                if len(self._bodies) >= settings.CATALOG_MAX_CACHED_RESPONSES:
+                    self._bodies.clear()
+                self._bodies[key] = cached
+        return cached
+
+
+class ProjectCatalog:
+    """Versioned in-memory snapshot of the projects table"""
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self.version = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Drop the snapshot so the next read reloads it"""
+        with self._lock:
+            self.version += 1
+            self._snapshot = None
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Current snapshot, (re)loading it from the database if needed"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at < self.ttl:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or time.monotonic() - snapshot.loaded_at >= self.ttl:
+                snapshot = self._snapshot = CatalogSnapshot(self.version + 1, self._load())
+                self.version = snapshot.version
+            return snapshot
+
+    @staticmethod
+    def _load() -> List[Dict[str, Any]]:
+        """Read every project, ordered by project number"""
+        db = SessionLocal()
+        try:
+            projects = db.query(Project).order_by(Project.project_number).all()
+            return [
+                ProjectResponse.model_validate(project).model_dump(mode="json")
+                for project in projects
+            ]
+        finally:
+            db.close()
+
+
+# Global catalog instance
+_catalog = None
+
+
+def get_project_catalog() -> ProjectCatalog:
+    """Get or create the project catalog"""
+    global _catalog
+    if _catalog is None:
+        _catalog = ProjectCatalog(ttl=settings.CATALOG_TTL_SECONDS)
+    return _catalog
+
+
+def mark_catalog_dirty(session: Session) -> None:
+    """Invalidate the catalog when this session commits (for Core writes)"""
+    session.info["catalog_dirty"] = True
+
+
+@event.listens_for(Project, "after_insert")
+@event.listens_for(Project, "after_update")
+@event.listens_for(Project, "after_delete")
+def _mark_catalog_dirty(mapper, connection, target):
+    """Flag the session so the catalog is invalidated once it commits"""
+    mark_catalog_dirty(Session.object_session(target))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_catalog(session):
+    if session.info.pop("catalog_dirty", False):
+        get_project_catalog().invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_catalog_changes(session):
+    session.info.pop("catalog_dirty", None)
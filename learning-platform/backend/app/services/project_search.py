@@ -0,0 +1,103 @@
+"""
+Project Full-Text Search
+Maintains a full-text index over project title, description and concept:
+an FTS5 table kept in sync by triggers on SQLite, and a generated tsvector
+column with a GIN index on PostgreSQL. Either way every write to projects,
+ORM or bulk, is indexed without application code.
+"""
+import re
+from typing import List, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Relative weight of matches in each column: title, description, concept
+SQLITE_BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+SQLITE_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE projects_fts USING fts5(
+        title, description, concept,
+        content='projects', content_rowid='id',
+        tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_insert AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts(rowid, title, description, concept)
+        VALUES (new.id, new.title, new.description, new.concept);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_delete AFTER DELETE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, title, description, concept)
+        VALUES ('delete', old.id, old.title, old.description, old.concept);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_update AFTER UPDATE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, title, description, concept)
+        VALUES ('delete', old.id, old.title, old.description, old.concept);
+        INSERT INTO projects_fts(rowid, title, description, concept)
+        VALUES (new.id, new.title, new.description, new.concept);
+    END
+    """,
+    # Index the rows that existed before the index did
+    "INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')",
+]
+
+POSTGRES_INDEX_DDL = [
+    """
+    ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(concept, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_projects_search_vector ON projects USING GIN (search_vector)",
+]
+
+
+def create_search_index(bind) -> None:
+    """Create the full-text index for the bound database if it's missing"""
+    with bind.begin() as conn:
+        if bind.dialect.name == "postgresql":
+            for statement in POSTGRES_INDEX_DDL:
+                conn.execute(text(statement))
+        elif bind.dialect.name == "sqlite":
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'projects_fts'"
+            )).first()
+            if not exists:
+                for statement in SQLITE_INDEX_DDL:
+                    conn.execute(text(statement))
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a user query into plain word terms"""
+    return re.findall(r"\w+", query.lower())
+
+
+def search_project_ids(db: Session, query: str) -> List[Tuple[int, float]]:
+    """
+    Rank projects matching every term of the query (each as a prefix)
+
+    Returns (project_id, score) pairs, best match first.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if db.get_bind().dialect.name == "postgresql":
+        rows = db.execute(text(
+            "SELECT id, ts_rank_cd(search_vector, query) AS score "
+            "FROM projects, to_tsquery('english', :query) AS query "
+            "WHERE search_vector @@ query ORDER BY score DESC, project_number"
+        ), {"query": " & ".join(f"{term}:*" for term in terms)})
+    else:
+        weights = ", ".join(str(weight) for weight in SQLITE_BM25_WEIGHTS)
+        rows = db.execute(text(
+            f"SELECT rowid, -bm25(projects_fts, {weights}) AS score "
+            f"FROM projects_fts WHERE projects_fts MATCH :query ORDER BY score DESC"
+        ), {"query": " ".join(f'"{term}"*' for term in terms)})
+    return [(row[0], float(row[1])) for row in rows]
@@ -0,0 +1,279 @@
+"""
+User Dashboard Summaries
+Maintains one user_summaries row per user so the dashboard is a single
+primary-key read. Writers to user_progress and code_executions call
+update_user_summaries() in their own transaction: progress totals are
+recomputed for the users that changed, streaks and execution counts are
+advanced from the new activity in SQL, and deleted or archived executions
+are subtracted with remove_executions().
+"""
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import Date, case, cast, func, select, update
+from sqlalchemy.orm import Session
+from app.core.database import dialect_insert
+from app.models.execution import CodeExecution
+from app.models.progress import UserProgress, ProgressStatus
+from app.models.summary import UserSummary
+from app.models.user import User
+from app.services.leaderboards import METRICS, stage_leaderboard_scores
+from app.services.project_catalog import get_project_catalog
+
+PROGRESS_COLUMNS = ("completed_count", "in_progress_count", "completed_by_phase", "total_time_spent")
+
+
+def empty_summary(user_id: int) -> Dict[str, Any]:
+    """Summary values of a user without any progress or activity"""
+    return {
+        "user_id": user_id,
+        "completed_count": 0,
+        "in_progress_count": 0,
+        "completed_by_phase": {},
+        "total_time_spent": 0,
+        "executions_count": 0,
+        "current_streak": 0,
+        "longest_streak": 0,
+        "last_activity_at": None,
+    }
+
+
+def summarize_progress(db: Session, user_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Progress totals per user, from one query over their progress rows"""
+    phases = {project_id: project["phase"] for project_id, project in get_project_catalog().snapshot().by_id.items()}
+    totals = {user_id: {column: empty_summary(user_id)[column] for column in PROGRESS_COLUMNS} for user_id in user_ids}
+    if not totals:
+        return totals
+
+    rows = db.execute(
+        select(UserProgress.user_id, UserProgress.project_id, UserProgress.status, UserProgress.time_spent)
+        .where(UserProgress.user_id.in_(totals))
+    )
+    for user_id, project_id, status, time_spent in rows:
+        summary = totals[user_id]
+        summary["total_time_spent"] += time_spent or 0
+        if status == ProgressStatus.COMPLETED.value:
+            summary["completed_count"] += 1
+            phase = phases.get(project_id)
+            if phase is not None:
+                summary["completed_by_phase"][phase] = summary["completed_by_phase"].get(phase, 0) + 1
+        elif status == ProgressStatus.IN_PROGRESS.value:
+            summary["in_progress_count"] += 1
+    return totals
+
+
+def record_activity(summary: Dict[str, Any], at: datetime) -> None:
+    """Advance last activity and the daily streak for activity at a time"""
+    last = summary["last_activity_at"]
+    if last is None or at.date() - last.date() > timedelta(days=1):
+        summary["current_streak"] = 1
+    elif at.date() - last.date() == timedelta(days=1):
+        summary["current_streak"] += 1
+    else:
+        summary["current_streak"] = max(summary["current_streak"], 1)
+    summary["longest_streak"] = max(summary["longest_streak"], summary["current_streak"])
+    if last is None or at > last:
+        summary["last_activity_at"] = at
+
+
+def current_streak(summary: Dict[str, Any], today: Optional[date] = None) -> int:
+    """The stored streak, or 0 once a full day has passed without activity"""
+    last = summary["last_activity_at"]
+    today = today or datetime.utcnow().date()
+    if last is None or today - last.date() > timedelta(days=1):
+        return 0
+    return summary["current_streak"]
+
+
+def _greatest(dialect: str, *values):
+    """SQL maximum of non-NULL values (NULL only if all are NULL)"""
+    if dialect == "postgresql":
+        return func.greatest(*values)
+    return func.max(*(func.coalesce(value, *values) for value in values))
+
+
+def _days_between(dialect: str, earlier, later):
+    """SQL count of calendar days from one timestamp to another"""
+    if dialect == "postgresql":
+        return cast(later, Date) - cast(earlier, Date)
+    return func.julianday(func.date(later)) - func.julianday(func.date(earlier))
+
+
+def _activity_changes(dialect: str, table, excluded) -> Dict[str, Any]:
+    """
+    ON CONFLICT assignments that fold new activity into the stored row
+
+    excluded.last_activity_at is the new activity (NULL for none). Computed
+    from the row as it is when the upsert runs, not as it was read, so
+    concurrent writers can't move last activity backwards or reset a streak.
+    """
+    new_at = excluded.last_activity_at
+    last_at = table.c.last_activity_at
+    gap = _days_between(dialect, last_at, new_at)
+    streak = case(
+        (new_at.is_(None), table.c.current_streak),
+        (last_at.is_(None), 1),
+        (gap > 1, 1),
+        (gap == 1, table.c.current_streak + 1),
+        else_=_greatest(dialect, table.c.current_streak, 1)
+    )
+    return {
+        "current_streak": streak,
+        "longest_streak": _greatest(dialect, table.c.longest_streak, streak),
+        "last_activity_at": _greatest(dialect, last_at, new_at),
+    }
+
+
+def update_user_summaries(
+    db: Session,
+    progress_users: Iterable[int] = (),
+    activity: Optional[Dict[int, datetime]] = None,
+    executions: Optional[Counter] = None
+) -> None:
+    """
+    Bring the summaries of changed users up to date (caller commits)
+
+    Args:
+        progress_users: Users whose user_progress rows changed
+        activity: Latest activity time per user
+        executions: Number of new code executions per user
+    """
+    activity = activity or {}
+    executions = executions or Counter()
+    user_ids = set(progress_users) | set(activity) | set(executions)
+    if not user_ids:
+        return
+
+    existing = set(db.execute(
+        select(UserSummary.user_id).where(UserSummary.user_id.in_(user_ids))
+    ).scalars())
+    # A user without a summary row yet gets progress totals computed from scratch
+    recompute = set(progress_users) | (user_ids - existing)
+    totals = summarize_progress(db, recompute)
+
+    # Rows are what a new summary row would hold; for existing rows only the
+    # recomputed progress totals are taken as they are, while activity and
+    # executions are folded into the stored values in SQL
+    rows: Dict[bool, List[Dict[str, Any]]] = {True: [], False: []}
+    for user_id in user_ids:
+        summary = empty_summary(user_id)
+        summary.update(totals.get(user_id, {}))
+        if user_id in activity:
+            record_activity(summary, activity[user_id])
+        rows[user_id in recompute].append({
+            **summary,
+            "completed_by_phase": dict(summary["completed_by_phase"]),
+            "executions_count": executions[user_id],  # new runs, added to the stored count
+            "updated_at": datetime.utcnow(),
+        })
+
+    table = UserSummary.__table__
+    dialect = db.get_bind().dialect.name
+    insert = dialect_insert(db.get_bind())
+    scores = {}
+    for with_progress, group in rows.items():
+        if not group:
+            continue
+        statement = insert(table)
+        changes = _activity_changes(dialect, table, statement.excluded)
+        changes["executions_count"] = table.c.executions_count + statement.excluded.executions_count
+        changes["updated_at"] = statement.excluded.updated_at
+        if with_progress:
+            changes.update({column: statement.excluded[column] for column in PROGRESS_COLUMNS})
+        stored = db.execute(
+            statement.on_conflict_do_update(index_elements=[table.c.user_id], set_=changes)
+            .returning(table.c.user_id, *(table.c[column] for column in METRICS.values())),
+            group
+        )
+        scores.update(leaderboard_scores(row._mapping for row in stored))
+    stage_leaderboard_scores(db, scores)
+
+
+def remove_executions(db: Session, executions: Counter) -> None:
+    """
+    Take deleted or archived executions out of users' counts (caller commits)
+
+    executions_count is the number of executions currently stored, the same
+    thing rebuild_user_summaries counts.
+    """
+    table = UserSummary.__table__
+    dialect = db.get_bind().dialect.name
+    scores = {}
+    for user_id, count in executions.items():
+        stored = db.execute(
+            update(table)
+            .where(table.c.user_id == user_id)
+            .values(executions_count=_greatest(dialect, table.c.executions_count - count, 0))
+            .returning(table.c.user_id, *(table.c[column] for column in METRICS.values()))
+        )
+        scores.update(leaderboard_scores(row._mapping for row in stored))
+    stage_leaderboard_scores(db, scores)
+
+
+def leaderboard_scores(summaries: Iterable[Dict[str, Any]]) -> Dict[int, Dict[str, int]]:
+    """Leaderboard scores of summaries, by user ID"""
+    return {
+        summary["user_id"]: {metric: summary[column] or 0 for metric, column in METRICS.items()}
+        for summary in summaries
+    }
+
+
+def streaks(days: List[date]) -> Dict[str, Any]:
+    """Current (ending on the last day) and longest run of consecutive days"""
+    longest = current = 0
+    previous = None
+    for day in sorted(set(days)):
+        current = current + 1 if previous and day - previous == timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    return {"current_streak": current, "longest_streak": longest}
+
+
+def rebuild_user_summaries(db: Session) -> int:
+    """Recompute every user's summary from progress and execution history (caller commits)"""
+    user_ids = [user_id for (user_id,) in db.execute(select(User.id))]
+    summaries = {user_id: empty_summary(user_id) for user_id in user_ids}
+    for user_id, totals in summarize_progress(db, user_ids).items():
+        summaries[user_id].update(totals)
+
+    days: Dict[int, List[date]] = {user_id: [] for user_id in user_ids}
+    last: Dict[int, datetime] = {}
+
+    executed_day = func.date(CodeExecution.created_at)
+    for user_id, day, count, latest in db.execute(
+        select(CodeExecution.user_id, executed_day, func.count(), func.max(CodeExecution.created_at))
+        .group_by(CodeExecution.user_id, executed_day)
+    ):
+        if user_id not in summaries:
+            continue
+        summaries[user_id]["executions_count"] += count
+        days[user_id].append(date.fromisoformat(str(day)[:10]))
+        last[user_id] = max(last.get(user_id, latest), latest)
+
+    for user_id, accessed in db.execute(
+        select(UserProgress.user_id, UserProgress.last_accessed)
+        .where(UserProgress.last_accessed.is_not(None))
+    ):
+        if user_id not in summaries:
+            continue
+        days[user_id].append(accessed.date())
+        last[user_id] = max(last.get(user_id, accessed), accessed)
+
+    rows = []
+    for user_id, summary in summaries.items():
+        summary.update(streaks(days[user_id]))
+        summary["last_activity_at"] = last.get(user_id)
+        rows.append({**summary, "updated_at": datetime.utcnow()})
+
+    if rows:
+        insert = dialect_insert(db.get_bind())
+        statement = insert(UserSummary.__table__)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[UserSummary.user_id],
+                set_={column: statement.excluded[column] for column in rows[0] if column != "user_id"}
+            ),
+            rows
+        )
+        stage_leaderboard_scores(db, leaderboard_scores(summaries.values()))
+    return len(rows)
@@ -0,0 +1,16 @@
+"""
+Archive execution history past the retention policy
+Run this from cron, or enable HISTORY_ARCHIVE_ENABLED to archive in the API process
+
+Retention is configured with HISTORY_RETENTION_DAYS, HISTORY_RETENTION_KEEP_LAST
+and HISTORY_ARCHIVE_DIR (see app/core/config.py)
+"""
+from app.core.database import init_db
+from app.services.history_archive import get_history_archiver
+
+# Initialize database
+init_db()
+
+archiver = get_history_archiver()
+archived = archiver.archive()
+print(f"✅ Archived {archived} executions to {archiver.archive_dir}")
@@ -0,0 +1,26 @@
+"""
+Compact execution statistics rollups
+The API compacts every ROLLUP_COMPACTION_INTERVAL seconds; run this to do it
+on demand, or with --backfill to rebuild the rollups from code_executions
+
+    python compact_rollups.py              # fold old hourly buckets into days
+    python compact_rollups.py --backfill   # rebuild everything, then compact
+"""
+import sys
+from app.core.database import SessionLocal, init_db
+from app.services.execution_rollups import backfill_rollups, get_rollup_compactor
+
+# Initialize database
+init_db()
+
+if "--backfill" in sys.argv:
+    db = SessionLocal()
+    try:
+        counted = backfill_rollups(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt rollups from {counted} executions")
+
+compacted = get_rollup_compactor().compact()
+print(f"✅ Compacted {compacted} hourly rollups into daily rollups")
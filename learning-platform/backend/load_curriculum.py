@@ -0,0 +1,58 @@
+"""
+Load the project catalog from PROJECT_CURRICULUM.md
+Idempotent: safe to run on every deploy. New projects are inserted and
+changed ones updated in a single transaction; unchanged ones are untouched.
+
+    python load_curriculum.py                 # load ../../PROJECT_CURRICULUM.md
+    python load_curriculum.py path/to/file.md
+    python load_curriculum.py --dry-run       # report changes without applying them
+"""
+import os
+import sys
+import time
+from app.core.database import SessionLocal, init_db
+from app.services.curriculum_loader import parse_curriculum, load_curriculum
+
+DEFAULT_CURRICULUM = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "PROJECT_CURRICULUM.md"
+)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    dry_run = "--dry-run" in sys.argv
+    path = args[0] if args else DEFAULT_CURRICULUM
+
+    # Initialize database
+    init_db()
+
+    start = time.perf_counter()
+    with open(path, encoding="utf-8") as f:
+        records = parse_curriculum(f.read())
+
+    db = SessionLocal()
+    try:
+        report = load_curriculum(db, records)
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start
+
+    for action in ("inserted", "updated"):
+        if report[action]:
+            print(f"{action.capitalize()}: projects {', '.join(map(str, report[action]))}")
+    print(
+        f"\n{'Would load' if dry_run else '✅ Loaded'} {len(records)} projects in {elapsed:.3f}s: "
+        f"{len(report['inserted'])} inserted, {len(report['updated'])} updated, "
+        f"{len(report['unchanged'])} unchanged"
+    )
+
+
+if __name__ == "__main__":
+    main()
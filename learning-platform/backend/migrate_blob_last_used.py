@@ -0,0 +1,28 @@
+"""
+Migration: add the last_used_at column to content_blobs
+Run this once on databases created before blob garbage collection had a
+grace period (before running the API or migrate_execution_blobs.py)
+
+    python migrate_blob_last_used.py
+
+Safe to re-run: the column is skipped if it exists. Existing blobs start
+out as last used when they were created.
+"""
+from sqlalchemy import inspect, text
+from app.core.database import engine, init_db
+
+
+def main():
+    init_db()
+    columns = {column["name"] for column in inspect(engine).get_columns("content_blobs")}
+    if "last_used_at" in columns:
+        print("content_blobs already has last_used_at")
+        return
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE content_blobs ADD COLUMN last_used_at TIMESTAMP"))
+        conn.execute(text("UPDATE content_blobs SET last_used_at = created_at"))
+    print("✅ Added last_used_at to content_blobs")
+
+
+if __name__ == "__main__":
+    main()
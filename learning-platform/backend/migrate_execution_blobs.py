@@ -0,0 +1,121 @@
+"""
+Migration: move code_executions text columns into content_blobs
+Run this once on databases created before blob storage was introduced
+
+    python migrate_execution_blobs.py            # migrate existing rows
+    python migrate_execution_blobs.py --vacuum   # also reclaim disk space (SQLite)
+    python migrate_execution_blobs.py --gc       # only delete unreferenced blobs
+
+Safe to re-run: rows are converted in batches and already-converted rows
+are skipped, so an interrupted migration can simply be started again.
+"""
+import sys
+from sqlalchemy import inspect, text
+from app.core.database import SessionLocal, engine, init_db, is_sqlite_url
+from app.core.config import settings
+from app.services.blob_store import (
+    EXECUTION_BLOB_FIELDS,
+    content_hash,
+    put_blobs,
+    delete_orphan_blobs,
+)
+
+BATCH_SIZE = 1000
+
+
+def legacy_columns() -> list:
+    """Text columns of code_executions that still have to be migrated"""
+    columns = {column["name"] for column in inspect(engine).get_columns("code_executions")}
+    return [field for field in EXECUTION_BLOB_FIELDS if field in columns]
+
+
+def add_hash_columns() -> None:
+    """Add the *_hash columns that reference content_blobs"""
+    columns = {column["name"] for column in inspect(engine).get_columns("code_executions")}
+    with engine.begin() as conn:
+        for hash_column in EXECUTION_BLOB_FIELDS.values():
+            if hash_column not in columns:
+                conn.execute(text(
+                    f"ALTER TABLE code_executions ADD COLUMN {hash_column} "
+                    f"VARCHAR(64) REFERENCES content_blobs(hash)"
+                ))
+
+
+def migrate_rows(fields: list) -> int:
+    """Copy legacy text into blobs and point each row at them, batch by batch"""
+    select_batch = text(
+        f"SELECT id, {', '.join(fields)} FROM code_executions "
+        f"WHERE code_hash IS NULL AND id > :after ORDER BY id LIMIT :limit"
+    )
+    update_row = text(
+        "UPDATE code_executions SET "
+        + ", ".join(f"{EXECUTION_BLOB_FIELDS[field]} = :{field}" for field in fields)
+        + " WHERE id = :row_id"
+    )
+
+    migrated = 0
+    after = 0
+    while True:
+        db = SessionLocal()
+        try:
+            rows = db.execute(select_batch, {"after": after, "limit": BATCH_SIZE}).mappings().all()
+            if not rows:
+                return migrated
+
+            put_blobs(db, (row[field] for row in rows for field in fields))
+            db.execute(update_row, [
+                {
+                    "row_id": row["id"],
+                    **{
+                        field: content_hash(row[field]) if row[field] is not None else None
+                        for field in fields
+                    },
+                }
+                for row in rows
+            ])
+            db.commit()
+        finally:
+            db.close()
+
+        migrated += len(rows)
+        after = rows[-1]["id"]
+        print(f"Migrated {migrated} executions...")
+
+
+def drop_legacy_columns(fields: list) -> None:
+    """Drop the text columns once every row references its blobs"""
+    with engine.begin() as conn:
+        for field in fields:
+            conn.execute(text(f"ALTER TABLE code_executions DROP COLUMN {field}"))
+
+
+def main():
+    # Create content_blobs (and anything else missing)
+    init_db()
+
+    if "--gc" not in sys.argv:
+        fields = legacy_columns()
+        if not fields:
+            print("code_executions already uses blob storage")
+        else:
+            add_hash_columns()
+            migrated = migrate_rows(fields)
+            drop_legacy_columns(fields)
+            print(f"\n✅ Migrated {migrated} executions to blob storage")
+
+    db = SessionLocal()
+    try:
+        deleted = delete_orphan_blobs(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Deleted {deleted} unreferenced blobs")
+
+    if "--vacuum" in sys.argv and is_sqlite_url(settings.DATABASE_URL):
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+        print("Vacuumed database")
+
+
+if __name__ == "__main__":
+    main()
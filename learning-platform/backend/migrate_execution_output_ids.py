@@ -0,0 +1,34 @@
+"""
+Migration: add the output_id/error_id columns to code_executions
+Run this once on databases created before executions referenced their
+spilled output
+
+    python migrate_execution_output_ids.py
+
+Safe to re-run: columns that already exist are skipped. Existing rows keep
+NULL (their output, if any was spilled, isn't linked).
+"""
+from sqlalchemy import inspect, text
+from app.core.database import engine, init_db
+
+NEW_COLUMNS = {
+    "output_id": "VARCHAR(32)",
+    "error_id": "VARCHAR(32)",
+}
+
+
+def main():
+    init_db()
+    columns = {column["name"] for column in inspect(engine).get_columns("code_executions")}
+    missing = [name for name in NEW_COLUMNS if name not in columns]
+    if not missing:
+        print("code_executions already has output_id and error_id")
+        return
+    with engine.begin() as conn:
+        for name in missing:
+            conn.execute(text(f"ALTER TABLE code_executions ADD COLUMN {name} {NEW_COLUMNS[name]}"))
+    print(f"✅ Added {', '.join(missing)} to code_executions")
+
+
+if __name__ == "__main__":
+    main()
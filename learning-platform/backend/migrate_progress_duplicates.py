@@ -0,0 +1,85 @@
+"""
+Migration: merge duplicate user_progress rows and add the unique index
+Run this once on databases created before (user_id, project_id) was unique
+
+    python migrate_progress_duplicates.py             # merge duplicates
+    python migrate_progress_duplicates.py --dry-run   # only report them
+
+For each duplicated user and project the oldest row is kept, with the most
+advanced status, the highest completion and time spent, and the latest
+access folded in from the others, which are then deleted.
+"""
+import sys
+from sqlalchemy import text
+from app.core.database import SessionLocal, init_db
+from app.models.progress import ProgressStatus
+
+STATUS_RANK = {
+    ProgressStatus.NOT_STARTED.value: 0,
+    ProgressStatus.IN_PROGRESS.value: 1,
+    ProgressStatus.COMPLETED.value: 2,
+}
+
+
+def merge_rows(rows: list) -> dict:
+    """Combine duplicate rows into the values of the one that is kept"""
+    kept = dict(rows[0])
+    for row in rows[1:]:
+        if STATUS_RANK.get(row["status"], 0) > STATUS_RANK.get(kept["status"], 0):
+            kept["status"] = row["status"]
+        for column in ("completion_percentage", "time_spent", "last_accessed", "updated_at"):
+            values = [value for value in (kept[column], row[column]) if value is not None]
+            kept[column] = max(values) if values else None
+        values = [value for value in (kept["completed_at"], row["completed_at"]) if value is not None]
+        kept["completed_at"] = min(values) if values else None
+    return kept
+
+
+def find_duplicates(db) -> list:
+    """All rows of every (user_id, project_id) that has more than one, oldest first"""
+    rows = db.execute(text(
+        "SELECT p.* FROM user_progress p JOIN ("
+        "  SELECT user_id, project_id FROM user_progress"
+        "  GROUP BY user_id, project_id HAVING COUNT(*) > 1"
+        ") d ON d.user_id = p.user_id AND d.project_id = p.project_id "
+        "ORDER BY p.user_id, p.project_id, p.id"
+    )).mappings().all()
+
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["user_id"], row["project_id"]), []).append(row)
+    return list(groups.values())
+
+
+def main():
+    dry_run = "--dry-run" in sys.argv
+
+    db = SessionLocal()
+    try:
+        groups = find_duplicates(db)
+        kept = [merge_rows(rows) for rows in groups]
+        deleted = [row["id"] for rows in groups for row in rows[1:]]
+        print(f"Found {len(groups)} duplicated user/project pairs ({len(deleted)} extra rows)")
+
+        if dry_run:
+            return
+        if kept:
+            db.execute(text(
+                "UPDATE user_progress SET status = :status, "
+                "completion_percentage = :completion_percentage, time_spent = :time_spent, "
+                "last_accessed = :last_accessed, completed_at = :completed_at, "
+                "updated_at = :updated_at WHERE id = :id"
+            ), kept)
+            db.execute(text("DELETE FROM user_progress WHERE id = :id"), [{"id": row_id} for row_id in deleted])
+            db.commit()
+            print(f"Merged duplicates and deleted {len(deleted)} rows")
+    finally:
+        db.close()
+
+    # Creates uq_user_progress_user_project now that it can't be violated
+    init_db()
+    print("\n✅ user_progress is unique per user and project")
+
+
+if __name__ == "__main__":
+    main()
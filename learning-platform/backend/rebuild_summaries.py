@@ -0,0 +1,19 @@
+"""
+Rebuild user dashboard summaries
+Run this once after upgrading to backfill user_summaries, or at any time to
+recompute every summary from user_progress and code_executions
+"""
+from app.core.database import SessionLocal, init_db
+from app.services.user_summary import rebuild_user_summaries
+
+# Initialize database
+init_db()
+
+db = SessionLocal()
+try:
+    rebuilt = rebuild_user_summaries(db)
+    db.commit()
+finally:
+    db.close()
+
+print(f"✅ Rebuilt summaries for {rebuilt} users")
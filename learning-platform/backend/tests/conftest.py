@@ -0,0 +1,84 @@
+"""
+Test configuration
+Points the app at a throwaway SQLite database and storage directories
+before anything imports app.core.config.
+"""
+import os
+import tempfile
+
+_test_dir = tempfile.mkdtemp(prefix="learning-platform-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_test_dir}/test.db"
+os.environ["DATABASE_REPLICA_URL"] = ""
+os.environ["LOOP_WATCHDOG_ENABLED"] = "true"  # so tests can assert no_blocking()
+# Above garbage collection pauses on a busy CI machine, below a bcrypt hash
+os.environ["LOOP_WATCHDOG_THRESHOLD_MS"] = "200"
+for _setting, _subdir in (
+    ("OUTPUT_STORE_DIR", "output_store"),
+    ("INPUT_STORE_DIR", "input_store"),
+    ("HISTORY_ARCHIVE_DIR", "archive"),
+    ("PROFILE_DIR", "profiles"),
+):
+    os.environ[_setting] = os.path.join(_test_dir, _subdir)
+
+import pytest
+from fastapi.testclient import TestClient
+from app.core.database import SessionLocal, init_db
+
+init_db()
+
+
+@pytest.fixture
+def test_dir():
+    """Directory holding the test database"""
+    return _test_dir
+
+
+@pytest.fixture
+def db():
+    """A database session, closed after the test"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """A test client with the app's lifespan (background services) running"""
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Register a fresh user and return their bearer token header"""
+    def make(username: str, superuser: bool = False):
+        client.post("/api/v1/auth/register", json={
+            "email": f"{username}@example.com", "username": username, "password": "password"
+        })
+        if superuser:
+            from app.models.user import User
+            session = SessionLocal()
+            session.query(User).filter(User.username == username).update({"is_superuser": True})
+            session.commit()
+            session.close()
+        token = client.post(
+            "/api/v1/auth/token", data={"username": username, "password": "password"}
+        ).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+    return make
+
+
+@pytest.fixture
+def lagging_replica(monkeypatch, tmp_path):
+    """Route replica reads to an empty copy of the schema, with a long stickiness window"""
+    from sqlalchemy.orm import sessionmaker
+    from app.core import database
+    replica = database.create_db_engine(f"sqlite:///{tmp_path}/replica.db")
+    database.Base.metadata.create_all(bind=replica)
+    monkeypatch.setattr(database, "replica_engine", replica)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", sessionmaker(bind=replica))
+    monkeypatch.setattr(database.write_tracker, "window", 60.0)
+    return replica
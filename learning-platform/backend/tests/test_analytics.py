@@ -0,0 +1,75 @@
+from collections import Counter
+from datetime import datetime, timedelta
+import pytest
+from app.models.execution import CodeExecution
+from app.models.progress import UserProgress, ProgressStatus
+from app.models.user import User
+from app.services.analytics import CohortAnalytics, get_analytics, mark_analytics_stale
+from app.services.user_summary import update_user_summaries
+
+pytest.importorskip("numpy")
+
+
+def add_cohort(db, month: str, executions: int, completed: int):
+    """A user who signed up in month with some executions and completed projects"""
+    signed_up = datetime.strptime(month, "%Y-%m")
+    user = User(
+        email=f"analytics-{month}@example.com", username=f"analytics-{month}",
+        hashed_password="x", created_at=signed_up
+    )
+    db.add(user)
+    db.flush()
+    for i in range(executions):
+        db.add(CodeExecution(
+            user_id=user.id, project_id=1, language="python", code_hash="0" * 64,
+            execution_time=0.01 * (i + 1), status="error" if i == 0 else "success",
+            created_at=signed_up
+        ))
+    for project_id in range(1, completed + 1):
+        db.add(UserProgress(
+            user_id=user.id, project_id=project_id, status=ProgressStatus.COMPLETED.value,
+            time_spent=60 * project_id, created_at=signed_up,
+            completed_at=signed_up + timedelta(hours=project_id)
+        ))
+    db.commit()
+
+
+@pytest.mark.parametrize("month,rows", [("2001-01", 1), ("2001-02", 7)])
+def test_reports_count_every_row(db, month, rows):
+    add_cohort(db, month, executions=rows, completed=rows)
+    # Chunks smaller than the row count exercise the chunk boundaries too
+    analytics = CohortAnalytics(chunk_size=3)
+
+    executions = analytics.execution_report(month)
+    assert executions["rows"] == rows
+    assert executions["failure_rates"][0]["executions"] == rows
+    assert executions["failure_rates"][0]["errors"] == 1
+    assert executions["execution_times"][0]["count"] == rows
+
+    completion = analytics.completion_report(month)
+    assert completion["rows"] == rows
+    assert sum(project["time_spent"]["count"] for project in completion["projects"]) == rows
+
+
+def test_writes_only_invalidate_the_cohorts_they_touch(db):
+    add_cohort(db, "2002-01", executions=2, completed=1)
+    add_cohort(db, "2002-02", executions=2, completed=1)
+    users = {
+        user.username: user.id
+        for user in db.query(User).filter(User.username.in_(["analytics-2002-01", "analytics-2002-02"]))
+    }
+    analytics = get_analytics()
+    for cohort in ("2002-01", "2002-02", None):
+        analytics.execution_report(cohort)
+
+    # Routine writes (history and progress flushes) leave the cache alone
+    update_user_summaries(db, executions=Counter({users["analytics-2002-01"]: 1}))
+    db.commit()
+    assert {("executions", "2002-01"), ("executions", "2002-02"), ("executions", None)} <= set(analytics._cache)
+
+    # Deletes drop the affected cohort and the all-users report only
+    mark_analytics_stale(db, [users["analytics-2002-01"]])
+    db.commit()
+    assert ("executions", "2002-01") not in analytics._cache
+    assert ("executions", None) not in analytics._cache
+    assert ("executions", "2002-02") in analytics._cache
@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta
+from app.models.blob import ContentBlob
+from app.services.blob_store import content_hash, delete_orphan_blobs, put_blobs
+
+
+def test_orphan_blobs_in_use_are_kept_through_the_grace_period(db):
+    put_blobs(db, ["orphan: stale", "orphan: reused", "orphan: fresh"])
+    long_ago = datetime.utcnow() - timedelta(days=2)
+    db.query(ContentBlob).filter(
+        ContentBlob.hash.in_([content_hash("orphan: stale"), content_hash("orphan: reused")])
+    ).update({"last_used_at": long_ago}, synchronize_session=False)
+    db.commit()
+
+    # A history flush found this one already stored and hasn't committed its row yet
+    put_blobs(db, ["orphan: reused"])
+    db.commit()
+    delete_orphan_blobs(db)
+    db.commit()
+
+    stored = {blob_hash for (blob_hash,) in db.query(ContentBlob.hash).filter(ContentBlob.hash.in_([
+        content_hash("orphan: stale"), content_hash("orphan: reused"), content_hash("orphan: fresh")
+    ]))}
+    assert stored == {content_hash("orphan: reused"), content_hash("orphan: fresh")}
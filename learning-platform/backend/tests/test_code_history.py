@@ -0,0 +1,75 @@
+from datetime import datetime
+from sqlalchemy import event
+from app.api.v1 import code
+from app.core.database import engine
+from app.services.history_writer import HistoryWriter
+
+
+def test_history_links_spilled_output(client, auth_headers):
+    headers = auth_headers("spill-history")
+    result = client.post("/api/v1/code/execute", headers=headers, json={
+        "code": "print('x' * 50000)", "language": "python"
+    }).json()
+    assert result["output_id"]
+
+    history = client.get("/api/v1/code/history", headers=headers).json()
+    assert history[0]["output_id"] == result["output_id"]
+    assert history[0]["error_id"] is None
+
+    full = client.get(f"/api/v1/code/outputs/{history[0]['output_id']}", headers=headers)
+    assert full.status_code == 200
+    assert full.content == b"x" * 50000 + b"\n"
+
+
+def test_history_previews_read_only_blob_prefixes(client, auth_headers):
+    headers = auth_headers("history-preview")
+    code = "import random\nrandom.seed(1)\nprint(''.join(random.choice('abcdefgh') for _ in range(200000)))"
+    result = client.post("/api/v1/code/execute", headers=headers, json={
+        "code": code, "language": "python"
+    }).json()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        summary = client.get("/api/v1/code/history?summary=true&preview=50", headers=headers).json()
+        sparse = client.get("/api/v1/code/history?fields=id,output&preview=20", headers=headers).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert summary[0]["code_preview"] == code[:50]
+    assert summary[0]["output_preview"] == result["output"][:50]
+    assert sparse[0] == {"id": summary[0]["id"], "output": result["output"][:20]}
+    blob_reads = [
+        statement for statement in statements
+        if statement.startswith("SELECT") and "content_blobs" in statement
+    ]
+    assert blob_reads and all("substr(content_blobs.data" in statement for statement in blob_reads)
+
+
+def test_history_rejects_summary_with_fields(client, auth_headers):
+    headers = auth_headers("history-summary-fields")
+    response = client.get("/api/v1/code/history?summary=true&fields=id", headers=headers)
+    assert response.status_code == 400
+
+
+def test_history_reads_runs_it_just_flushed_from_the_primary(client, auth_headers, lagging_replica, monkeypatch):
+    headers = auth_headers("history-flush-primary")
+    user_id = client.get("/api/v1/auth/me", headers=headers).json()["id"]
+    # A run buffered by the write-behind writer; the client made no HTTP write
+    writer = HistoryWriter(flush_interval=60)
+    monkeypatch.setattr(code, "get_history_writer", lambda: writer)
+    with writer._buffer_lock:
+        writer._buffer.append(dict(
+            user_id=user_id, language="python", code="print(2)", output="2\n",
+            execution_time=0.01, status="success", exit_code=0, created_at=datetime.utcnow()
+        ))
+        writer._pending_users[user_id] += 1
+
+    history = client.get("/api/v1/code/history", headers=headers).json()
+    assert [entry["output"] for entry in history] == ["2\n"]
+    execution = client.get(f"/api/v1/code/history/{history[0]['id']}", headers=headers)
+    assert execution.status_code == 200
@@ -0,0 +1,36 @@
+from app.models.rollup import ExecutionRollup
+from app.services.execution_rollups import get_rollup_recorder
+
+
+def executions_counted(client, headers, language):
+    series = client.get(
+        f"/api/v1/admin/execution-stats?language={language}", headers=headers
+    ).json()["series"]
+    return sum(bucket["executions"] for bucket in series)
+
+
+def test_unsaved_executions_are_counted(client, auth_headers):
+    headers = auth_headers("rollup-admin", superuser=True)
+    get_rollup_recorder().flush()
+    before = executions_counted(client, headers, "python")
+
+    for save_history in (True, False, False):
+        client.post("/api/v1/code/execute", headers=headers, json={
+            "code": "print(1)", "language": "python", "save_history": save_history
+        })
+    get_rollup_recorder().flush()
+
+    assert executions_counted(client, headers, "python") == before + 3
+
+
+def test_clients_cannot_create_rollup_keys(client, auth_headers, db):
+    headers = auth_headers("rollup-keys")
+    for run in (
+        {"code": "print(1)", "language": "made-up-language"},
+        {"code": "print(1)", "language": "python", "project_id": 987654},
+    ):
+        client.post("/api/v1/code/execute", headers=headers, json={**run, "save_history": False})
+    get_rollup_recorder().flush()
+
+    assert db.query(ExecutionRollup).filter(ExecutionRollup.language == "made-up-language").count() == 0
+    assert db.query(ExecutionRollup).filter(ExecutionRollup.project_id == 987654).count() == 0
@@ -0,0 +1,91 @@
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.models.execution import CodeExecution
+from app.models.user import User
+from app.services.blob_store import store_execution_blobs
+from app.services.history_archive import HistoryArchiver
+
+
+def make_user(db, username: str) -> int:
+    user = User(email=f"{username}@example.com", username=username, hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def add_executions(db, user_id: int, created_at):
+    rows = store_execution_blobs(db, [
+        dict(
+            user_id=user_id, language="python", code=f"print({n})", output=f"{n}\n",
+            execution_time=0.01, status="success", exit_code=0, created_at=at
+        )
+        for n, at in enumerate(created_at)
+    ])
+    db.execute(insert(CodeExecution), rows)
+    db.commit()
+
+
+def test_archive_pages_expired_ids_and_keeps_the_newest(db, test_dir):
+    user_id = make_user(db, "archive-pages")
+    old = datetime(1990, 1, 1)
+    add_executions(db, user_id, [old + timedelta(minutes=n) for n in range(7)])
+    # Retention cutoff a day later, before anything other tests store
+    archiver = HistoryArchiver(
+        archive_dir=os.path.join(test_dir, "archive-pages"),
+        retention_days=(datetime.utcnow() - old).days - 1, keep_last=2, batch_size=2
+    )
+
+    cutoff = datetime.utcnow() - timedelta(days=archiver.retention_days)
+    assert archiver.find_expired_partitions(db, cutoff) == [(user_id, None)]
+    assert len(archiver.find_expired_ids(db, cutoff, user_id, None)) == 5
+
+    assert archiver.archive() == 5
+    remaining = db.query(CodeExecution).filter(CodeExecution.user_id == user_id).all()
+    assert [execution.created_at for execution in remaining] == [old + timedelta(minutes=n) for n in (5, 6)]
+    files = [name for name in os.listdir(archiver._user_dir(user_id)) if name.endswith(".jsonl.gz")]
+    assert len(files) == 3
+
+
+def test_list_archived_returns_newest_records_across_files(test_dir):
+    archiver = HistoryArchiver(archive_dir=os.path.join(test_dir, "archive-order"))
+    day = datetime(2026, 1, 1)
+
+    def record(execution_id, days):
+        return {"id": execution_id, "project_id": None, "created_at": (day + timedelta(days=days)).isoformat()}
+
+    # A later pass archived a wide, older ID range after a narrow newer one
+    archiver._write_file(1, [record(100, 5), record(101, 6), record(102, 7)])
+    archiver._write_file(1, [record(10, 1), record(500, 9)])
+
+    assert [r["id"] for r in archiver.list_archived(1, limit=2)] == [500, 102]
+    assert [r["id"] for r in archiver.list_archived(1, limit=3)] == [500, 102, 101]
+
+
+def test_list_archived_opens_only_the_files_it_needs(test_dir, monkeypatch):
+    archiver = HistoryArchiver(archive_dir=os.path.join(test_dir, "archive-manifest"))
+    day = datetime(2026, 1, 1)
+    for n in range(10):
+        archiver._write_file(1, [
+            {"id": n * 10 + i, "project_id": n % 2, "created_at": (day + timedelta(days=n, hours=i)).isoformat()}
+            for i in range(3)
+        ])
+
+    opened = []
+    read_file = archiver._read_file
+    monkeypatch.setattr(archiver, "_read_file", lambda path: opened.append(path) or read_file(path))
+
+    assert [r["id"] for r in archiver.list_archived(1, limit=4)] == [92, 91, 90, 82]
+    assert len(opened) == 2
+    opened.clear()
+    assert [r["id"] for r in archiver.list_archived(1, project_id=1, limit=3)] == [92, 91, 90]
+    assert len(opened) == 1
+
+    # Files written without a manifest entry are indexed once
+    os.unlink(os.path.join(archiver._user_dir(1), "manifest.json"))
+    opened.clear()
+    archiver.list_archived(1, limit=1)
+    assert len(opened) == 11
+    opened.clear()
+    archiver.list_archived(1, limit=1)
+    assert len(opened) == 1
@@ -0,0 +1,12 @@
+import json
+
+
+def test_export_reads_stick_to_the_primary_after_a_write(client, auth_headers, lagging_replica):
+    headers = auth_headers("export-sticky")
+    client.post("/api/v1/code/execute", headers=headers, json={"code": "print(1)", "language": "python"})
+    export = client.get("/api/v1/code/history/export", headers=headers)
+    assert [json.loads(line)["output"] for line in export.text.splitlines()] == ["1\n"]
+
+    # A client that hasn't written reads the replica
+    admin = auth_headers("export-replica", superuser=True)
+    assert client.get("/api/v1/admin/executions/export", headers=admin).text == ""
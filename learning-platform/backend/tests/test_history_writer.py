@@ -0,0 +1,39 @@
+import asyncio
+from app.models.execution import CodeExecution
+from app.models.user import User
+from app.services.history_writer import HistoryWriter
+
+
+def execution(user_id: int, **values):
+    row = dict(
+        user_id=user_id, project_id=None, language="python", code="print(1)", stdin=None,
+        output="1\n", error=None, execution_time=0.01, status="success", exit_code=0
+    )
+    row.update(values)
+    return row
+
+
+def test_poison_row_is_dropped_without_blocking_the_batch(db):
+    user = User(email="poison@example.com", username="poison", hashed_password="x")
+    db.add(user)
+    db.commit()
+    writer = HistoryWriter(flush_size=1000, flush_interval=60)
+
+    async def buffer_and_flush():
+        await writer.start()
+        writer.add(**execution(user.id, code="print('before')"))
+        writer.add(**execution(user.id, status=None))  # NOT NULL violation
+        writer.add(**execution(user.id, code="print('after')"))
+        await writer.stop()  # flushes what is buffered
+
+    asyncio.run(buffer_and_flush())
+
+    assert writer.failed_flushes == 1
+    assert writer.rejected_rows == 1
+    assert writer.flushed_rows == 2
+    assert writer.buffered_rows == 0
+    assert db.query(CodeExecution).filter(CodeExecution.user_id == user.id).count() == 2
+
+    # Later flushes aren't held up by the dropped row
+    writer.add(**execution(user.id))
+    assert writer.flushed_rows == 3
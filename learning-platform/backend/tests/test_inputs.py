@@ -0,0 +1,51 @@
+import asyncio
+import hashlib
+import os
+import threading
+import pytest
+from app.services import input_store
+from app.services.input_store import InputStore, InputTooLarge
+
+
+def test_inputs_are_private_to_their_uploader(client, auth_headers):
+    owner = auth_headers("input-owner")
+    other = auth_headers("input-other")
+    input_id = client.post("/api/v1/code/inputs", headers=owner, content=b"secret\n").json()["input_id"]
+
+    assert client.head(f"/api/v1/code/inputs/{input_id}", headers=owner).status_code == 200
+    assert client.head(f"/api/v1/code/inputs/{input_id}", headers=other).status_code == 404
+
+    run = {"code": "print(input())", "language": "python", "stdin_id": input_id, "save_history": False}
+    assert client.post("/api/v1/code/execute", headers=other, json=run).status_code == 404
+    assert client.post("/api/v1/code/execute", headers=owner, json=run).json()["output"] == "secret\n"
+
+
+def test_uploads_are_written_off_the_event_loop(tmp_path, monkeypatch):
+    store = InputStore(root=str(tmp_path), max_bytes=8 * InputStore.WRITE_SIZE)
+    data = os.urandom(65536) * 40  # 2.5 write buffers
+    writes = []
+    append = input_store._append
+
+    def record(f, digest, part):
+        writes.append((threading.get_ident(), len(part)))
+        append(f, digest, part)
+
+    monkeypatch.setattr(input_store, "_append", record)
+
+    async def upload(payload):
+        loop_thread = threading.get_ident()
+
+        async def chunks():
+            for start in range(0, len(payload), 65536):
+                yield payload[start:start + 65536]
+
+        return loop_thread, await store.save(7, chunks())
+
+    loop_thread, (input_id, size) = asyncio.run(upload(data))
+    assert (input_id, size) == (hashlib.sha256(data).hexdigest(), len(data))
+    assert [length for _, length in writes] == [InputStore.WRITE_SIZE] * 2 + [len(data) - 2 * InputStore.WRITE_SIZE]
+    assert all(thread != loop_thread for thread, _ in writes)
+
+    with pytest.raises(InputTooLarge):
+        asyncio.run(upload(data * 4))
+    assert os.listdir(tmp_path / "7") == [input_id]  # no temporary file left behind
@@ -0,0 +1,50 @@
+import time
+from contextlib import asynccontextmanager
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.loop_watchdog import EventLoopBlocked, LoopWatchdog, LoopWatchdogMiddleware, get_loop_watchdog
+
+
+def test_api_requests_do_not_block_the_event_loop(client):
+    watchdog = get_loop_watchdog()
+    assert watchdog.running
+
+    with watchdog.no_blocking():
+        client.post("/api/v1/auth/register", json={
+            "email": "nonblocking@example.com", "username": "nonblocking", "password": "password"
+        })
+        token = client.post(
+            "/api/v1/auth/token", data={"username": "nonblocking", "password": "password"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+        assert client.post("/api/v1/code/execute", headers=headers, json={
+            "code": "print('hello')", "language": "python"
+        }).status_code == 200
+        assert client.get("/api/v1/code/history", headers=headers).status_code == 200
+        assert client.get("/api/v1/projects/", headers=headers).status_code == 200
+        assert client.get("/api/v1/progress/summary", headers=headers).status_code == 200
+
+
+def test_blocking_call_raises_event_loop_blocked():
+    watchdog = LoopWatchdog(threshold=0.05)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await watchdog.start()
+        yield
+        await watchdog.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.add_middleware(LoopWatchdogMiddleware)
+
+    @app.get("/blocking")
+    async def blocking():
+        time.sleep(0.3)
+        return {}
+
+    with TestClient(app) as test_client:
+        with pytest.raises(EventLoopBlocked, match="on /blocking"):
+            with watchdog.no_blocking():
+                test_client.get("/blocking")
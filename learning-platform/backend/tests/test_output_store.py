@@ -0,0 +1,47 @@
+import os
+from app.services.output_store import OutputSpool
+
+
+def test_spilled_output_is_written_in_buffered_flushes(tmp_path):
+    path = str(tmp_path / "owner" / ("a" * 32))
+    spool = OutputSpool(inline_limit=1000, path=path, max_bytes=10 * OutputSpool.FLUSH_SIZE)
+    chunk = b"x" * 65536
+
+    spool.write(chunk)
+    assert spool.spilled and not spool.flush_due
+    assert not os.path.exists(path)  # nothing touches the disk outside flush()
+
+    written = len(chunk)
+    while not spool.flush_due:
+        spool.write(chunk)
+        written += len(chunk)
+    spool.flush()
+    assert os.path.getsize(path) == written
+
+    spool.write(b"end")
+    preview, output_id = spool.finish()
+    assert output_id == os.path.basename(path)
+    assert os.path.getsize(path) == written + 3
+    assert preview.endswith("end")
+
+
+def test_discarded_spool_ignores_a_late_flush(tmp_path):
+    path = str(tmp_path / "owner" / ("b" * 32))
+    spool = OutputSpool(inline_limit=10, path=path, max_bytes=1000)
+    spool.write(b"y" * 100)
+    spool.flush()
+    spool.write(b"y" * 100)
+
+    spool.discard()
+    spool.flush()  # a flush thread that started after a timeout
+    assert not os.path.exists(path)
+
+
+def test_large_output_is_stored_in_full(client, auth_headers):
+    headers = auth_headers("large-output")
+    size = 3 * OutputSpool.FLUSH_SIZE + 12345
+    result = client.post("/api/v1/code/execute", headers=headers, json={
+        "code": f"import sys\nsys.stdout.write('z' * {size})", "language": "python", "save_history": False
+    }).json()
+    full = client.get(f"/api/v1/code/outputs/{result['output_id']}", headers=headers)
+    assert len(full.content) == size
@@ -0,0 +1,21 @@
+from app.models.progress import UserProgress
+from app.models.project import Project, ProjectDifficulty, ProjectPhase
+
+
+def test_progress_requires_a_catalog_project(client, auth_headers, db):
+    headers = auth_headers("progress-catalog")
+    project = Project(
+        project_number=9001, title="Catalog check", concept="testing",
+        phase=ProjectPhase.FOUNDATIONS, difficulty=ProjectDifficulty.BEGINNER,
+    )
+    db.add(project)
+    db.commit()
+
+    missing = project.id + 1000
+    assert client.put(f"/api/v1/progress/{missing}", headers=headers, json={"time_spent": 5}).status_code == 404
+    assert client.post(f"/api/v1/progress/?project_id={missing}", headers=headers).status_code == 404
+    assert db.query(UserProgress).filter(UserProgress.project_id == missing).count() == 0
+
+    response = client.put(f"/api/v1/progress/{project.id}", headers=headers, json={"time_spent": 5})
+    assert response.status_code == 200
+    assert response.json()["project_id"] == project.id
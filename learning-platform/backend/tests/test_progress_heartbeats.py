@@ -0,0 +1,29 @@
+from app.models.progress import UserProgress
+from app.models.project import Project, ProjectDifficulty, ProjectPhase
+from app.models.user import User
+from app.services.progress_heartbeats import ProgressHeartbeats
+
+
+def test_rejected_heartbeat_is_dropped_without_blocking_others(db):
+    user = User(email="heartbeat-poison@example.com", username="heartbeat-poison", hashed_password="x")
+    project = Project(
+        project_number=9101, title="Heartbeats", concept="testing",
+        phase=ProjectPhase.FOUNDATIONS, difficulty=ProjectDifficulty.BEGINNER,
+    )
+    db.add_all([user, project])
+    db.commit()
+    heartbeats = ProgressHeartbeats()  # not started: add() would write through
+
+    with heartbeats._buffer_lock:
+        heartbeats._pending = {
+            (user.id, project.id): {"time_spent": 30, "completion_percentage": None, "last_accessed": user.created_at},
+            (user.id, None): {"time_spent": 30, "completion_percentage": None, "last_accessed": user.created_at},
+        }
+    assert heartbeats.flush() == 1
+    assert heartbeats.failed_flushes == 1
+    assert heartbeats.rejected_rows == 1
+    assert heartbeats.pending_for_user(user.id) == {}
+
+    heartbeats.add(user.id, project.id, time_spent=15)
+    progress = db.query(UserProgress).filter(UserProgress.user_id == user.id).one()
+    assert progress.time_spent == 45
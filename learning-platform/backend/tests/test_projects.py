@@ -0,0 +1,3 @@
+def test_list_projects_rejects_negative_skip(client):
+    assert client.get("/api/v1/projects/?skip=-2").status_code == 422
+    assert client.get("/api/v1/projects/?skip=0").status_code == 200
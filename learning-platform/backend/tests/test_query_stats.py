@@ -0,0 +1,11 @@
+from app.core.config import settings
+
+
+def test_sql_debug_headers_are_opt_in(client, monkeypatch):
+    assert settings.DEBUG
+    response = client.get("/api/v1/projects/")
+    assert not [name for name in response.headers if name.lower().startswith("x-db-")]
+
+    monkeypatch.setattr(settings, "SQL_DEBUG_HEADERS", True)
+    response = client.get("/api/v1/projects/")
+    assert "x-db-query-count" in response.headers
@@ -0,0 +1,59 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from app.models.summary import UserSummary
+from app.models.user import User
+from app.services.user_summary import rebuild_user_summaries, update_user_summaries
+
+
+def make_user(db, username: str) -> int:
+    user = User(email=f"{username}@example.com", username=username, hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def summary_of(db, user_id: int) -> UserSummary:
+    db.expire_all()
+    return db.get(UserSummary, user_id)
+
+
+def test_late_activity_never_moves_last_activity_back_or_resets_streak(db):
+    user_id = make_user(db, "summary-order")
+    day1 = datetime(2026, 3, 1, 12)
+    for at in (day1, day1 + timedelta(days=1), day1 + timedelta(days=2)):
+        update_user_summaries(db, activity={user_id: at})
+        db.commit()
+    assert summary_of(db, user_id).current_streak == 3
+
+    # A writer that committed late, with activity older than what is stored
+    update_user_summaries(db, activity={user_id: day1 + timedelta(hours=1)}, executions=Counter({user_id: 1}))
+    db.commit()
+    summary = summary_of(db, user_id)
+    assert summary.last_activity_at == day1 + timedelta(days=2)
+    assert summary.current_streak == 3
+    assert summary.longest_streak == 3
+    assert summary.executions_count == 1
+
+    # Progress-only updates leave activity alone
+    update_user_summaries(db, progress_users=[user_id])
+    db.commit()
+    assert summary_of(db, user_id).last_activity_at == day1 + timedelta(days=2)
+
+    # A gap of more than a day starts a new streak
+    update_user_summaries(db, activity={user_id: day1 + timedelta(days=5)})
+    db.commit()
+    summary = summary_of(db, user_id)
+    assert (summary.current_streak, summary.longest_streak) == (1, 3)
+
+
+def test_executions_count_matches_rebuild_after_delete(client, auth_headers, db):
+    headers = auth_headers("summary-count")
+    for _ in range(3):
+        client.post("/api/v1/code/execute", headers=headers, json={"code": "print(1)", "language": "python"})
+    history = client.get("/api/v1/code/history", headers=headers).json()
+    assert client.delete(f"/api/v1/code/history/{history[0]['id']}", headers=headers).status_code == 200
+
+    assert client.get("/api/v1/progress/summary", headers=headers).json()["executions_count"] == 2
+    rebuild_user_summaries(db)
+    db.commit()
+    assert client.get("/api/v1/progress/summary", headers=headers).json()["executions_count"] == 2
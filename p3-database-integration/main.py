@@ -1,9 +1,10 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Response
 from sqlalchemy import create_engine, Column, Integer, String, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from datetime import datetime
 from pydantic import BaseModel
+import base64
 import uvicorn
 
 # Database setup
@@ -84,13 +85,50 @@ def read_root():
     }
 
 
+def encode_cursor(item_id: int) -> str:
+    """Turn the last item ID of a page into an opaque cursor string"""
+    return base64.urlsafe_b64encode(f"id:{item_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Turn a cursor string back into the item ID it points after"""
+    try:
+        prefix, item_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if prefix != "id":
+            raise ValueError(prefix)
+        return int(item_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
 @app.get("/items", response_model=list[ItemResponse])
-def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_items(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: Session = Depends(get_db)
+):
     """
     GET /items - Retrieve all items from database
-    Supports pagination with skip and limit parameters
+    Supports pagination with skip and limit parameters, or with a cursor.
+    
+    Cursor (keyset) pagination asks the database for "items after ID x",
+    which it can answer straight from the primary key index. OFFSET has to
+    walk past every skipped row, so deep pages get slower and slower.
+    The next cursor is returned in the X-Next-Cursor response header.
     """
-    items = db.query(Item).offset(skip).limit(limit).all()
+    query = db.query(Item).order_by(Item.id)
+    if cursor:
+        query = query.filter(Item.id > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+    
+    items = query.limit(limit + 1).all()
+    if len(items) > limit:
+        items = items[:limit]
+        if items:
+            response.headers["X-Next-Cursor"] = encode_cursor(items[-1].id)
     return items
 
 